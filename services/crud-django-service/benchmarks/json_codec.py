@@ -0,0 +1,103 @@
+"""
+Time JSON encoding and decoding of a task list page with DRF's stdlib
+renderer/parser and the orjson ones from todo.api.renderers, plus the bot's
+side (decoding the response body, encoding a request).
+
+Pages are shaped like TaskSerializer output: snowflake ids, nested
+categories with their `tg` account. No database needed.
+
+    cd services/crud-django-service
+    poetry run python benchmarks/json_codec.py --page-size 100
+"""
+
+import argparse
+import io
+import json
+import os
+import sys
+import timeit
+from pathlib import Path
+
+import orjson
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+sys.path.insert(0, str(SRC))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from rest_framework.parsers import JSONParser  # noqa: E402
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+
+from todo.api.renderers import ORJSONParser, ORJSONRenderer  # noqa: E402
+
+SNOWFLAKE_BASE = 7_350_000_000_000_000_000  # well past 2**53
+
+
+def make_page(page_size: int) -> dict:
+    tg = {"user_id": 123456789, "chat_id": 123456789, "tg_username": "alice"}
+    categories = [
+        {"id": SNOWFLAKE_BASE + i, "name": name, "tg": tg}
+        for i, name in enumerate(["дом", "работа", "покупки"])
+    ]
+    return {
+        "count": 1000,
+        "next": "http://crud-django-service:8000/api/tasks/?page=2&tg_user_id=1",
+        "previous": None,
+        "results": [
+            {
+                "id": SNOWFLAKE_BASE + 1000 + i,
+                "title": f"Задача номер {i}",
+                "description": "Купить молоко, хлеб и позвонить маме " * 2,
+                "created_at": "2025-08-20T12:00:00.123456-09:00",
+                "due_at": "2025-08-21T09:30:00-09:00" if i % 2 else None,
+                "is_done": i % 3 == 0,
+                "categories": categories[: i % 4],
+                "tg": tg,
+            }
+            for i in range(page_size)
+        ],
+    }
+
+
+def bench(label: str, func, number: int) -> float:
+    best = min(timeit.repeat(func, number=number, repeat=5)) / number
+    print(f"  {label:<28}{best * 1e6:>10.1f} µs")
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--number", type=int, default=200)
+    args = parser.parse_args()
+
+    page = make_page(args.page_size)
+    body = JSONRenderer().render(page)
+    if ORJSONRenderer().render(page) != body:
+        sys.exit("ORJSONRenderer output differs from JSONRenderer")
+    if ORJSONParser().parse(io.BytesIO(body)) != json.loads(body):
+        sys.exit("ORJSONParser result differs from JSONParser")
+    request = {"title": "Новая задача", "category_ids": [SNOWFLAKE_BASE] * 3}
+    n = args.number
+
+    print(f"{args.page_size}-item page, {len(body)} bytes")
+    print("API render")
+    stdlib = bench("JSONRenderer", lambda: JSONRenderer().render(page), n)
+    fast = bench("ORJSONRenderer", lambda: ORJSONRenderer().render(page), n)
+    print(f"  speed-up {stdlib / fast:.1f}x")
+    print("API parse (request body)")
+    raw = json.dumps(request).encode()
+    stdlib = bench("JSONParser", lambda: JSONParser().parse(io.BytesIO(raw)), n)
+    fast = bench("ORJSONParser", lambda: ORJSONParser().parse(io.BytesIO(raw)), n)
+    print(f"  speed-up {stdlib / fast:.1f}x")
+    print("Bot decode (response body)")
+    stdlib = bench("json.loads", lambda: json.loads(body), n)
+    fast = bench("orjson.loads", lambda: orjson.loads(body), n)
+    print(f"  speed-up {stdlib / fast:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
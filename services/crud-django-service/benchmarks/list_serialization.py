@@ -0,0 +1,123 @@
+"""
+Time building one task list page the old way (queryset with select_related +
+prefetch_related, then TaskSerializer) against the `.values()` row path in
+todo.rows, queries included, and check both give the same bytes. Also the
+page narrowed to the fields the bot asks for.
+
+Needs the configured database: the fixture (one account, its categories and
+tasks) is created inside a transaction that is rolled back at the end.
+
+    cd services/crud-django-service
+    poetry run python benchmarks/list_serialization.py --page-size 100
+"""
+
+import argparse
+import os
+import sys
+import timeit
+from pathlib import Path
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+sys.path.insert(0, str(SRC))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.db import transaction  # noqa: E402
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+
+from todo.models import Category, Task, TelegramAccount  # noqa: E402
+from todo.rows import (  # noqa: E402
+    TASK_EXPANSIONS,
+    TASK_FIELDS,
+    task_links,
+    task_rows,
+    task_values,
+)
+from todo.serializers import TaskSerializer  # noqa: E402
+
+BENCH_USER_ID = 9_100_000_000  # outside real Telegram ids
+BOT_FIELDS = ("id", "title", "due_at", "is_done")
+
+
+def seed(page_size: int) -> None:
+    tg = TelegramAccount.objects.create(
+        user_id=BENCH_USER_ID, chat_id=BENCH_USER_ID, tg_username="bench"
+    )
+    categories = Category.objects.bulk_create(
+        Category(name=name, tg=tg) for name in ["дом", "работа", "покупки"]
+    )
+    tasks = Task.objects.bulk_create(
+        Task(title=f"Задача номер {i}", description="Купить молоко " * 4, tg=tg)
+        for i in range(page_size)
+    )
+    Task.categories.through.objects.bulk_create(
+        Task.categories.through(task_id=task.id, category_id=category.id)
+        for i, task in enumerate(tasks)
+        for category in categories[: i % 4]
+    )
+
+
+def page_queryset(page_size: int):
+    return Task.objects.filter(tg__user_id=BENCH_USER_ID).order_by("-created_at")[
+        :page_size
+    ]
+
+
+def serializer_page(page_size: int) -> list:
+    tasks = page_queryset(page_size).select_related("tg").prefetch_related("categories")
+    return TaskSerializer(tasks, many=True).data
+
+
+def rows_page(page_size: int, fields=TASK_FIELDS, expand=TASK_EXPANSIONS) -> list:
+    rows = list(page_queryset(page_size).values(*task_values(fields, expand)))
+    return task_rows(rows, fields, expand)
+
+
+def bench(label: str, func, number: int) -> float:
+    best = min(timeit.repeat(func, number=number, repeat=5)) / number
+    print(f"  {label:<28}{best * 1e3:>10.2f} ms")
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--number", type=int, default=20)
+    args = parser.parse_args()
+    size, n = args.page_size, args.number
+
+    with transaction.atomic():
+        seed(size)
+        render = JSONRenderer().render
+        if render(rows_page(size)) != render(serializer_page(size)):
+            sys.exit("row mapper output differs from TaskSerializer")
+
+        print(f"{size}-task page")
+        print("Page build, queries included")
+        slow = bench("TaskSerializer", lambda: serializer_page(size), n)
+        fast = bench("task_rows", lambda: rows_page(size), n)
+        print(f"  speed-up {slow / fast:.1f}x")
+
+        print("Serialization only (rows/objects already loaded)")
+        tasks = list(
+            page_queryset(size).select_related("tg").prefetch_related("categories")
+        )
+        slow = bench("TaskSerializer", lambda: TaskSerializer(tasks, many=True).data, n)
+        rows = list(page_queryset(size).values(*task_values()))
+        links = task_links([row["id"] for row in rows])
+        fast = bench("task_rows", lambda: task_rows(rows, links=links), n)
+        print(f"  speed-up {slow / fast:.1f}x")
+
+        print(f"The bot's fieldset, ?fields={','.join(BOT_FIELDS)}&expand=")
+        full = len(render(rows_page(size)))
+        bench("task_rows", lambda: rows_page(size, BOT_FIELDS, ()), n)
+        lean = len(render(rows_page(size, BOT_FIELDS, ())))
+        print(f"  payload {full} -> {lean} bytes")
+        transaction.set_rollback(True)
+
+
+if __name__ == "__main__":
+    main()
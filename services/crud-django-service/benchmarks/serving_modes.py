@@ -0,0 +1,160 @@
+"""
+Compare WSGI (gunicorn sync workers) and ASGI (uvicorn workers) serving of
+the same endpoint at the same worker count, reporting throughput and latency.
+
+Runs both servers from src/ against whatever database/Redis the environment
+points at, one after the other, so nothing else should load the machine.
+
+    cd services/crud-django-service
+    BENCH_USERNAME=bot BENCH_PASSWORD=... poetry run python \\
+        benchmarks/serving_modes.py --workers 2 --cpus 0-1 \\
+        --path "/api/tasks/?tg_user_id=1" --concurrency 64 --duration 20
+
+`--cpus` pins each server with taskset so both modes get the same cores.
+"""
+
+import argparse
+import asyncio
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+
+
+def server_command(mode: str, workers: int, port: int) -> list[str]:
+    if mode == "wsgi":
+        return [
+            "gunicorn",
+            "config.wsgi:application",
+            "--bind",
+            f"127.0.0.1:{port}",
+            "--workers",
+            str(workers),
+        ]
+    return [
+        "uvicorn",
+        "config.asgi:application",
+        "--port",
+        str(port),
+        "--workers",
+        str(workers),
+        "--no-access-log",
+    ]
+
+
+def start_server(mode: str, args) -> subprocess.Popen:
+    cmd = server_command(mode, args.workers, args.port)
+    if args.cpus and shutil.which("taskset"):
+        cmd = ["taskset", "-c", args.cpus, *cmd]
+    return subprocess.Popen(  # noqa: S603
+        cmd, cwd=SRC, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+
+
+def wait_healthy(base: str, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"{base}/healthz", timeout=1.0).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"server at {base} did not become healthy")
+
+
+def obtain_token(base: str, username: str, password: str) -> str:
+    r = httpx.post(
+        f"{base}/api/token", json={"username": username, "password": password}
+    )
+    r.raise_for_status()
+    return r.json()["access"]
+
+
+async def run_load(
+    base: str, token: str, path: str, concurrency: int, duration: float
+) -> tuple[list[float], int]:
+    latencies: list[float] = []
+    errors = 0
+    deadline = time.monotonic() + duration
+    limits = httpx.Limits(max_connections=concurrency)
+    headers = {"Authorization": f"Bearer {token}"}
+
+    async with httpx.AsyncClient(
+        base_url=base, headers=headers, limits=limits, timeout=30.0
+    ) as client:
+
+        async def worker():
+            nonlocal errors
+            while time.monotonic() < deadline:
+                start = time.perf_counter()
+                try:
+                    r = await client.get(path)
+                    ok = r.status_code in (200, 304)
+                except httpx.HTTPError:
+                    ok = False
+                if ok:
+                    latencies.append(time.perf_counter() - start)
+                else:
+                    errors += 1
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, errors
+
+
+def percentile(values: list[float], pct: float) -> float:
+    return statistics.quantiles(values, n=100)[int(pct) - 1] if len(values) > 1 else 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--path", default="/api/tasks/?tg_user_id=1")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--cpus", help="taskset CPU list, e.g. 0-1")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--modes", default="wsgi,asgi")
+    args = parser.parse_args()
+
+    username = os.environ.get("BENCH_USERNAME", "bot")
+    password = os.environ.get("BENCH_PASSWORD", "")
+    base = f"http://127.0.0.1:{args.port}"
+
+    rows = []
+    for mode in args.modes.split(","):
+        server = start_server(mode, args)
+        try:
+            wait_healthy(base)
+            token = obtain_token(base, username, password)
+            load = (base, token, args.path, args.concurrency)
+            asyncio.run(run_load(*load, duration=2.0))  # warm-up
+            latencies, errors = asyncio.run(run_load(*load, duration=args.duration))
+        finally:
+            server.terminate()
+            server.wait(timeout=30)
+        rows.append(
+            (
+                mode,
+                len(latencies) / args.duration,
+                percentile(latencies, 50) * 1000,
+                percentile(latencies, 99) * 1000,
+                errors,
+            )
+        )
+
+    print(f"{args.workers} workers, {args.concurrency} concurrent, GET {args.path}")
+    print(f"{'mode':<6}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'errors':>8}")
+    for mode, rps, p50, p99, errors in rows:
+        print(f"{mode:<6}{rps:>10.1f}{p50:>10.1f}{p99:>10.1f}{errors:>8}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,118 @@
+"""
+Time the task search query (first page and a keyset page, as served by
+/api/tasks/search/) and the category fuzzy search for random seeded users,
+and show the plan. Run it after each seeding step: with the per-user GIN
+index, latency should not grow with the table.
+
+    cd services/crud-django-service/src
+    poetry run python manage.py seed_tasks --users 1000 --tasks-per-user 100
+    poetry run python ../benchmarks/task_search.py
+    poetry run python manage.py seed_tasks --users 1000 --tasks-per-user 1000 \\
+        --user-id-base 8000100000
+    poetry run python ../benchmarks/task_search.py
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+sys.path.insert(0, str(SRC))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.db import connection  # noqa: E402
+from django.db.models import Q  # noqa: E402
+
+from todo.models import Category, Task  # noqa: E402
+from todo.rows import task_values  # noqa: E402
+from todo.search import search_categories, search_tasks, task_query  # noqa: E402
+
+# A common word, a rare one, two-word and prefix queries
+QUERIES = ("купить", "dentist", "buy milk", "отч", "pay bill")
+FIELDS = ("id", "title", "due_at", "is_done")
+PAGE = 10
+
+
+def page(user_id: int, text: str, after: tuple | None = None) -> list[dict]:
+    qs = search_tasks(Task.objects.filter(tg_id=user_id), task_query(text))
+    if after:
+        qs = qs.filter(Q(rank__lt=after[0]) | Q(rank=after[0], id__lt=after[1]))
+    rows = qs.values(*task_values(FIELDS, ()), "rank").order_by("-rank", "-id")
+    return list(rows[: PAGE + 1])
+
+
+def timed(func, *args) -> tuple[float, list]:
+    start = time.perf_counter()
+    result = func(*args)
+    return (time.perf_counter() - start) * 1000, result
+
+
+def similar_categories(user_id: int, text: str) -> list:
+    qs = search_categories(Category.objects.filter(tg_id=user_id), text)
+    return list(qs[:20])
+
+
+def report(label: str, samples: list[float]) -> None:
+    p50, p95 = (
+        statistics.quantiles(samples, n=20, method="inclusive")[i] for i in (9, 18)
+    )
+    print(
+        f"  {label:<24}p50 {p50:6.2f} ms   p95 {p95:6.2f} ms   max {max(samples):6.2f} ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--samples", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)  # noqa: S311  reproducible, not secret
+
+    user_ids = list(
+        Task.objects.filter(tg_id__gte=8_000_000_000)
+        .values_list("tg_id", flat=True)
+        .distinct()
+    )
+    if not user_ids:
+        sys.exit("No seeded users; run `manage.py seed_tasks` first")
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT reltuples::bigint FROM pg_class WHERE relname = %s",
+            [Task._meta.db_table],
+        )
+        total = cursor.fetchone()[0]
+    print(f"~{total} tasks, {len(user_ids)} seeded users")
+
+    first, second, categories = [], [], []
+    for _ in range(args.samples):
+        user_id, text = rng.choice(user_ids), rng.choice(QUERIES)
+        elapsed, rows = timed(page, user_id, text)
+        first.append(elapsed)
+        if len(rows) > PAGE:
+            last = rows[PAGE - 1]
+            second.append(timed(page, user_id, text, (last["rank"], last["id"]))[0])
+        elapsed, _ = timed(similar_categories, user_id, rng.choice(["рабта", "hom"]))
+        categories.append(elapsed)
+    report("tasks, first page", first)
+    if second:
+        report("tasks, next page", second)
+    report("categories", categories)
+
+    # The most recently seeded (largest) user, a rare word
+    qs = search_tasks(Task.objects.filter(tg_id=max(user_ids)), task_query("dentist"))
+    print(
+        "\n"
+        + qs.values("id", "rank").order_by("-rank", "-id")[:PAGE].explain(analyze=True)
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -36,7 +36,18 @@ else:
     print(f'Superuser {u} already exists; skipping')
 PY
 
-# Start Gunicorn
-gunicorn config.wsgi:application --chdir /app/src \
-    --bind 0.0.0.0:8000 --workers 3 --timeout 60 \
-    --access-logfile - --error-logfile -
+# Start the app server. The task and category views are async, so they need
+# ASGI: SERVER_MODE=asgi (default) runs uvicorn workers. SERVER_MODE=wsgi
+# (gunicorn sync workers) is kept for benchmarks/serving_modes.py; there each
+# of those requests goes through async_to_sync.
+# WEB_CONCURRENCY sets the worker count in both modes.
+WORKERS="${WEB_CONCURRENCY:-3}"
+if [ "${SERVER_MODE:-asgi}" = "asgi" ]; then
+    exec uvicorn config.asgi:application --app-dir /app/src \
+        --host 0.0.0.0 --port 8000 --workers "$WORKERS" \
+        --timeout-graceful-shutdown 30
+else
+    exec gunicorn config.wsgi:application --chdir /app/src \
+        --bind 0.0.0.0:8000 --workers "$WORKERS" --timeout 60 \
+        --access-logfile - --error-logfile -
+fi
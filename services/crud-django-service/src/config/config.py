@@ -1,3 +1,5 @@
+from typing import Literal
+
 from pydantic import SecretStr
 from pydantic_settings import BaseSettings
 
@@ -18,6 +20,7 @@ class ServiceConfig(BaseSettings):
     # Redis
     REDIS_HOST: str = "dummy"
     REDIS_PORT: int = 6379
+    LIST_CACHE_TTL: int = 300  # seconds; writes invalidate sooner
 
     # PostgreSQL
     POSTGRES_HOST: str = "dummy"
@@ -28,11 +31,36 @@ class ServiceConfig(BaseSettings):
     POSTGRES_READ_WRITE_USER: str = "dummy"
     POSTGRES_READ_WRITE_PASSWORD: SecretStr | None = None
 
+    # Postgres connections: "pool" (psycopg3 pool per process), "persistent"
+    # (CONN_MAX_AGE) or "off" (a new connection per request/task)
+    DB_POOL_MODE: Literal["pool", "persistent", "off"] = "pool"
+    DB_PROCESS_ROLE: Literal["web", "celery"] = "web"
+    DB_POOL_WEB_MIN_SIZE: int = 2
+    DB_POOL_WEB_MAX_SIZE: int = 10
+    DB_POOL_CELERY_MIN_SIZE: int = 1
+    DB_POOL_CELERY_MAX_SIZE: int = 2
+    DB_POOL_TIMEOUT: float = 10.0  # seconds to wait for a free connection
+    DB_POOL_MAX_LIFETIME: float = 1800.0  # seconds before a connection is recycled
+    DB_POOL_MAX_IDLE: float = 300.0  # seconds before idle extras are closed
+    DB_CONN_MAX_AGE: int = 60  # "persistent" mode only
+
+    # Requests over either budget are logged with their heaviest statements
+    QUERY_BUDGET_COUNT: int = 20
+    QUERY_BUDGET_SECONDS: float = 0.5
+
+    # /metrics answers clients in these networks (comma-separated CIDRs) or
+    # with `Authorization: Bearer <METRICS_TOKEN>`; anyone else gets a 403
+    METRICS_ALLOWED_NETWORKS: str = "127.0.0.1/32,::1/128"
+    METRICS_TOKEN: SecretStr | None = None
+
     # Telegram Bot
     TELEGRAM_BOT_TOKEN: SecretStr = SecretStr("dummy")
     TELEGRAM_DB_NAME: str = "dummy"
     TELEGRAM_BOT_SHARED_SECRET: SecretStr = SecretStr("dummy")
     TELEGRAM_BOT_SERVICE_USERNAME: str = "dummy"
+    TELEGRAM_API_BASE: str = "https://api.telegram.org"
+    TELEGRAM_GLOBAL_RATE: float = 25.0
+    TELEGRAM_CHAT_RATE: float = 1.0
 
     # Celery
     CELERY_BROKER_URL: str = "redis://redis:6379/0"
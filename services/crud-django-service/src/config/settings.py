@@ -21,7 +21,7 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 SECRET_KEY = (
     service_config.DJANGO_SECRET_KEY.get_secret_value() or get_random_secret_key()
 )
-DEBUG = True
+DEBUG = service_config.DJANGO_DEBUG
 
 # Timezone requirement
 TIME_ZONE = "America/Adak"
@@ -60,13 +60,17 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "rest_framework",
+    "adrf",
     "rest_framework_simplejwt",
     "django_celery_beat",
     "todo",
 ]
 
 MIDDLEWARE = [
+    # First, so queries made by the other middleware count for the request
+    "todo.instrumentation.QueryInstrumentationMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -77,6 +81,20 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+# Per-request SQL budgets, see todo.instrumentation
+QUERY_BUDGET_COUNT = service_config.QUERY_BUDGET_COUNT
+QUERY_BUDGET_SECONDS = service_config.QUERY_BUDGET_SECONDS
+
+# Who may read /metrics, see todo.metrics.metrics_view
+METRICS_ALLOWED_NETWORKS = [
+    net.strip() for net in service_config.METRICS_ALLOWED_NETWORKS.split(",")
+]
+METRICS_TOKEN = (
+    service_config.METRICS_TOKEN.get_secret_value()
+    if service_config.METRICS_TOKEN
+    else ""
+)
+
 ROOT_URLCONF = "config.urls"
 WSGI_APPLICATION = "config.wsgi.application"
 
@@ -92,11 +110,43 @@ DATABASES = {
     },
 }
 
+# Connection reuse. Pools are per process: size web pools for the threads
+# serving requests in one worker (1 for gunicorn sync, the thread pool under
+# ASGI) and Celery pools for one prefork child running one task at a time.
+# CONN_HEALTH_CHECKS also makes the pool check connections on checkout, so a
+# server-side disconnect costs a reconnect rather than a failed request.
+DATABASES["default"]["CONN_HEALTH_CHECKS"] = True
+if service_config.DB_POOL_MODE == "pool":
+    if service_config.DB_PROCESS_ROLE == "celery":
+        _pool_min = service_config.DB_POOL_CELERY_MIN_SIZE
+        _pool_max = service_config.DB_POOL_CELERY_MAX_SIZE
+    else:
+        _pool_min = service_config.DB_POOL_WEB_MIN_SIZE
+        _pool_max = service_config.DB_POOL_WEB_MAX_SIZE
+    DATABASES["default"]["OPTIONS"]["pool"] = {
+        "min_size": _pool_min,
+        "max_size": _pool_max,
+        "timeout": service_config.DB_POOL_TIMEOUT,
+        "max_lifetime": service_config.DB_POOL_MAX_LIFETIME,
+        "max_idle": service_config.DB_POOL_MAX_IDLE,
+    }
+elif service_config.DB_POOL_MODE == "persistent":
+    DATABASES["default"]["CONN_MAX_AGE"] = service_config.DB_CONN_MAX_AGE
+
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
         "rest_framework_simplejwt.authentication.JWTAuthentication",
     ],
     "DEFAULT_PERMISSION_CLASSES": ["rest_framework.permissions.IsAuthenticated"],
+    "DEFAULT_RENDERER_CLASSES": [
+        "todo.api.renderers.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "todo.api.renderers.ORJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
 }
 
 TEMPLATES = [
@@ -115,13 +165,30 @@ TEMPLATES = [
     },
 ]
 
+REDIS_URL = f"redis://{service_config.REDIS_HOST}:{service_config.REDIS_PORT}/2"
+
+# HMAC replay protection; InMemoryNonceStore is per process (tests/dev only)
+BOT_SHARED_SECRET = service_config.TELEGRAM_BOT_SHARED_SECRET.get_secret_value()
+BOT_HMAC_NONCE_STORE = "todo.security.RedisNonceStore"
+
 CACHES = {
     "default": {
         "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
         "LOCATION": "botauth-cache",
-    }
+    },
+    # Shared by all workers so a write invalidates every worker's view
+    "lists": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": f"redis://{service_config.REDIS_HOST}:{service_config.REDIS_PORT}/3",
+        "KEY_PREFIX": "todo",
+    },
 }
 
+# Per-user list cache (todo.cache)
+LIST_CACHE_ALIAS = "lists"
+LIST_CACHE_TTL = service_config.LIST_CACHE_TTL
+LIST_CACHE_LOCK_TIMEOUT = 2  # seconds a concurrent miss waits for the filler
+
 STATIC_URL = "/static/"
 STATIC_ROOT = BASE_DIR / "staticfiles"
 STATICFILES_DIRS = []
@@ -132,5 +199,23 @@ CELERY_BROKER_URL = service_config.CELERY_BROKER_URL
 CELERY_RESULT_BACKEND = service_config.CELERY_RESULT_BACKEND
 CELERY_TIMEZONE = TIME_ZONE
 
+# Due-notification scheduler (see todo.tasks.dispatch_due_notifications)
+DUE_NOTIFICATION_POLL_SECONDS = 15
+DUE_NOTIFICATION_BATCH_SIZE = 500  # rows claimed per transaction
+DUE_NOTIFICATION_DELIVERY_CHUNK = 50  # tasks per delivery job
+# Seconds after which a claim that was never delivered (lost publish, job out
+# of retries, worker killed) is claimed again. Longer than a job's retries.
+DUE_NOTIFICATION_LEASE_SECONDS = 600
+CELERY_BEAT_SCHEDULE = {
+    "dispatch-due-notifications": {
+        "task": "tasks.dispatch_due_notifications",
+        "schedule": DUE_NOTIFICATION_POLL_SECONDS,
+    },
+}
+
 # Telegram bot settings
 TELEGRAM_BOT_TOKEN = service_config.TELEGRAM_BOT_TOKEN.get_secret_value()
+TELEGRAM_API_BASE = service_config.TELEGRAM_API_BASE
+# Bot API limits: ~30 msg/s overall, ~1 msg/s per chat (per worker process)
+TELEGRAM_GLOBAL_RATE = service_config.TELEGRAM_GLOBAL_RATE
+TELEGRAM_CHAT_RATE = service_config.TELEGRAM_CHAT_RATE
@@ -28,6 +28,8 @@ from rest_framework.response import Response
 from rest_framework_simplejwt.authentication import JWTAuthentication
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 
+from todo.metrics import metrics_view
+
 
 def health(_request):
     return JsonResponse({"status": "ok"})
@@ -43,6 +45,7 @@ def whoami(request):
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("healthz", health, name="health"),
+    path("metrics", metrics_view, name="metrics"),
     path("api/whoami", whoami),
     path("api/token", TokenObtainPairView.as_view(), name="token_obtain_pair"),
     path("api/token/refresh", TokenRefreshView.as_view(), name="token_refresh"),
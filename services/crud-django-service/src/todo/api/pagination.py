@@ -1,7 +1,129 @@
-from rest_framework.pagination import PageNumberPagination
+from base64 import b64decode, b64encode
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import (
+    BasePagination,
+    CursorPagination,
+    PageNumberPagination,
+)
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 
 
 class DefaultPagination(PageNumberPagination):
     page_size = 10  # default page size
     page_size_query_param = "page_size"  # allow clients to override
     max_page_size = 100
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Cursor (keyset) pagination: each page is a `WHERE key < last_seen` range
+    scan instead of COUNT(*) + OFFSET, so deep pages cost the same as page 1.
+    The total count is opt-in via `?with_count=1`.
+
+    DRF keys the cursor on the first ordering field alone and falls back to
+    an offset among rows that tie on it, so that field must be unique.
+    """
+
+    page_size = 10
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    # Snowflake ids are unique and time-ordered: newest first, no ties
+    ordering = ("-id",)
+    count_query_param = "with_count"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.count = None
+        if request.query_params.get(self.count_query_param) in ("1", "true"):
+            self.count = queryset.count()
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        payload = {"next": self.get_next_link(), "previous": self.get_previous_link()}
+        if self.count is not None:
+            payload["count"] = self.count
+        payload["results"] = data
+        return Response(payload)
+
+
+class NameKeysetPagination(KeysetPagination):
+    # Category names are unique per Telegram account
+    ordering = ("name",)
+
+
+class OptInKeysetPaginationMixin:
+    """
+    Switch a viewset to keyset pagination when the client asks for it with
+    `?pagination=cursor`; page-number pagination stays the default.
+    """
+
+    keyset_pagination_class = KeysetPagination
+    pagination_mode_query_param = "pagination"
+
+    @property
+    def paginator(self):
+        if not hasattr(self, "_paginator") and (
+            self.request.query_params.get(self.pagination_mode_query_param) == "cursor"
+        ):
+            self._paginator = self.keyset_pagination_class()
+        return super().paginator
+
+
+class RankKeysetPagination(BasePagination):
+    """
+    Keyset pages over ranked rows (e.g. search results), ordered by
+    `rank` DESC, `id` DESC: the cursor is the last row's (rank, id), so
+    every page is a range condition on the same ordering. Forward only;
+    the page queryset must yield dicts with `rank` and `id`.
+    """
+
+    page_size = 10
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    cursor_query_param = "cursor"
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        page_size = self.get_page_size(request)
+        position = self.decode_cursor(request)
+        if position is not None:
+            rank, pk = position
+            queryset = queryset.filter(Q(rank__lt=rank) | Q(rank=rank, id__lt=pk))
+        rows = list(queryset.order_by("-rank", "-id")[: page_size + 1])
+        self.next_position = None
+        if len(rows) > page_size:
+            rows = rows[:page_size]
+            self.next_position = (rows[-1]["rank"], rows[-1]["id"])
+        return rows
+
+    def get_page_size(self, request) -> int:
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(size, 1), self.max_page_size)
+
+    def decode_cursor(self, request) -> tuple[float, int] | None:
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        try:
+            rank, pk = b64decode(encoded.encode(), altchars=b"-_").decode().split(":")
+            return float(rank), int(pk)
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message) from None
+
+    def get_next_link(self) -> str | None:
+        if self.next_position is None:
+            return None
+        # repr round-trips the float exactly
+        rank, pk = self.next_position
+        encoded = b64encode(f"{rank!r}:{pk}".encode(), altchars=b"-_").decode()
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, encoded)
+
+    def get_paginated_response(self, data):
+        return Response({"next": self.get_next_link(), "results": data})
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class TodoConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "todo"
+
+    def ready(self):
+        # Registers the pool metrics and hooks new DB connections
+        from . import db, instrumentation  # noqa: F401
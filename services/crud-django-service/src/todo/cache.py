@@ -0,0 +1,182 @@
+"""
+Versioned read-through cache for per-user list responses.
+
+Every Telegram user has a generation counter. List payloads are cached under
+the user's current generation, so invalidating after a write is a single
+INCR and the superseded entries simply expire. Reads use the async cache API
+(list views are async); invalidation runs in sync write paths.
+"""
+
+import asyncio
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import Count, Max
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.response import Response
+
+from .api.viewsets import database_sync_to_async
+from .metrics import Counter
+
+LOCK_POLL_INTERVAL = 0.02  # seconds between checks while another request fills
+
+list_cache_lookups = Counter(
+    "todo_list_cache_lookups_total",
+    "Per-user list cache lookups by outcome (hit, miss, coalesced).",
+    labels=("resource", "result"),
+)
+list_not_modified = Counter(
+    "todo_list_not_modified_total",
+    "Conditional list GETs answered with 304 Not Modified.",
+    labels=("resource",),
+)
+list_cache_invalidations = Counter(
+    "todo_list_cache_invalidations_total",
+    "Per-user list cache generation bumps.",
+)
+
+
+def _cache():
+    return caches[settings.LIST_CACHE_ALIAS]
+
+
+def _generation_key(user_id) -> str:
+    return f"lists:gen:{user_id}"
+
+
+def _initial_generation() -> int:
+    # Time-based, so a counter lost to eviction never reuses an old generation
+    return time.time_ns()
+
+
+async def generation(user_id) -> int:
+    cache = _cache()
+    key = _generation_key(user_id)
+    gen = await cache.aget(key)
+    if gen is None:
+        await cache.aadd(key, _initial_generation(), timeout=None)
+        gen = await cache.aget(key)
+    return gen
+
+
+def invalidate_lists(*user_ids) -> None:
+    """Bump the generation of each user once the current transaction commits."""
+    user_ids = {user_id for user_id in user_ids if user_id is not None}
+    if not user_ids:
+        return
+
+    def bump():
+        cache = _cache()
+        for user_id in user_ids:
+            try:
+                cache.incr(_generation_key(user_id))
+            except ValueError:  # no generation yet, or it was evicted
+                cache.add(_generation_key(user_id), _initial_generation(), None)
+            list_cache_invalidations.inc()
+
+    transaction.on_commit(bump)
+
+
+async def cached_list(key: str, resource: str, compute):
+    """
+    Return the payload cached under `key`, or await `compute()` and store it.
+    Concurrent misses on the same entry are coalesced behind one lock holder.
+    """
+    cache = _cache()
+    data = await cache.aget(key)
+    if data is not None:
+        list_cache_lookups.inc(resource=resource, result="hit")
+        return data
+
+    lock_key = f"{key}:lock"
+    locked = await cache.aadd(lock_key, 1, timeout=settings.LIST_CACHE_LOCK_TIMEOUT)
+    if not locked:
+        # Someone else is computing this entry; wait for it, within reason
+        deadline = time.monotonic() + settings.LIST_CACHE_LOCK_TIMEOUT
+        while time.monotonic() < deadline:
+            await asyncio.sleep(LOCK_POLL_INTERVAL)
+            data = await cache.aget(key)
+            if data is not None:
+                list_cache_lookups.inc(resource=resource, result="coalesced")
+                return data
+
+    list_cache_lookups.inc(resource=resource, result="miss")
+    try:
+        data = await compute()
+        await cache.aset(key, data, timeout=settings.LIST_CACHE_TTL)
+    finally:
+        if locked:
+            await cache.adelete(lock_key)
+    return data
+
+
+class CachedListMixin:
+    """
+    Serve `list` through the per-user cache keyed by `tg_user_id`, with an
+    ETag so unchanged pages revalidate to a 304, and invalidate the owner's
+    lists on create, update and destroy.
+
+    Lists whose result changes with the clock alone, not with writes (e.g.
+    `?overdue=`), name those query parameters in `list_uncached_params`;
+    they are neither cached nor given an ETag.
+    """
+
+    list_cache_resource: str
+    list_uncached_params: tuple[str, ...] = ()
+
+    async def list(self, request, *args, **kwargs):
+        sync_list = database_sync_to_async(super().list)
+        user_id = request.query_params.get("tg_user_id")
+        if not user_id:
+            return await sync_list(request, *args, **kwargs)  # 400 from get_queryset
+        if any(param in request.query_params for param in self.list_uncached_params):
+            return await sync_list(request, *args, **kwargs)
+
+        gen = await generation(user_id)
+        # One entry per representation: page/cursor/page size and output format
+        url_hash = hashlib.sha256(
+            f"{request.accepted_renderer.format}:{request.build_absolute_uri()}".encode()
+        ).hexdigest()[:32]
+        etag = await database_sync_to_async(self.list_etag)(user_id, gen, url_hash)
+        if etag in parse_etags(request.headers.get("If-None-Match", "")):
+            list_not_modified.inc(resource=self.list_cache_resource)
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+        async def compute():
+            return (await sync_list(request, *args, **kwargs)).data
+
+        data = await cached_list(
+            f"lists:{user_id}:{gen}:{self.list_cache_resource}:{url_hash}",
+            self.list_cache_resource,
+            compute,
+        )
+        return Response(data, headers={"ETag": etag})
+
+    def list_etag(self, user_id, gen: int, url_hash: str) -> str:
+        """
+        Weak validator for one list representation. Besides the generation,
+        the newest snowflake id and row count (one aggregate over the user's
+        rows, via the tg index) catch writes that bypass the API, e.g. admin.
+        """
+        stats = self.queryset.model.objects.filter(tg_id=user_id).aggregate(
+            max_id=Max("id"), count=Count("id")
+        )
+        return f'W/"{gen:x}-{stats["max_id"] or 0:x}-{stats["count"]}-{url_hash[:16]}"'
+
+    def perform_create(self, serializer):
+        super().perform_create(serializer)
+        invalidate_lists(serializer.instance.tg_id)
+
+    def perform_update(self, serializer):
+        previous_owner = serializer.instance.tg_id
+        super().perform_update(serializer)
+        invalidate_lists(previous_owner, serializer.instance.tg_id)
+
+    def perform_destroy(self, instance):
+        owner = instance.tg_id
+        super().perform_destroy(instance)
+        invalidate_lists(owner)
@@ -0,0 +1,81 @@
+"""Postgres connection pool statistics, exported through todo.metrics."""
+
+from django.db import connections
+
+from .metrics import Sampled
+
+
+def _pool_stats() -> dict[str, dict[str, int]]:
+    return {
+        alias: connections[alias].pool.get_stats()
+        for alias in connections
+        if connections.settings[alias]["OPTIONS"].get("pool")
+    }
+
+
+def _stat(key: str, scale: float = 1.0):
+    # psycopg_pool leaves out counters that are still zero
+    return lambda: {
+        (alias,): stats.get(key, 0) * scale for alias, stats in _pool_stats().items()
+    }
+
+
+Sampled(
+    "todo_db_pool_size",
+    "Connections open in this process's pool (in use plus idle).",
+    _stat("pool_size"),
+    labels=("alias",),
+)
+Sampled(
+    "todo_db_pool_available",
+    "Idle connections ready for checkout.",
+    _stat("pool_available"),
+    labels=("alias",),
+)
+Sampled(
+    "todo_db_pool_max_size",
+    "Configured maximum pool size.",
+    _stat("pool_max"),
+    labels=("alias",),
+)
+Sampled(
+    "todo_db_pool_requests_waiting",
+    "Checkouts currently queued for a free connection.",
+    _stat("requests_waiting"),
+    labels=("alias",),
+)
+Sampled(
+    "todo_db_pool_requests_total",
+    "Connection checkouts.",
+    _stat("requests_num"),
+    labels=("alias",),
+    kind="counter",
+)
+Sampled(
+    "todo_db_pool_requests_queued_total",
+    "Checkouts that had to wait for a connection.",
+    _stat("requests_queued"),
+    labels=("alias",),
+    kind="counter",
+)
+Sampled(
+    "todo_db_pool_wait_seconds_total",
+    "Time checkouts spent waiting for a connection.",
+    _stat("requests_wait_ms", 0.001),
+    labels=("alias",),
+    kind="counter",
+)
+Sampled(
+    "todo_db_pool_connections_total",
+    "Connections opened by the pool.",
+    _stat("connections_num"),
+    labels=("alias",),
+    kind="counter",
+)
+Sampled(
+    "todo_db_pool_connect_seconds_total",
+    "Time spent opening connections.",
+    _stat("connections_ms", 0.001),
+    labels=("alias",),
+    kind="counter",
+)
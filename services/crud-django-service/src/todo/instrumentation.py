@@ -0,0 +1,182 @@
+"""
+Per-view database instrumentation: query count, DB time and the heaviest
+statements of every request, labelled by view and action, e.g.
+`TaskViewSet.list`.
+
+Every connection gets one execute wrapper when it is created; it records
+into the current request's `QueryLog` through a context variable, so ORM
+calls that async views run in worker threads still count for their request
+(asgiref copies the context), and queries outside requests (Celery) only
+pay for a context lookup. Requests over QUERY_BUDGET_COUNT queries or
+QUERY_BUDGET_SECONDS of DB time are logged with their slowest and most
+repeated statements, so N+1 regressions show up in production logs.
+"""
+
+import contextvars
+import logging
+import re
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+from .metrics import Counter, Histogram
+
+logger = logging.getLogger(__name__)
+
+request_queries = Histogram(
+    "todo_request_queries",
+    "SQL statements per request, by view and action.",
+    labels=("view",),
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100),
+)
+request_db_seconds = Histogram(
+    "todo_request_db_seconds",
+    "Time spent executing SQL per request, by view and action.",
+    labels=("view",),
+)
+budget_exceeded = Counter(
+    "todo_request_query_budget_exceeded_total",
+    "Requests over the query count or DB time budget.",
+    labels=("view", "budget"),
+)
+
+_IN_LIST = re.compile(r"\((?:%s, )+%s\)")
+_NUMBER = re.compile(r"\b\d+\b")
+_SPACE = re.compile(r"\s+")
+
+
+def fingerprint(sql: str) -> str:
+    """`sql` with IN lists and inline numbers collapsed, for grouping and logs."""
+    sql = _IN_LIST.sub("(...)", sql)
+    sql = _NUMBER.sub("?", sql)
+    return _SPACE.sub(" ", sql)[:200]
+
+
+class QueryLog:
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        # sql -> [executions, total seconds]; bounded by distinct statements
+        self.statements: dict[str, list] = {}
+
+    def add(self, sql: str, seconds: float) -> None:
+        self.count += 1
+        self.seconds += seconds
+        entry = self.statements.get(sql)
+        if entry is None:
+            self.statements[sql] = [1, seconds]
+        else:
+            entry[0] += 1
+            entry[1] += seconds
+
+    def summary(self, top: int = 3) -> str:
+        grouped: dict[str, list] = {}
+        for sql, (count, seconds) in self.statements.items():
+            entry = grouped.setdefault(fingerprint(sql), [0, 0.0])
+            entry[0] += count
+            entry[1] += seconds
+        slowest = sorted(grouped.items(), key=lambda item: -item[1][1])[:top]
+        repeated = max(grouped.items(), key=lambda item: item[1][0], default=None)
+        lines = [f"  {s * 1000:.1f} ms in {n}x {sql}" for sql, (n, s) in slowest]
+        if repeated and repeated[1][0] > 1:
+            lines.append(f"  most repeated: {repeated[1][0]}x {repeated[0]}")
+        return "\n".join(lines)
+
+
+_current: contextvars.ContextVar[QueryLog | None] = contextvars.ContextVar(
+    "todo_query_log", default=None
+)
+
+
+def _record(execute, sql, params, many, context):
+    log = _current.get()
+    if log is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        log.add(sql, time.perf_counter() - start)
+
+
+@receiver(connection_created)
+def _install(sender, connection, **kwargs):
+    # Fired on every (re)connect of the same wrapper object; install once
+    if _record not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record)
+
+
+def view_name(request) -> str:
+    match = request.resolver_match
+    if match is None:
+        return "unresolved"
+    cls = getattr(match.func, "cls", None)
+    if cls is None:
+        return match.view_name or match.func.__qualname__
+    method = request.method.lower()
+    actions = getattr(match.func, "actions", None) or {}
+    return f"{cls.__name__}.{actions.get(method, method)}"
+
+
+class QueryInstrumentationMiddleware:
+    """Sync and async capable, so ASGI requests don't hop threads for it."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        log = QueryLog()
+        token = _current.set(log)
+        try:
+            return self.get_response(request)
+        finally:
+            _current.reset(token)
+            self.report(request, log)
+
+    async def __acall__(self, request):
+        log = QueryLog()
+        token = _current.set(log)
+        try:
+            return await self.get_response(request)
+        finally:
+            _current.reset(token)
+            self.report(request, log)
+
+    def report(self, request, log: QueryLog) -> None:
+        view = view_name(request)
+        request_queries.observe(log.count, view=view)
+        request_db_seconds.observe(log.seconds, view=view)
+
+        over = [
+            budget
+            for budget, exceeded in (
+                ("count", log.count > settings.QUERY_BUDGET_COUNT),
+                ("time", log.seconds > settings.QUERY_BUDGET_SECONDS),
+            )
+            if exceeded
+        ]
+        if not over:
+            return
+        for budget in over:
+            budget_exceeded.inc(view=view, budget=budget)
+        logger.warning(
+            "%s %s (%s): %d queries, %.1f ms in DB, over the %s budget\n%s",
+            request.method,
+            request.path,
+            view,
+            log.count,
+            log.seconds * 1000,
+            " and ".join(over),
+            log.summary(),
+        )
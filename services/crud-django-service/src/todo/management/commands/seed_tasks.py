@@ -0,0 +1,121 @@
+import random
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+
+from todo.id_gen import snowflake_id
+from todo.models import Category, Task, TelegramAccount
+
+# Mixed-language vocabulary; drawn Zipf-like, so some words are everywhere
+# (long posting lists) and most are rare, like real task titles
+WORDS = (
+    "купить молоко хлеб позвонить маме отчёт встреча врач оплатить счёт "
+    "квартира ремонт машина шиномонтаж подарок день рождения записаться "
+    "спортзал бассейн английский книга прочитать курс проект релиз "
+    "созвон клиент договор налоги банк страховка отпуск билеты отель "
+    "паспорт визу уборка стирка посуда цветы полить кот корм ветеринар "
+    "buy milk bread call mom report meeting doctor pay bill rent repair "
+    "car tires gift birthday gym pool english book read course project "
+    "release sync client contract taxes bank insurance vacation tickets "
+    "hotel passport visa cleaning laundry dishes plants water cat food vet "
+    "deploy review refactor invoice groceries dentist haircut backup"
+).split()
+WEIGHTS = [1 / (rank + 1) for rank in range(len(WORDS))]
+CATEGORY_NAMES = ["Дом", "Работа", "Покупки", "Здоровье", "Учёба", "Finance", "Travel"]
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed synthetic accounts, categories and tasks for search and list "
+        "benchmarks, streamed in with COPY. Safe to re-run with another "
+        "--user-id-base; never touches other accounts."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=1000)
+        parser.add_argument("--tasks-per-user", type=int, default=1000)
+        parser.add_argument("--categories-per-user", type=int, default=5)
+        parser.add_argument(
+            "--user-id-base",
+            type=int,
+            default=8_000_000_000,
+            help="first synthetic Telegram user id (keep clear of real ones)",
+        )
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **opts):
+        rng = random.Random(opts["seed"])  # noqa: S311  reproducible, not secret
+        user_ids = range(opts["user_id_base"], opts["user_id_base"] + opts["users"])
+        per_user = opts["tasks_per_user"]
+        started = time.perf_counter()
+
+        TelegramAccount.objects.bulk_create(
+            (TelegramAccount(user_id=uid, chat_id=uid) for uid in user_ids),
+            ignore_conflicts=True,
+            batch_size=10_000,
+        )
+        names = CATEGORY_NAMES[: opts["categories_per_user"]]
+        categories = Category.objects.bulk_create(
+            (Category(name=name, tg_id=uid) for uid in user_ids for name in names),
+            ignore_conflicts=True,
+            batch_size=10_000,
+        )
+        # ignore_conflicts leaves ids unset on rows that already existed
+        category_ids: dict[int, list[int]] = {}
+        for category in Category.objects.filter(tg_id__in=user_ids).values(
+            "id", "tg_id"
+        ):
+            category_ids.setdefault(category["tg_id"], []).append(category["id"])
+        self.stdout.write(f"{len(user_ids)} accounts, {len(categories)} categories")
+
+        task_columns = "id, title, description, created_at, due_at, is_done, tg_id"
+        now = timezone.now()
+        with transaction.atomic(), connection.cursor() as cursor:
+            links = []
+            with cursor.copy(
+                f"COPY {Task._meta.db_table} ({task_columns}) FROM STDIN"
+            ) as copy:
+                for n, uid in enumerate(user_ids, 1):
+                    for _ in range(per_user):
+                        task_id = snowflake_id()
+                        created = now - timedelta(minutes=rng.randrange(525_600))
+                        due = created + timedelta(days=rng.randrange(1, 60))
+                        copy.write_row(
+                            (
+                                task_id,
+                                self.text(rng, 2, 6).capitalize(),
+                                self.text(rng, 0, 20),
+                                created,
+                                due if rng.random() < 0.4 else None,
+                                rng.random() < 0.7,
+                                uid,
+                            )
+                        )
+                        for category_id in rng.sample(
+                            category_ids.get(uid, []),
+                            k=min(rng.randint(0, 2), len(category_ids.get(uid, []))),
+                        ):
+                            links.append((task_id, category_id))
+                    if n % 100 == 0:
+                        self.stdout.write(f"  {n * per_user} tasks")
+            through = Task.categories.through._meta.db_table
+            with cursor.copy(
+                f"COPY {through} (task_id, category_id) FROM STDIN"
+            ) as copy:
+                for link in links:
+                    copy.write_row(link)
+            cursor.execute(f"ANALYZE {Task._meta.db_table}")
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Seeded {len(user_ids) * per_user} tasks and {len(links)} "
+                f"category links in {time.perf_counter() - started:.0f}s"
+            )
+        )
+
+    @staticmethod
+    def text(rng: random.Random, low: int, high: int) -> str:
+        return " ".join(rng.choices(WORDS, WEIGHTS, k=rng.randint(low, high)))
@@ -0,0 +1,171 @@
+"""
+Minimal in-process metrics in the Prometheus text format.
+
+Counters live in the worker that incremented them; with several gunicorn
+workers each scrape reports the worker that answered it, which is enough for
+hit ratios and rates but not for exact totals.
+"""
+
+import bisect
+import hmac
+import ipaddress
+import threading
+from collections.abc import Callable
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+
+_registry: list["Metric"] = []
+
+
+class Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help_text: str, labels: tuple[str, ...] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        _registry.append(self)
+
+    def samples(self) -> dict[tuple[str, ...], float]:
+        raise NotImplementedError
+
+    def _line(self, name: str, key: tuple[str, ...], value, **extra) -> str:
+        pairs = ",".join(
+            f'{k}="{v}"'
+            for k, v in [*zip(self.labels, key, strict=True), *extra.items()]
+        )
+        return f"{name}{{{pairs}}} {value}" if pairs else f"{name} {value}"
+
+    def render(self) -> list[str]:
+        return [
+            f"# HELP {self.name} {self.help_text}",
+            f"# TYPE {self.name} {self.kind}",
+            *(
+                self._line(self.name, key, value)
+                for key, value in sorted(self.samples().items())
+            ),
+        ]
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labels: tuple[str, ...] = ()):
+        super().__init__(name, help_text, labels)
+        self._values: dict[tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = tuple(str(labels[label]) for label in self.labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(tuple(str(labels[label]) for label in self.labels), 0)
+
+    def samples(self) -> dict[tuple[str, ...], float]:
+        with self._lock:
+            return dict(self._values)
+
+
+class Sampled(Metric):
+    """Read at scrape time from `collect()`, e.g. stats another library keeps."""
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        collect: Callable[[], dict[tuple[str, ...], float]],
+        labels: tuple[str, ...] = (),
+        kind: str = "gauge",
+    ):
+        super().__init__(name, help_text, labels)
+        self.kind = kind
+        self._collect = collect
+
+    def samples(self) -> dict[tuple[str, ...], float]:
+        return self._collect()
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labels: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0),
+    ):
+        super().__init__(name, help_text, labels)
+        self.buckets = buckets
+        # Per label set: a count per bucket plus +Inf (not cumulative), and the sum
+        self._counts: dict[tuple[str, ...], list[int]] = {}
+        self._sums: dict[tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(str(labels[label]) for label in self.labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self._counts.get(key)
+            if counts is None:
+                counts = self._counts[key] = [0] * (len(self.buckets) + 1)
+            counts[index] += 1
+            self._sums[key] = self._sums.get(key, 0.0) + value
+
+    def count(self, **labels: str) -> int:
+        key = tuple(str(labels[label]) for label in self.labels)
+        return sum(self._counts.get(key, ()))
+
+    def render(self) -> list[str]:
+        lines = [
+            f"# HELP {self.name} {self.help_text}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+        with self._lock:
+            snapshot = {key: list(c) for key, c in self._counts.items()}
+            sums = dict(self._sums)
+        for key, counts in sorted(snapshot.items()):
+            total = 0
+            for bound, count in zip((*self.buckets, "+Inf"), counts, strict=True):
+                total += count
+                lines.append(self._line(f"{self.name}_bucket", key, total, le=bound))
+            lines.append(self._line(f"{self.name}_sum", key, sums[key]))
+            lines.append(self._line(f"{self.name}_count", key, total))
+        return lines
+
+
+def render() -> str:
+    return "\n".join(line for metric in _registry for line in metric.render()) + "\n"
+
+
+def _allowed_networks() -> tuple[ipaddress.IPv4Network | ipaddress.IPv6Network, ...]:
+    return tuple(
+        ipaddress.ip_network(net) for net in settings.METRICS_ALLOWED_NETWORKS if net
+    )
+
+
+def _may_scrape(request) -> bool:
+    """
+    From an allowed network (REMOTE_ADDR: the peer, so behind a proxy use
+    the token) or bearing METRICS_TOKEN.
+    """
+    token = settings.METRICS_TOKEN
+    if token:
+        offered = request.headers.get("Authorization", "").removeprefix("Bearer ")
+        if hmac.compare_digest(offered.encode(), token.encode()):
+            return True
+    try:
+        address = ipaddress.ip_address(request.META.get("REMOTE_ADDR", ""))
+    except ValueError:
+        return False
+    return any(address in net for net in _allowed_networks())
+
+
+def metrics_view(request):
+    """Served on the API port, so route names and timings are not public."""
+    if not _may_scrape(request):
+        return HttpResponseForbidden()
+    return HttpResponse(render(), content_type="text/plain; version=0.0.4")
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('todo', '0004_remove_category_unique_user_category_name_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='category',
+            index=models.Index(fields=['tg', 'name'], name='category_tg_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['tg', '-created_at'], name='task_tg_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(condition=models.Q(('is_done', False)), fields=['due_at'], name='task_pending_due_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('todo', '0006_task_notified_at'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(condition=models.Q(('is_done', False)), fields=['tg', '-created_at'], name='task_tg_pending_idx'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:45
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import BtreeGinExtension, TrigramExtension
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('todo', '0007_task_tg_pending_index'),
+    ]
+
+    operations = [
+        # GIN indexes over (owner, text) below need both
+        BtreeGinExtension(),
+        TrigramExtension(),
+        migrations.AddField(
+            model_name='task',
+            name='search_vector',
+            field=models.GeneratedField(db_persist=True, expression=django.contrib.postgres.search.CombinedSearchVector(django.contrib.postgres.search.SearchVector('title', config='simple', weight='A'), '||', django.contrib.postgres.search.SearchVector('description', config='simple', weight='B'), django.contrib.postgres.search.SearchConfig('simple')), output_field=django.contrib.postgres.search.SearchVectorField()),
+        ),
+        migrations.AddIndex(
+            model_name='category',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['tg', 'name'], name='category_tg_name_trgm_idx', opclasses=['int8_ops', 'gin_trgm_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['tg', 'search_vector'], name='task_tg_search_idx'),
+        ),
+    ]
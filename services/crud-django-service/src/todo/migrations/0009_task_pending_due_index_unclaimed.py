@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('todo', '0008_task_search'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='task',
+            name='task_pending_due_idx',
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(condition=models.Q(('is_done', False), ('notified_at__isnull', True)), fields=['due_at'], name='task_pending_due_idx'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:22
+
+from django.db import migrations, models
+
+
+def claims_from_notified_at(apps, schema_editor):
+    # notified_at used to be set on claim. Undelivered tasks carrying it are
+    # claims (possibly still queued): turn them into leases, so delivery
+    # still finds them and lost ones are claimed again.
+    Task = apps.get_model('todo', 'Task')
+    Task.objects.filter(is_done=False, notified_at__isnull=False).update(
+        notify_claimed_at=models.F('notified_at'), notified_at=None
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('todo', '0010_task_tg_pending_due_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='notify_claimed_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(claims_from_notified_at, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('todo', '0011_task_notify_claimed_at'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['tg', '-id'], name='task_tg_id_idx'),
+        ),
+    ]
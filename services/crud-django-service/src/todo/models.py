@@ -1,3 +1,5 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector, SearchVectorField
 from django.db import models
 
 from .id_gen import snowflake_id
@@ -20,6 +22,17 @@ class Category(models.Model):
                 fields=["name", "tg"], name="unique_category_per_tg"
             )
         ]
+        indexes = [
+            # CategoryViewSet.list: WHERE tg = ? ORDER BY name
+            models.Index(fields=["tg", "name"], name="category_tg_name_idx"),
+            # Fuzzy name search: WHERE tg = ? AND ? <% name (pg_trgm; the
+            # owner via btree_gin, as for task search)
+            GinIndex(
+                fields=["tg", "name"],
+                opclasses=["int8_ops", "gin_trgm_ops"],
+                name="category_tg_name_trgm_idx",
+            ),
+        ]
 
     def __str__(self):
         return self.name
@@ -34,6 +47,13 @@ class Task(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     due_at = models.DateTimeField(null=True, blank=True)
     is_done = models.BooleanField(default=False)
+    # Due reminder state, both cleared whenever due_at changes so the new
+    # time gets its own reminder. notify_claimed_at: the dispatcher handed
+    # the task to a delivery job; a claim older than the lease that was never
+    # delivered is claimed again. notified_at: the reminder went out (or
+    # there is no chat to send it to).
+    notify_claimed_at = models.DateTimeField(null=True, blank=True, editable=False)
+    notified_at = models.DateTimeField(null=True, blank=True, editable=False)
     tg = models.ForeignKey(
         "TelegramAccount",
         on_delete=models.SET_NULL,
@@ -41,6 +61,49 @@ class Task(models.Model):
         blank=True,
         related_name="tasks",
     )
+    # Maintained by Postgres. The "simple" config doesn't stem, so Russian
+    # and English titles match alike; titles outrank descriptions.
+    search_vector = models.GeneratedField(
+        expression=SearchVector("title", weight="A", config="simple")
+        + SearchVector("description", weight="B", config="simple"),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
+
+    class Meta:
+        indexes = [
+            # Task search: WHERE tg = ? AND search_vector @@ ?. btree_gin puts
+            # the owner in the same GIN index, so a search only reads that
+            # user's matches however many tasks the table holds
+            GinIndex(fields=["tg", "search_vector"], name="task_tg_search_idx"),
+            # TaskViewSet.list: WHERE tg = ? ORDER BY created_at DESC
+            models.Index(fields=["tg", "-created_at"], name="task_tg_created_idx"),
+            # ... ORDER BY id DESC: keyset pages (`?pagination=cursor`)
+            models.Index(fields=["tg", "-id"], name="task_tg_id_idx"),
+            # ... AND NOT is_done: the "to do" and overdue filters scan the
+            # user's pending tasks only. Partial, so unfiltered lists keep
+            # the index above (which also serves created_at ranges)
+            models.Index(
+                fields=["tg", "-created_at"],
+                condition=models.Q(is_done=False),
+                name="task_tg_pending_idx",
+            ),
+            # ... AND NOT is_done AND due_at BETWEEN ?: a pending due window
+            # ("due today") is an index range, then a small sort
+            models.Index(
+                fields=["tg", "due_at"],
+                condition=models.Q(is_done=False),
+                name="task_tg_pending_due_idx",
+            ),
+            # Due-notification scans only ever look at pending tasks not yet
+            # notified; delivered ones leave the index even if never marked
+            # done. Claims still in flight stay until delivered (or re-claimed)
+            models.Index(
+                fields=["due_at"],
+                condition=models.Q(is_done=False, notified_at__isnull=True),
+                name="task_pending_due_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.title} (#{self.id})"
@@ -63,6 +126,32 @@ class TelegramAccount(models.Model):
                 setattr(tg_account, field, value)
             tg_account.save(update_fields=list(fields_to_update.keys()))
 
+    @staticmethod
+    def upsert(tg_data: dict) -> "TelegramAccount":
+        """
+        Create or refresh the account in one INSERT ... ON CONFLICT query (plus
+        a read-back when no username was sent, to return the stored one).
+        """
+        tg_account = TelegramAccount(
+            user_id=tg_data["user_id"],
+            chat_id=tg_data["chat_id"],
+            tg_username=tg_data.get("tg_username"),
+        )
+        update_fields = ["chat_id"]
+        # Same rule as update_if_different: never blank out a known username
+        if tg_account.tg_username:
+            update_fields.append("tg_username")
+        TelegramAccount.objects.bulk_create(
+            [tg_account],
+            update_conflicts=True,
+            unique_fields=["user_id"],
+            update_fields=update_fields,
+        )
+        if not tg_account.tg_username:
+            # The stored username was kept; return it rather than None
+            return TelegramAccount.objects.get(pk=tg_account.pk)
+        return tg_account
+
     # Unique identifier for the user in Telegram (editable=True for API compatibility)
     user_id = models.BigIntegerField(primary_key=True, default=0, editable=True)
     chat_id = models.BigIntegerField(null=False, blank=False, unique=True)
@@ -0,0 +1,157 @@
+"""
+Read-only row mappers for list pages: `.values()` rows in, exactly the dicts
+TaskSerializer / CategorySerializer produce out (same keys, order and
+formatting), without instantiating a serializer per task, category and
+Telegram account.
+
+Pages can be narrowed to some `fields` and relations left unexpanded (see
+ValuesListMixin): an unexpanded `tg` is the account's user id, unexpanded
+`categories` a list of category ids. Only the columns and joins the output
+needs are selected, and the category lookup is skipped without `categories`.
+
+Anything that changes those serializers' read output has to change here too;
+`RowMapperTests` compares both on the same data.
+"""
+
+from operator import itemgetter
+
+from django.utils import timezone
+
+from .models import Task
+
+ACCOUNT_VALUES = ("tg_id", "tg__chat_id", "tg__tg_username")
+
+CATEGORY_FIELDS = ("id", "name", "tg")
+CATEGORY_EXPANSIONS = ("tg",)
+TASK_FIELDS = (
+    "id",
+    "title",
+    "description",
+    "created_at",
+    "due_at",
+    "is_done",
+    "categories",
+    "tg",
+)
+TASK_EXPANSIONS = ("categories", "categories.tg", "tg")
+
+
+def _datetime(value, tz) -> str | None:
+    # DRF's DateTimeField with the default ISO 8601 DATETIME_FORMAT
+    if value is None:
+        return None
+    value = value.astimezone(tz).isoformat()
+    return value[:-6] + "Z" if value.endswith("+00:00") else value
+
+
+def _account(accounts: dict, user_id, chat_id, tg_username) -> dict | None:
+    # One dict per account per page; every row of a list shares the same one
+    if user_id is None:
+        return None
+    account = accounts.get(user_id)
+    if account is None:
+        account = accounts[user_id] = {
+            "user_id": user_id,
+            "chat_id": chat_id,
+            "tg_username": tg_username,
+        }
+    return account
+
+
+def _account_getter(accounts: dict, expanded: bool):
+    if not expanded:
+        return itemgetter("tg_id")
+    return lambda row: _account(
+        accounts, row["tg_id"], row["tg__chat_id"], row["tg__tg_username"]
+    )
+
+
+def _map(rows: list[dict], getters: dict, fields) -> list[dict]:
+    picked = [(name, getters[name]) for name in fields]
+    return [{name: get(row) for name, get in picked} for row in rows]
+
+
+def category_values(fields=CATEGORY_FIELDS, expand=CATEGORY_EXPANSIONS) -> tuple:
+    # `name` is the keyset position, so it is always selected
+    columns = ["id", "name"]
+    if "tg" in fields:
+        columns += ACCOUNT_VALUES if "tg" in expand else ["tg_id"]
+    return tuple(columns)
+
+
+def category_rows(
+    rows: list[dict], fields=CATEGORY_FIELDS, expand=CATEGORY_EXPANSIONS
+) -> list[dict]:
+    getters = {
+        "id": itemgetter("id"),
+        "name": itemgetter("name"),
+        "tg": _account_getter({}, "tg" in expand),
+    }
+    return _map(rows, getters, fields)
+
+
+def task_values(fields=TASK_FIELDS, expand=TASK_EXPANSIONS) -> tuple:
+    # `created_at` and `id` are the keyset position, so always selected
+    columns = ["id", "created_at"]
+    columns += [
+        name for name in ("title", "description", "due_at", "is_done") if name in fields
+    ]
+    if "tg" in fields:
+        columns += ACCOUNT_VALUES if "tg" in expand else ["tg_id"]
+    return tuple(columns)
+
+
+def task_links(task_ids, expand=TASK_EXPANSIONS) -> list[tuple]:
+    """
+    (task id, category id[, name, account columns]) for every category of the
+    given tasks: one query over the M2M table, in link order, joining only
+    what the expansion needs.
+    """
+    if not task_ids:
+        return []
+    columns = ["task_id", "category_id"]
+    if "categories" in expand:
+        columns.append("category__name")
+        if "categories.tg" in expand:
+            columns += [f"category__{column}" for column in ACCOUNT_VALUES]
+        else:
+            columns.append("category__tg_id")
+    return list(
+        Task.categories.through.objects.filter(task_id__in=task_ids)
+        .order_by("pk")
+        .values_list(*columns)
+    )
+
+
+def task_rows(
+    rows: list[dict],
+    fields=TASK_FIELDS,
+    expand=TASK_EXPANSIONS,
+    links: list[tuple] | None = None,
+) -> list[dict]:
+    """Tasks with their categories; `links` defaults to `task_links` of the page."""
+    tz = timezone.get_current_timezone()
+    accounts: dict = {}
+    getters = {
+        "id": itemgetter("id"),
+        "title": itemgetter("title"),
+        "description": itemgetter("description"),
+        "created_at": lambda row: _datetime(row["created_at"], tz),
+        "due_at": lambda row: _datetime(row["due_at"], tz),
+        "is_done": itemgetter("is_done"),
+        "tg": _account_getter(accounts, "tg" in expand),
+    }
+    if "categories" in fields:
+        if links is None:
+            links = task_links([row["id"] for row in rows], expand)
+        categories: dict = {row["id"]: [] for row in rows}
+        expanded, with_tg = "categories" in expand, "categories.tg" in expand
+        for task_id, category_id, *category in links:
+            if not expanded:
+                categories[task_id].append(category_id)
+                continue
+            name, user_id, *account = category
+            tg = _account(accounts, user_id, *account) if with_tg else user_id
+            categories[task_id].append({"id": category_id, "name": name, "tg": tg})
+        getters["categories"] = lambda row: categories[row["id"]]
+    return _map(rows, getters, fields)
@@ -0,0 +1,60 @@
+"""
+Task full-text search over the generated `Task.search_vector`, and fuzzy
+(pg_trgm) category name search. Both are scoped to one user by the caller
+and served by GIN indexes that lead with the owner (see the models).
+"""
+
+import re
+
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    TrigramWordSimilarity,
+)
+from django.db.models import F, FloatField, Q, QuerySet
+from django.db.models.functions import Cast
+
+from .models import Category, Task
+
+MAX_WORDS = 8
+_WORD = re.compile(r"\w+")
+
+
+def task_query(text: str) -> SearchQuery | None:
+    """
+    Every word of `text` as a prefix ("buy mil" finds "Buy milk"); None if
+    there are no words. Only \\w runs reach the tsquery, so user input can't
+    produce a syntax error.
+    """
+    words = _WORD.findall(text.lower())[:MAX_WORDS]
+    if not words:
+        return None
+    raw = " & ".join(f"{word}:*" for word in words)
+    return SearchQuery(raw, search_type="raw", config="simple")
+
+
+def search_tasks(queryset: QuerySet[Task], query: SearchQuery) -> QuerySet[Task]:
+    """
+    Matching tasks annotated with `rank`: float8, so the value a client gets
+    back in a cursor compares exactly equal to the one in the database.
+    """
+    return queryset.filter(search_vector=query).annotate(
+        rank=Cast(SearchRank(F("search_vector"), query), FloatField())
+    )
+
+
+def search_categories(queryset: QuerySet[Category], text: str) -> QuerySet[Category]:
+    """
+    Categories whose name is close to `text` as a whole (typos: "рабта") or
+    has a close word ("shop" for "Shopping list"), or contains it; most
+    similar first. All three conditions are served by gin_trgm_ops.
+    """
+    return (
+        queryset.filter(
+            Q(name__trigram_similar=text)
+            | Q(name__trigram_word_similar=text)
+            | Q(name__icontains=text)
+        )
+        .annotate(similarity=TrigramWordSimilarity(text, "name"))
+        .order_by("-similarity", "name")
+    )
@@ -1,11 +1,65 @@
 import hashlib
 import hmac
+import threading
 import time
+from collections import OrderedDict
+from functools import cache
 
+import redis
 from django.conf import settings
-from django.core.cache import cache
+from django.utils.module_loading import import_string
 from rest_framework.exceptions import AuthenticationFailed
 
+HMAC_MAX_SKEW = 300  # seconds; allow 5 min skew while debugging
+# A nonce must outlive every timestamp that is still accepted for it
+NONCE_TTL = 2 * HMAC_MAX_SKEW
+
+
+class NonceStore:
+    """Remembers HMAC nonces across the replay window."""
+
+    def add(self, key: str, ttl: int) -> bool:
+        """Record `key` for `ttl` seconds; False if it was already recorded."""
+        raise NotImplementedError
+
+
+class RedisNonceStore(NonceStore):
+    """Shared by every gunicorn worker; one atomic SET NX EX per request."""
+
+    def __init__(self, url: str | None = None):
+        self._redis = redis.Redis.from_url(url or settings.REDIS_URL)
+
+    def add(self, key: str, ttl: int) -> bool:
+        return bool(self._redis.set(key, 1, nx=True, ex=ttl))
+
+
+class InMemoryNonceStore(NonceStore):
+    """Per-process and size-bounded; for tests and single-process dev runs."""
+
+    def __init__(self, maxsize: int = 10_000):
+        self._maxsize = maxsize
+        self._expires: OrderedDict[str, float] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, key: str, ttl: int) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            # verify_hmac uses a single TTL, so the oldest insertions expire first
+            while self._expires and next(iter(self._expires.values())) <= now:
+                self._expires.popitem(last=False)
+            if self._expires.get(key, 0.0) > now:
+                return False
+            self._expires.pop(key, None)
+            self._expires[key] = now + ttl
+            if len(self._expires) > self._maxsize:
+                self._expires.popitem(last=False)
+            return True
+
+
+@cache
+def get_nonce_store() -> NonceStore:
+    return import_string(settings.BOT_HMAC_NONCE_STORE)()
+
 
 # Hash-Based Message Authentication Code (HMAC) Signing is an access token method
 # that adds another level of security by forcing the requesting client
@@ -22,14 +76,12 @@ def verify_hmac(request):
         ts = int(ts)
     except ValueError as err:
         raise AuthenticationFailed("HMAC: bad timestamp") from err
-    if abs(now - ts) > 300:  # allow 5 min skew while debugging
+    if abs(now - ts) > HMAC_MAX_SKEW:
         raise AuthenticationFailed("HMAC: stale")
 
-    # replay protection (120s window)
-    cache_key = f"bot_hmac:{ts}:{nonce}"
-    if cache.get(cache_key):
+    # replay protection, before any hashing so replays are rejected cheaply
+    if not get_nonce_store().add(f"bot_hmac:{ts}:{nonce}", NONCE_TTL):
         raise AuthenticationFailed("Replay detected")
-    cache.set(cache_key, 1, timeout=180)
 
     body = request.body or b""
     body_hash = hashlib.sha256(body).hexdigest()
@@ -1,9 +1,30 @@
+from collections import Counter
+
 from django.db import IntegrityError, transaction
+from django.db.models import QuerySet
+from django.utils import timezone
 from rest_framework import serializers
 
 from .models import Category, Task, TelegramAccount
 
 
+def categories_for(tg_account: TelegramAccount, category_ids) -> QuerySet[Category]:
+    """
+    Fetch the account's categories by id in one IN query (evaluated, with `tg`
+    joined) and reject ids that are unknown or belong to someone else.
+    """
+    ids = set(category_ids)
+    if not ids:
+        return Category.objects.none()
+    categories = Category.objects.filter(tg=tg_account, id__in=ids).select_related("tg")
+    missing = ids - {category.id for category in categories}
+    if missing:
+        raise serializers.ValidationError(
+            {"category_ids": f"Unknown categories: {sorted(missing)}"}
+        )
+    return categories
+
+
 class TelegramAccountSerializer(serializers.ModelSerializer):
     # need to access fields in input
     user_id = serializers.IntegerField(required=True)
@@ -13,10 +34,6 @@ class TelegramAccountSerializer(serializers.ModelSerializer):
         model = TelegramAccount
         fields = ["user_id", "chat_id", "tg_username"]
 
-    def validate(self, attrs):
-        print("DEBUG TG ATTRS:", attrs, flush=True)
-        return attrs
-
 
 class CategorySerializer(serializers.ModelSerializer):
     tg = TelegramAccountSerializer(required=False, allow_null=True)
@@ -25,10 +42,6 @@ class CategorySerializer(serializers.ModelSerializer):
         model = Category
         fields = ["id", "name", "tg"]
 
-    def validate(self, attrs):
-        print("DEBUG:", attrs, flush=True)
-        return super().validate(attrs)
-
     def create(self, validated_data):
         tg_data = validated_data.pop("tg", None)
         user_id = tg_data.get("user_id")
@@ -72,11 +85,9 @@ class CategorySerializer(serializers.ModelSerializer):
 class TaskSerializer(serializers.ModelSerializer):
     tg = TelegramAccountSerializer(required=False, allow_null=True)
     categories = CategorySerializer(many=True, read_only=True)
-    category_ids = serializers.PrimaryKeyRelatedField(
-        many=True,
-        write_only=True,
-        queryset=Category.objects.all(),
-        source="categories",  # maps to Task.categories m2m
+    # Resolved in one scoped IN query by `categories_for`, not id by id
+    category_ids = serializers.ListField(
+        child=serializers.IntegerField(), write_only=True
     )
 
     class Meta:
@@ -95,43 +106,247 @@ class TaskSerializer(serializers.ModelSerializer):
         read_only_fields = ["id", "created_at", "categories"]
 
     def create(self, validated_data):
-        categories = validated_data.pop("categories", [])
+        category_ids = validated_data.pop("category_ids", [])
         tg_data = validated_data.pop("tg", None)
+        if not tg_data:
+            raise serializers.ValidationError({"tg": ["This field is required."]})
 
-        # Find or create the TelegramAccount for this user
-        tg_account, _ = TelegramAccount.objects.get_or_create(
-            user_id=tg_data["user_id"],
-            defaults={
-                "chat_id": tg_data["chat_id"],
-                "tg_username": tg_data.get("tg_username"),
-            },
-        )
-
-        # If account exists but fields differ, update them
-        TelegramAccount.update_if_different(tg_account, tg_data)
-
-        task = Task.objects.create(tg=tg_account, **validated_data)
-        if categories:
-            task.categories.set(categories)
+        with transaction.atomic():
+            tg_account = TelegramAccount.upsert(tg_data)
+            categories = categories_for(tg_account, category_ids)
+            task = Task.objects.create(tg=tg_account, **validated_data)
+            Task.categories.through.objects.bulk_create(
+                Task.categories.through(task_id=task.id, category_id=category.id)
+                for category in categories
+            )
 
+        # The fetched categories double as the prefetch cache for the response
+        task._prefetched_objects_cache = {"categories": categories}
         return task
 
     def update(self, instance, validated_data):
-        categories = validated_data.pop("categories", None)
+        category_ids = validated_data.pop("category_ids", None)
         tg_data = validated_data.pop("tg", None)
 
-        if tg_data:
-            tg_account, _ = TelegramAccount.objects.get_or_create(
-                user_id=tg_data["user_id"],
-                defaults={
-                    "chat_id": tg_data["chat_id"],
-                    "tg_username": tg_data.get("tg_username"),
-                },
+        with transaction.atomic():
+            if tg_data:
+                instance.tg = TelegramAccount.upsert(tg_data)
+
+            if category_ids is not None:
+                # categories_for(None, ...) would accept ownerless categories
+                if instance.tg_id is None:
+                    raise serializers.ValidationError(
+                        {"tg": ["Required to set category_ids on this task."]}
+                    )
+                instance.categories.set(categories_for(instance.tg, category_ids))
+
+            if validated_data.get("due_at", instance.due_at) != instance.due_at:
+                # Reschedule the reminder
+                instance.notify_claimed_at = instance.notified_at = None
+
+            return super().update(instance, validated_data)
+
+
+class TaskListFilterSerializer(serializers.Serializer):
+    """
+    Query parameters of GET /api/tasks/, all optional and combined with AND:
+    `is_done`, `due_after`/`due_before` and `created_after`/`created_before`
+    (inclusive ISO 8601 bounds), `category` (id) and `overdue` (pending
+    tasks past their due time). `filter` applies them in the same query.
+    """
+
+    is_done = serializers.BooleanField(required=False)
+    overdue = serializers.BooleanField(required=False)
+    due_after = serializers.DateTimeField(required=False)
+    due_before = serializers.DateTimeField(required=False)
+    created_after = serializers.DateTimeField(required=False)
+    created_before = serializers.DateTimeField(required=False)
+    category = serializers.IntegerField(required=False)
+
+    def validate(self, attrs):
+        for field in ("due", "created"):
+            after, before = attrs.get(f"{field}_after"), attrs.get(f"{field}_before")
+            if after and before and after > before:
+                raise serializers.ValidationError(
+                    {f"{field}_after": f"Must not be later than {field}_before."}
+                )
+        return attrs
+
+    def filter(self, queryset: QuerySet[Task]) -> QuerySet[Task]:
+        lookups = {
+            "is_done": "is_done",
+            "due_after": "due_at__gte",
+            "due_before": "due_at__lte",
+            "created_after": "created_at__gte",
+            "created_before": "created_at__lte",
+            # Matches on the M2M table alone; (task, category) pairs are unique
+            "category": "categories",
+        }
+        data = self.validated_data
+        queryset = queryset.filter(
+            **{lookups[name]: value for name, value in data.items() if name in lookups}
+        )
+        if data.get("overdue") is True:
+            queryset = queryset.filter(is_done=False, due_at__lt=timezone.now())
+        elif data.get("overdue") is False:
+            queryset = queryset.exclude(is_done=False, due_at__lt=timezone.now())
+        return queryset
+
+
+class TaskBulkCreateSerializer(serializers.ModelSerializer):
+    category_ids = serializers.ListField(
+        child=serializers.IntegerField(), required=False, default=list
+    )
+
+    class Meta:
+        model = Task
+        fields = ["title", "description", "due_at", "is_done", "category_ids"]
+
+
+class TaskBulkUpdateSerializer(serializers.ModelSerializer):
+    id = serializers.IntegerField()
+    category_ids = serializers.ListField(
+        child=serializers.IntegerField(), required=False
+    )
+
+    class Meta:
+        model = Task
+        fields = ["id", "title", "description", "due_at", "is_done", "category_ids"]
+        extra_kwargs = {"title": {"required": False}}
+
+
+class TaskBulkSerializer(serializers.Serializer):
+    """
+    A batch of task operations for one Telegram account, applied in a single
+    transaction with bulk queries. `save()` returns a dict with the created
+    and updated Task instances and the completed/deleted counts.
+    """
+
+    MAX_OPERATIONS = 500
+
+    def get_fields(self):
+        # Declared here: class attributes named create/update would shadow
+        # the Serializer methods of the same name.
+        return {
+            "tg": TelegramAccountSerializer(),
+            "create": TaskBulkCreateSerializer(many=True, required=False, default=list),
+            "update": TaskBulkUpdateSerializer(many=True, required=False, default=list),
+            "complete": serializers.ListField(
+                child=serializers.IntegerField(), required=False, default=list
+            ),
+            "delete": serializers.ListField(
+                child=serializers.IntegerField(), required=False, default=list
+            ),
+        }
+
+    def validate(self, attrs):
+        total = sum(
+            len(attrs[key]) for key in ("create", "update", "complete", "delete")
+        )
+        if total > self.MAX_OPERATIONS:
+            raise serializers.ValidationError(
+                f"At most {self.MAX_OPERATIONS} operations per request, got {total}."
             )
-            TelegramAccount.update_if_different(tg_account, tg_data)
-            instance.tg = tg_account
+        # One operation per task: a repeated id would relink categories twice
+        # (duplicate M2M rows) or update a task that the same batch deletes
+        ids = {
+            "update": [item["id"] for item in attrs["update"]],
+            "complete": attrs["complete"],
+            "delete": attrs["delete"],
+        }
+        errors = {}
+        for key, key_ids in ids.items():
+            repeated = sorted(i for i, n in Counter(key_ids).items() if n > 1)
+            if repeated:
+                errors[key] = [f"Repeated task ids: {repeated}"]
+        for key, other in (
+            ("update", "complete"),
+            ("update", "delete"),
+            ("complete", "delete"),
+        ):
+            shared = sorted(set(ids[key]) & set(ids[other]))
+            if shared:
+                errors.setdefault(other, []).append(f"Task ids also in {key}: {shared}")
+        if errors:
+            raise serializers.ValidationError(errors)
+        return attrs
+
+    def create(self, validated_data):
+        tg_data = validated_data["tg"]
+        to_create = validated_data["create"]
+        to_update = validated_data["update"]
+        through = Task.categories.through
+
+        with transaction.atomic():
+            tg_account = TelegramAccount.upsert(tg_data)
+            # One scoped IN query for every category the batch references
+            categories_for(
+                tg_account,
+                (
+                    cid
+                    for item in to_create + to_update
+                    for cid in item.get("category_ids", [])
+                ),
+            )
+
+            update_ids = [item["id"] for item in to_update]
+            existing = Task.objects.select_for_update().in_bulk(update_ids)
+            missing = [
+                task_id
+                for task_id in update_ids
+                if task_id not in existing or existing[task_id].tg_id != tg_account.pk
+            ]
+            if missing:
+                raise serializers.ValidationError(
+                    {"update": f"Unknown tasks: {missing}"}
+                )
+
+            created = [
+                Task(
+                    tg=tg_account,
+                    **{k: v for k, v in item.items() if k != "category_ids"},
+                )
+                for item in to_create
+            ]
+            Task.objects.bulk_create(created)
+
+            updated, update_fields = [], set()
+            for item in to_update:
+                task = existing[item["id"]]
+                if item.get("due_at", task.due_at) != task.due_at:
+                    # Reschedule the reminder
+                    task.notify_claimed_at = task.notified_at = None
+                    update_fields.update(("notify_claimed_at", "notified_at"))
+                for field, value in item.items():
+                    if field not in ("id", "category_ids"):
+                        setattr(task, field, value)
+                        update_fields.add(field)
+                updated.append(task)
+            if update_fields:
+                Task.objects.bulk_update(updated, sorted(update_fields))
+
+            # Replace M2M rows for updated tasks, then one insert for everything
+            relinked = [item["id"] for item in to_update if "category_ids" in item]
+            through.objects.filter(task_id__in=relinked).delete()
+            links = [
+                through(task_id=task.id, category_id=cid)
+                for task, item in zip(
+                    created + updated, to_create + to_update, strict=True
+                )
+                for cid in dict.fromkeys(item.get("category_ids", []))
+            ]
+            through.objects.bulk_create(links)
 
-        if categories is not None:
-            instance.categories.set(categories)
+            completed = Task.objects.filter(
+                tg=tg_account, id__in=validated_data["complete"]
+            ).update(is_done=True)
+            _, deleted = Task.objects.filter(
+                tg=tg_account, id__in=validated_data["delete"]
+            ).delete()
 
-        return super().update(instance, validated_data)
+        return {
+            "created": created,
+            "updated": updated,
+            "completed": completed,
+            "deleted": deleted.get(Task._meta.label, 0),
+        }
@@ -1,18 +1,187 @@
 import logging
-from datetime import datetime
-from typing import cast
+from collections import defaultdict
+from collections.abc import Iterable
+from datetime import timedelta
 
 import requests
 from celery import shared_task
 from celery.app.task import Task as CeleryTask
 from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
 from django.utils import timezone
 
+from .cache import invalidate_lists
 from .models import Task
+from .telegram import get_telegram_client
 
 logger = logging.getLogger(__name__)
 
 
+# Due reminders are not queued per task. `Task.due_at` (partial index on
+# pending tasks) is the schedule: celery beat runs `dispatch_due_notifications`
+# every DUE_NOTIFICATION_POLL_SECONDS, which claims what is due and hands it to
+# workers in batches. Cancelling or rescheduling is just a row update, and the
+# broker never holds far-future ETA messages. A claim is a lease: delivery sets
+# `notified_at`, and claims still without it after DUE_NOTIFICATION_LEASE_SECONDS
+# (publish failed, job ran out of retries) are claimed again.
+
+
+MAX_MESSAGE_LENGTH = 4096  # Telegram's limit, in UTF-16 code units
+MAX_DESCRIPTION_LENGTH = 300  # descriptions are unbounded; reminders quote a snippet
+
+
+def _length(text: str) -> int:
+    return len(text.encode("utf-16-le")) // 2
+
+
+def _due_header(count: int) -> str:
+    return "⏰ Task due now:" if count == 1 else f"⏰ {count} tasks due now:"
+
+
+def _due_entry(task: Task) -> str:
+    description = task.description
+    if len(description) > MAX_DESCRIPTION_LENGTH:
+        description = description[: MAX_DESCRIPTION_LENGTH - 1].rstrip() + "…"
+    return (
+        f"Title: {task.title}\n"
+        f"Description: {description}\n"
+        f"Created: {timezone.localtime(task.created_at).strftime('%Y-%m-%d %H:%M')}"
+    )
+
+
+def _due_text(entries: list[str]) -> str:
+    return f"{_due_header(len(entries))}\n" + "\n\n".join(entries)
+
+
+def _due_messages(tasks: list[Task]) -> list[tuple[list[Task], str]]:
+    """
+    Pack one chat's reminders into as few messages as fit Telegram's length
+    limit, by rendered length. Every entry is bounded (255-char title,
+    description snippet), so a single one always fits.
+    """
+    messages: list[tuple[list[Task], str]] = []
+    group: list[Task] = []
+    entries: list[str] = []
+    body = 0  # length of the entries joined so far
+    for task in tasks:
+        entry = _due_entry(task)
+        grown = body + (2 if entries else 0) + _length(entry)
+        header = _length(_due_header(len(entries) + 1)) + 1
+        if entries and header + grown > MAX_MESSAGE_LENGTH:
+            messages.append((group, _due_text(entries)))
+            group, entries, grown = [], [], _length(entry)
+        group.append(task)
+        entries.append(entry)
+        body = grown
+    if entries:
+        messages.append((group, _due_text(entries)))
+    return messages
+
+
+def deliver_due_notifications(tasks: Iterable[Task]) -> int:
+    """
+    Send due reminders packed into as few messages per chat as fit, through
+    the pooled, rate-limited Telegram client, marking each chat's tasks done
+    and notified as it goes.
+    Returns the number of messages Telegram accepted.
+    """
+    by_chat: dict[int, list[Task]] = defaultdict(list)
+    unreachable = []
+    for task in tasks:
+        if task.tg and task.tg.chat_id:
+            by_chat[task.tg.chat_id].append(task)
+        else:
+            unreachable.append(task.id)
+    if unreachable:
+        # Nobody to tell; mark them handled so due scans stop finding them
+        Task.objects.filter(id__in=unreachable, notified_at__isnull=True).update(
+            notified_at=timezone.now()
+        )
+
+    client = get_telegram_client()
+    delivered = 0
+    for chat_id, chat_tasks in by_chat.items():
+        for group, text in _due_messages(chat_tasks):
+            delivered += client.send_message(chat_id, text)
+            # Done even if Telegram refused (blocked bot, unknown chat):
+            # those never succeed on retry. Network/5xx errors raise instead,
+            # leaving notified_at unset for a retry or a later re-claim.
+            Task.objects.filter(id__in=[t.id for t in group], is_done=False).update(
+                is_done=True, notified_at=timezone.now()
+            )
+            invalidate_lists(group[0].tg_id)
+    return delivered
+
+
+def _claimable(now) -> Q:
+    """Due, not yet notified, and not under a live claim."""
+    lease_start = now - timedelta(seconds=settings.DUE_NOTIFICATION_LEASE_SECONDS)
+    return Q(is_done=False, notified_at__isnull=True, due_at__lte=now) & (
+        Q(notify_claimed_at__isnull=True) | Q(notify_claimed_at__lt=lease_start)
+    )
+
+
+def _delivery_jobs(claimed: list[tuple[int, int]], size: int) -> list[list[int]]:
+    """Pack task ids into jobs of ~`size`, never splitting one account's tasks."""
+    by_account: dict[int, list[int]] = defaultdict(list)
+    for task_id, tg_id in claimed:
+        by_account[tg_id].append(task_id)
+
+    jobs: list[list[int]] = [[]]
+    for task_ids in by_account.values():
+        if jobs[-1] and len(jobs[-1]) + len(task_ids) > size:
+            jobs.append([])
+        jobs[-1].extend(task_ids)
+    return [job for job in jobs if job]
+
+
+@shared_task(name="tasks.dispatch_due_notifications")
+def dispatch_due_notifications() -> int:
+    """Claim every pending task that is due and queue it for delivery."""
+    now = timezone.now()
+    batch_size = settings.DUE_NOTIFICATION_BATCH_SIZE
+    dispatched = 0
+    while True:
+        with transaction.atomic():
+            # skip_locked lets overlapping beats/replicas claim disjoint rows
+            claimed = list(
+                Task.objects.select_for_update(skip_locked=True)
+                .filter(_claimable(now))
+                .order_by("due_at")
+                .values_list("id", "tg_id")[:batch_size]
+            )
+            Task.objects.filter(id__in=[task_id for task_id, _ in claimed]).update(
+                notify_claimed_at=now
+            )
+
+        for job in _delivery_jobs(claimed, settings.DUE_NOTIFICATION_DELIVERY_CHUNK):
+            notify_tasks_due.delay(job)
+        dispatched += len(claimed)
+        if len(claimed) < batch_size:
+            break
+
+    if dispatched:
+        logger.info("Dispatched %s due notifications", dispatched)
+    return dispatched
+
+
+@shared_task(
+    bind=True,
+    name="tasks.notify_tasks_due",
+    autoretry_for=(requests.RequestException,),
+    retry_backoff=True,
+    retry_kwargs={"max_retries": 5},
+)
+def notify_tasks_due(_: CeleryTask, task_ids: list[int]) -> None:
+    # notified_at: a re-claim after an expired lease may have delivered first
+    deliver_due_notifications(
+        Task.objects.filter(id__in=task_ids, is_done=False, notified_at__isnull=True)
+        .select_related("tg")
+        .order_by("due_at", "id")
+    )
+
+
 @shared_task(
     bind=True,
     name="tasks.notify_task_due",
@@ -21,40 +190,13 @@ logger = logging.getLogger(__name__)
     retry_kwargs={"max_retries": 5},
 )
 def notify_task_due(_: CeleryTask, task_id: int) -> None:
+    """Kept for ETA messages enqueued before the due-time scheduler existed."""
     logger.info(f"notify_task_due called for task_id={task_id}")
-    logger.info(f"Current time: {timezone.localtime()}")
-    try:
-        task = Task.objects.get(id=task_id)
-        if task.is_done:
-            return
-        tg_account = task.tg
-        if tg_account and tg_account.chat_id:
-            text = (
-                f"⏰ Task due now:\n"
-                f"Title: {task.title}\n"
-                f"Description: {task.description}\n"
-                f"Created: {timezone.localtime(task.created_at).strftime('%Y-%m-%d %H:%M')}"
-            )
-            requests.post(
-                f"https://api.telegram.org/bot{settings.TELEGRAM_BOT_TOKEN}/sendMessage",
-                json={"chat_id": tg_account.chat_id, "text": text},
-                timeout=5,
-            )
-            Task.objects.filter(id=task_id, is_done=False).update(is_done=True)
-    except Task.DoesNotExist:
-        pass
-
-
-def schedule_due_notification(task_id: int, due_at: datetime) -> None:
-    if due_at.tzinfo is None:
-        due_at = timezone.make_aware(due_at, timezone.get_current_timezone())
-    eta_utc = timezone.localtime(due_at)
-    logger.info(
-        f"Scheduling notify_task_due for task_id={task_id} at {eta_utc} ({timezone.get_current_timezone_name()})",
-    )
-    now_utc = timezone.localtime()
-    logger.info(f"Current time: {now_utc} ({timezone.get_current_timezone_name()})")
-    if eta_utc < now_utc:
-        eta_utc = now_utc
-    task_obj = cast(CeleryTask, notify_task_due)
-    task_obj.apply_async(args=[task_id], eta=eta_utc)
+    # Claim it like the dispatcher does, so the two never both send it. Stale
+    # (nothing claimed) if completed, cleared, moved or already notified.
+    now = timezone.now()
+    if not Task.objects.filter(_claimable(now), id=task_id).update(
+        notify_claimed_at=now
+    ):
+        return
+    deliver_due_notifications(Task.objects.select_related("tg").filter(id=task_id))
@@ -0,0 +1,123 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """Classic token bucket: `rate` tokens per second, bursts up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: float | None = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Take one token; return how long the caller must wait before using it."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.capacity, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+
+class TelegramClient:
+    """
+    sendMessage over one pooled HTTP session, throttled by a global and a
+    per-chat token bucket. 429 answers are retried after Telegram's
+    `retry_after`; other client errors (blocked bot, unknown chat) are logged
+    and reported as undelivered, server errors raise for Celery to retry.
+
+    Limits are per process: split TELEGRAM_GLOBAL_RATE across worker processes.
+    """
+
+    MAX_TRACKED_CHATS = 10_000
+
+    def __init__(
+        self,
+        token: str,
+        api_base: str = "https://api.telegram.org",
+        global_rate: float = 25.0,
+        chat_rate: float = 1.0,
+        max_retries: int = 3,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self._url = f"{api_base.rstrip('/')}/bot{token}/sendMessage"
+        self._chat_rate = chat_rate
+        self._global = TokenBucket(global_rate)
+        self._chats: OrderedDict[int, TokenBucket] = OrderedDict()
+        self._max_retries = max_retries
+        self._sleep = sleep
+
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=4)
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
+
+    def _chat_bucket(self, chat_id: int) -> TokenBucket:
+        bucket = self._chats.pop(chat_id, None) or TokenBucket(self._chat_rate, 1.0)
+        self._chats[chat_id] = bucket
+        if len(self._chats) > self.MAX_TRACKED_CHATS:
+            self._chats.popitem(last=False)
+        return bucket
+
+    def _throttle(self, chat_id: int) -> None:
+        wait = max(self._chat_bucket(chat_id).reserve(), self._global.reserve())
+        if wait > 0:
+            self._sleep(wait)
+
+    def send_message(self, chat_id: int, text: str) -> bool:
+        for _ in range(self._max_retries + 1):
+            self._throttle(chat_id)
+            r = self._session.post(
+                self._url, json={"chat_id": chat_id, "text": text}, timeout=5
+            )
+            if r.status_code == 429:
+                retry_after = r.json().get("parameters", {}).get("retry_after", 1)
+                logger.warning(
+                    "Telegram 429 for chat %s; retry in %ss", chat_id, retry_after
+                )
+                self._sleep(float(retry_after))
+                continue
+            if 400 <= r.status_code < 500:
+                logger.warning(
+                    "Telegram rejected message to chat %s: %s %s",
+                    chat_id,
+                    r.status_code,
+                    r.text,
+                )
+                return False
+            r.raise_for_status()
+            return True
+        raise requests.HTTPError(f"Telegram still rate limiting chat {chat_id}")
+
+    def close(self) -> None:
+        self._session.close()
+
+
+_client: TelegramClient | None = None
+
+
+def get_telegram_client() -> TelegramClient:
+    """One client per worker process, created lazily (after the fork)."""
+    global _client
+    if _client is None:
+        _client = TelegramClient(
+            token=settings.TELEGRAM_BOT_TOKEN,
+            api_base=settings.TELEGRAM_API_BASE,
+            global_rate=settings.TELEGRAM_GLOBAL_RATE,
+            chat_rate=settings.TELEGRAM_CHAT_RATE,
+        )
+    return _client
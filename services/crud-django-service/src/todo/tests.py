@@ -1,3 +1,902 @@
-from django.test import TestCase
+import datetime
+import hashlib
+import hmac
+import io
+import json
+import threading
+import time
+from decimal import Decimal
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock, skipUnless
 
-# Create your tests here.
+import requests
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import connection
+from django.test import (
+    RequestFactory,
+    SimpleTestCase,
+    TestCase,
+    TransactionTestCase,
+    override_settings,
+)
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.exceptions import AuthenticationFailed, ParseError, ValidationError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient, APIRequestFactory, force_authenticate
+
+from .api.renderers import ORJSONParser, ORJSONRenderer
+from .cache import list_cache_lookups
+from .instrumentation import fingerprint, request_queries
+from .models import Category, Task, TelegramAccount
+from .rows import category_rows, category_values, task_rows, task_values
+from .security import (
+    InMemoryNonceStore,
+    get_nonce_store,
+    verify_hmac,
+)
+from .serializers import (
+    CategorySerializer,
+    TaskListFilterSerializer,
+    TaskSerializer,
+)
+from .tasks import (
+    deliver_due_notifications,
+    dispatch_due_notifications,
+    notify_task_due,
+    notify_tasks_due,
+)
+from .telegram import TelegramClient
+from .views import TelegramAccountViewSet
+
+
+@skipUnless(connection.vendor == "postgresql", "EXPLAIN output is Postgres-specific")
+class HotQueryIndexTests(TestCase):
+    """The per-user list and due-scan query shapes must hit their indexes."""
+
+    @classmethod
+    def setUpTestData(cls):
+        tg = TelegramAccount.objects.create(user_id=1, chat_id=1)
+        Category.objects.create(name="home", tg=tg)
+        Task.objects.create(title="Buy milk", tg=tg, due_at=timezone.now())
+
+    def explain(self, queryset) -> str:
+        # Tiny test tables are always cheapest to seq-scan; rule that plan out
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+        return queryset.explain()
+
+    def test_task_list_uses_tg_created_index(self):
+        qs = (
+            Task.objects.filter(tg__user_id=1)
+            .select_related("tg")
+            .order_by("-created_at")
+        )
+        self.assertIn("task_tg_created_idx", self.explain(qs))
+
+    def test_keyset_page_is_an_index_range(self):
+        qs = Task.objects.filter(tg__user_id=1, id__lt=2**62).order_by("-id")[:11]
+        plan = self.explain(qs)
+        self.assertIn("task_tg_id_idx", plan)
+        self.assertRegex(plan, r"Index Cond: .*id <")
+
+    def test_category_list_uses_tg_name_index(self):
+        qs = (
+            Category.objects.filter(tg__user_id=1).select_related("tg").order_by("name")
+        )
+        self.assertIn("category_tg_name_idx", self.explain(qs))
+
+    def test_due_scan_uses_partial_index(self):
+        qs = Task.objects.filter(
+            is_done=False, notified_at__isnull=True, due_at__lte=timezone.now()
+        )
+        self.assertIn("task_pending_due_idx", self.explain(qs))
+
+    def filtered(self, **params):
+        filters = TaskListFilterSerializer(data=params)
+        filters.is_valid(raise_exception=True)
+        return filters.filter(
+            Task.objects.filter(tg__user_id=1).order_by("-created_at")
+        )
+
+    def test_pending_filter_uses_tg_pending_index(self):
+        qs = self.filtered(is_done="false")
+        self.assertIn("task_tg_pending_idx", self.explain(qs))
+
+    def test_overdue_filter_uses_tg_pending_index(self):
+        qs = self.filtered(overdue="true")
+        self.assertIn("task_tg_pending_idx", self.explain(qs))
+
+    def test_pending_due_window_is_an_index_range(self):
+        now = timezone.now()
+        qs = self.filtered(
+            is_done="false",
+            due_after=(now - datetime.timedelta(days=1)).isoformat(),
+            due_before=now.isoformat(),
+        )
+        # In due order, which the index also provides: on a tiny table other
+        # indexes of (tg, ...) tie with it when the query is unordered
+        plan = self.explain(qs.order_by("due_at"))
+        self.assertIn("task_tg_pending_due_idx", plan)
+        self.assertRegex(plan, r"Index Cond: .*due_at >=")
+
+    def test_created_window_is_an_index_range(self):
+        qs = self.filtered(created_after=timezone.now().isoformat())
+        plan = self.explain(qs)
+        self.assertIn("task_tg_created_idx", plan)
+        self.assertRegex(plan, r"Index Cond: .*created_at >=")
+
+
+@skipUnless(connection.vendor == "postgresql", "Search is Postgres-specific")
+class SearchTests(TransactionTestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(get_user_model().objects.create(username="bot"))
+        tg = TelegramAccount.objects.create(user_id=1, chat_id=1)
+        other = TelegramAccount.objects.create(user_id=2, chat_id=2)
+        Task.objects.create(title="Call mom", description="and buy milk", tg=tg)
+        Task.objects.create(title="Buy milk", tg=tg)
+        Task.objects.create(title="Milk and cookies", tg=tg)
+        Task.objects.create(title="Buy milk", tg=other)
+        Category.objects.create(name="Работа", tg=tg)
+        Category.objects.create(name="home", tg=tg)
+        Category.objects.create(name="Работа", tg=other)
+
+    def search(self, resource: str, q: str, **params):
+        url = reverse(f"{resource}-search")
+        return self.client.get(url, {"tg_user_id": 1, "q": q, **params})
+
+    def test_titles_outrank_descriptions(self):
+        results = self.search("task", "milk", fields="title").json()["results"]
+        self.assertEqual(
+            [t["title"] for t in results], ["Milk and cookies", "Buy milk", "Call mom"]
+        )
+
+    def test_words_match_as_prefixes(self):
+        results = self.search("task", "bu MIL").json()["results"]
+        self.assertEqual({t["title"] for t in results}, {"Buy milk", "Call mom"})
+
+    def test_keyset_pages_cover_results_once(self):
+        titles, response = [], self.search("task", "milk", page_size=1).json()
+        while True:
+            titles += [t["title"] for t in response["results"]]
+            if not response["next"]:
+                break
+            response = self.client.get(response["next"]).json()
+        self.assertEqual(titles, ["Milk and cookies", "Buy milk", "Call mom"])
+
+    def test_bad_input_is_rejected(self):
+        self.assertEqual(self.search("task", " ?! ").status_code, 400)
+        self.assertEqual(self.search("task", "milk", cursor="x").status_code, 404)
+
+    def test_category_names_match_fuzzily(self):
+        results = self.search("category", "рабта").json()["results"]
+        self.assertEqual(
+            [(c["name"], c["tg"]["user_id"]) for c in results], [("Работа", 1)]
+        )
+        results = self.search("category", "hom", fields="name").json()["results"]
+        self.assertEqual(results, [{"name": "home"}])
+
+
+class TaskListFilterTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        tg = TelegramAccount.objects.create(user_id=1, chat_id=1)
+        cls.home = Category.objects.create(name="home", tg=tg)
+        now = timezone.now()
+        cls.overdue = Task.objects.create(
+            title="overdue", tg=tg, due_at=now - datetime.timedelta(hours=1)
+        )
+        cls.overdue.categories.add(cls.home)
+        cls.done = Task.objects.create(
+            title="done", tg=tg, is_done=True, due_at=now - datetime.timedelta(hours=1)
+        )
+        cls.upcoming = Task.objects.create(
+            title="upcoming", tg=tg, due_at=now + datetime.timedelta(days=1)
+        )
+        cls.undated = Task.objects.create(title="undated", tg=tg)
+
+    def titles(self, **params) -> set[str]:
+        filters = TaskListFilterSerializer(data=params)
+        filters.is_valid(raise_exception=True)
+        return set(filters.filter(Task.objects.all()).values_list("title", flat=True))
+
+    def test_overdue_is_pending_and_past_due(self):
+        self.assertEqual(self.titles(overdue="1"), {"overdue"})
+        self.assertEqual(self.titles(overdue="0"), {"done", "upcoming", "undated"})
+
+    def test_filters_combine(self):
+        now = timezone.now().isoformat()
+        self.assertEqual(self.titles(due_before=now, is_done="false"), {"overdue"})
+        self.assertEqual(self.titles(category=self.home.id), {"overdue"})
+        self.assertEqual(self.titles(due_after=now), {"upcoming"})
+
+    def test_inverted_range_is_rejected(self):
+        filters = TaskListFilterSerializer(
+            data={"created_after": "2025-08-21T00:00Z", "created_before": "2025-08-20"}
+        )
+        self.assertFalse(filters.is_valid())
+        self.assertIn("created_after", filters.errors)
+
+
+@override_settings(LIST_CACHE_ALIAS="default")
+class TaskBulkTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.tg = TelegramAccount.objects.create(user_id=1, chat_id=1)
+        cls.home = Category.objects.create(name="home", tg=cls.tg)
+        cls.work = Category.objects.create(name="work", tg=cls.tg)
+        cls.edit, cls.finish, cls.drop = (
+            Task.objects.create(title=title, tg=cls.tg)
+            for title in ("edit", "finish", "drop")
+        )
+        other = TelegramAccount.objects.create(user_id=2, chat_id=2)
+        cls.foreign = Task.objects.create(title="foreign", tg=other)
+        cls.foreign_category = Category.objects.create(name="theirs", tg=other)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(get_user_model().objects.create(username="bot"))
+
+    def bulk(self, **operations):
+        payload = {"tg": {"user_id": 1, "chat_id": 1}, **operations}
+        return self.client.post(reverse("task-bulk"), payload, format="json")
+
+    def test_applies_every_operation(self):
+        response = self.bulk(
+            create=[{"title": "new", "category_ids": [self.home.id]}],
+            update=[
+                {"id": self.edit.id, "title": "edited", "category_ids": [self.work.id]}
+            ],
+            complete=[self.finish.id],
+            delete=[self.drop.id],
+        )
+
+        self.assertEqual(response.status_code, 200, response.content)
+        body = response.json()
+        self.assertEqual(body["created"][0]["title"], "new")
+        self.assertEqual(body["created"][0]["categories"][0]["id"], self.home.id)
+        self.assertEqual(body["updated"][0]["title"], "edited")
+        self.assertEqual(body["updated"][0]["categories"][0]["id"], self.work.id)
+        self.assertEqual((body["completed"], body["deleted"]), (1, 1))
+        self.finish.refresh_from_db()
+        self.assertTrue(self.finish.is_done)
+        self.assertFalse(Task.objects.filter(id=self.drop.id).exists())
+
+    def test_foreign_and_unknown_ids(self):
+        for operations in (
+            {"update": [{"id": self.foreign.id, "title": "mine"}]},
+            {"update": [{"id": 1, "title": "ghost"}]},
+            {"create": [{"title": "x", "category_ids": [self.foreign_category.id]}]},
+        ):
+            with self.subTest(operations=operations):
+                self.assertEqual(self.bulk(**operations).status_code, 400)
+
+        # complete/delete only ever touch the account's own tasks
+        response = self.bulk(complete=[self.foreign.id], delete=[self.foreign.id])
+        self.assertEqual(response.status_code, 400)  # the same id twice
+        response = self.bulk(complete=[self.foreign.id], delete=[1])
+        self.assertEqual(response.json()["completed"], 0)
+        self.assertEqual(response.json()["deleted"], 0)
+        self.foreign.refresh_from_db()
+        self.assertEqual((self.foreign.title, self.foreign.is_done), ("foreign", False))
+
+    def test_conflicting_ids_are_rejected(self):
+        edit = {"id": self.edit.id, "category_ids": [self.home.id]}
+        for operations, field in (
+            ({"update": [edit, edit]}, "update"),
+            ({"delete": [self.drop.id, self.drop.id]}, "delete"),
+            ({"update": [edit], "delete": [self.edit.id]}, "delete"),
+            ({"update": [edit], "complete": [self.edit.id]}, "complete"),
+            ({"complete": [self.drop.id], "delete": [self.drop.id]}, "delete"),
+        ):
+            with self.subTest(operations=operations):
+                response = self.bulk(**operations)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn(field, response.json())
+        self.assertTrue(Task.objects.filter(id=self.edit.id, title="edit").exists())
+
+
+@override_settings(LIST_CACHE_ALIAS="default")
+class TaskDetailScopeTests(TestCase):
+    """Detail actions act for the `tg_user_id` user, like lists."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.mine = Task.objects.create(
+            title="mine", tg=TelegramAccount.objects.create(user_id=1, chat_id=1)
+        )
+        cls.theirs = Task.objects.create(
+            title="theirs", tg=TelegramAccount.objects.create(user_id=2, chat_id=2)
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(get_user_model().objects.create(username="bot"))
+
+    def url(self, task: Task, **params) -> str:
+        query = "&".join(f"{key}={value}" for key, value in params.items())
+        return f"{reverse('task-detail', args=[task.id])}?{query}"
+
+    def test_owner_can_patch_and_delete(self):
+        response = self.client.patch(
+            self.url(self.mine, tg_user_id=1), {"is_done": True}, format="json"
+        )
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertTrue(response.json()["is_done"])
+
+        response = self.client.delete(self.url(self.mine, tg_user_id=1))
+        self.assertEqual(response.status_code, 204)
+
+    def test_other_users_tasks_are_not_found(self):
+        response = self.client.delete(self.url(self.theirs, tg_user_id=1))
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(self.client.delete(self.url(self.theirs)).status_code, 400)
+        self.assertTrue(Task.objects.filter(id=self.theirs.id).exists())
+
+
+@override_settings(LIST_CACHE_ALIAS="default")
+class TaskWriteQueryBudgetTests(TransactionTestCase):
+    """TaskSerializer writes must not grow with the number of categories."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(get_user_model().objects.create(username="bot"))
+        self.tg_data = {"user_id": 1, "chat_id": 1, "tg_username": "alice"}
+        tg = TelegramAccount.objects.create(**self.tg_data)
+        self.category_ids = [
+            Category.objects.create(name=f"cat-{i}", tg=tg).id for i in range(5)
+        ]
+
+    def test_create_with_categories_has_fixed_query_budget(self):
+        payload = {
+            "title": "Plan the week",
+            "category_ids": self.category_ids,
+            "tg": self.tg_data,
+        }
+        # BEGIN, account upsert, category IN fetch, task insert,
+        # through-table bulk insert, COMMIT
+        with self.assertNumQueries(6):
+            response = self.client.post(reverse("task-list"), payload, format="json")
+
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual(len(response.json()["categories"]), 5)
+
+    def test_categories_of_another_account_are_rejected(self):
+        stranger = TelegramAccount.objects.create(user_id=2, chat_id=2)
+        foreign = Category.objects.create(name="theirs", tg=stranger)
+        payload = {"title": "Sneaky", "category_ids": [foreign.id], "tg": self.tg_data}
+
+        response = self.client.post(reverse("task-list"), payload, format="json")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Task.objects.exists())
+
+    def test_omitted_username_returns_the_stored_one(self):
+        payload = {
+            "title": "Quiet",
+            "category_ids": [],
+            "tg": {"user_id": 1, "chat_id": 1},
+        }
+
+        response = self.client.post(reverse("task-list"), payload, format="json")
+
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual(response.json()["tg"]["tg_username"], "alice")
+
+    def test_ownerless_task_cannot_take_categories(self):
+        loose = Category.objects.create(name="loose")
+        task = Task.objects.create(title="Orphan")
+
+        serializer = TaskSerializer(
+            task, data={"category_ids": [loose.id]}, partial=True
+        )
+        serializer.is_valid(raise_exception=True)
+
+        with self.assertRaises(ValidationError):
+            serializer.save()
+        self.assertFalse(task.categories.exists())
+
+
+class QueryInstrumentationTests(TransactionTestCase):
+    """Requests are measured per view action; budget overruns are logged."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(get_user_model().objects.create(username="bot"))
+        self.payload = {
+            "title": "Plan the week",
+            "category_ids": [],
+            "tg": {"user_id": 1, "chat_id": 1},
+        }
+
+    def test_requests_are_recorded_per_view_action(self):
+        before = request_queries.count(view="TaskViewSet.create")
+
+        self.client.post(reverse("task-list"), self.payload, format="json")
+
+        self.assertEqual(request_queries.count(view="TaskViewSet.create"), before + 1)
+
+    @override_settings(QUERY_BUDGET_COUNT=1)
+    def test_request_over_budget_is_logged_with_its_statements(self):
+        with self.assertLogs("todo.instrumentation", "WARNING") as logs:
+            self.client.post(reverse("task-list"), self.payload, format="json")
+
+        self.assertIn("TaskViewSet.create", logs.output[0])
+        self.assertIn('INSERT INTO "todo_task"', logs.output[0])
+
+    def test_fingerprint_collapses_in_lists(self):
+        self.assertEqual(
+            fingerprint('SELECT * FROM "t" WHERE "id" IN (%s, %s, %s) LIMIT 21'),
+            'SELECT * FROM "t" WHERE "id" IN (...) LIMIT ?',
+        )
+
+
+@override_settings(LIST_CACHE_ALIAS="default")
+class ListCacheTests(TransactionTestCase):
+    """
+    Per-user lists are served from cache until that user writes. Committed
+    data, since async list views query from pool threads (own connections).
+    """
+
+    def setUp(self):
+        caches["default"].clear()
+        self.client = APIClient()
+        self.client.force_authenticate(get_user_model().objects.create(username="bot"))
+        self.tg_data = {"user_id": 1, "chat_id": 1}
+        tg = TelegramAccount.objects.create(**self.tg_data)
+        Category.objects.create(name="home", tg=tg)
+        self.url = reverse("category-list") + "?tg_user_id=1"
+
+    def test_repeat_list_is_served_from_cache(self):
+        hits = list_cache_lookups.value(resource="categories", result="hit")
+        first = self.client.get(self.url).json()
+
+        second = self.client.get(self.url).json()
+
+        self.assertEqual(first, second)
+        self.assertEqual(
+            list_cache_lookups.value(resource="categories", result="hit"), hits + 1
+        )
+
+    def test_write_invalidates_the_owners_lists(self):
+        self.client.get(self.url)
+        response = self.client.post(
+            reverse("category-list"),
+            {"name": "work", "tg": self.tg_data},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 201, response.content)
+
+        names = [c["name"] for c in self.client.get(self.url).json()["results"]]
+        self.assertEqual(names, ["home", "work"])
+
+    def test_unchanged_list_revalidates_to_304(self):
+        etag = self.client.get(self.url)["ETag"]
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+
+        self.client.post(
+            reverse("category-list"),
+            {"name": "work", "tg": self.tg_data},
+            format="json",
+        )
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_account_writes_invalidate_the_owners_lists(self):
+        Task.objects.create(title="call", tg_id=1)
+        url = reverse("task-list") + "?tg_user_id=1"
+        self.assertIsNone(
+            self.client.get(url).json()["results"][0]["tg"]["tg_username"]
+        )
+
+        def account(method: str, action: str, data=None):
+            request = getattr(APIRequestFactory(), method)("/", data, format="json")
+            force_authenticate(request, get_user_model().objects.get(username="bot"))
+            return TelegramAccountViewSet.as_view({method: action})(request, pk=1)
+
+        self.assertEqual(
+            account("patch", "partial_update", {"tg_username": "ann"}).status_code, 200
+        )
+        task = self.client.get(url).json()["results"][0]
+        self.assertEqual(task["tg"]["tg_username"], "ann")
+
+        self.assertEqual(account("delete", "destroy").status_code, 204)
+        self.assertEqual(self.client.get(url).json()["count"], 0)
+
+    def test_overdue_list_follows_the_clock(self):
+        task = Task.objects.create(
+            title="call", tg_id=1, due_at=timezone.now() + datetime.timedelta(hours=1)
+        )
+        url = reverse("task-list") + "?tg_user_id=1&overdue=1"
+        response = self.client.get(url)
+        self.assertEqual(response.json()["count"], 0)
+        self.assertNotIn("ETag", response)
+
+        # As if the hour had passed: no write through the API, no invalidation
+        Task.objects.filter(pk=task.pk).update(
+            due_at=timezone.now() - datetime.timedelta(minutes=1)
+        )
+        self.assertEqual(self.client.get(url).json()["count"], 1)
+
+
+@override_settings(LIST_CACHE_ALIAS="default")
+class KeysetPaginationTests(TransactionTestCase):
+    """`?pagination=cursor` lists. Committed data, as for ListCacheTests."""
+
+    def setUp(self):
+        caches["default"].clear()
+        self.client = APIClient()
+        self.client.force_authenticate(get_user_model().objects.create(username="bot"))
+        self.tg = TelegramAccount.objects.create(user_id=1, chat_id=1)
+        self.tasks = [self.add_task(f"task {n}") for n in range(5)]
+        self.url = reverse("task-list") + "?tg_user_id=1&pagination=cursor&page_size=2"
+
+    def add_task(self, title: str) -> Task:
+        task = Task.objects.create(title=title, tg=self.tg)
+        # Same created_at for all: the cursor must not depend on it
+        Task.objects.filter(pk=task.pk).update(
+            created_at=datetime.datetime(2025, 1, 1, tzinfo=datetime.UTC)
+        )
+        return task
+
+    def test_pages_are_stable_across_inserts(self):
+        page = self.client.get(self.url).json()
+        titles = [task["title"] for task in page["results"]]
+        while page["next"]:
+            self.add_task("added while paging")
+            page = self.client.get(page["next"]).json()
+            titles += [task["title"] for task in page["results"]]
+
+        self.assertEqual(titles, [f"task {n}" for n in range(4, -1, -1)])
+
+    def test_count_is_opt_in(self):
+        page = self.client.get(self.url).json()
+        self.assertNotIn("count", page)
+
+        page = self.client.get(self.url + "&with_count=1").json()
+        self.assertEqual(page["count"], 5)
+        self.assertEqual(self.client.get(page["next"]).json()["count"], 5)
+
+
+@override_settings(
+    METRICS_ALLOWED_NETWORKS=["10.0.0.0/8"],
+    METRICS_TOKEN="scrape-token",  # noqa: S106
+)
+class MetricsAccessTests(SimpleTestCase):
+    def scrape(self, remote_addr: str, **headers):
+        return self.client.get(
+            reverse("metrics"), REMOTE_ADDR=remote_addr, headers=headers
+        )
+
+    def test_allowed_network_or_token_may_scrape(self):
+        self.assertEqual(self.scrape("10.1.2.3").status_code, 200)
+        response = self.scrape("203.0.113.7", Authorization="Bearer scrape-token")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b"todo_list_cache_lookups_total", response.content)
+
+    def test_others_are_refused(self):
+        self.assertEqual(self.scrape("203.0.113.7").status_code, 403)
+        response = self.scrape("203.0.113.7", Authorization="Bearer wrong")
+        self.assertEqual(response.status_code, 403)
+
+    @override_settings(METRICS_TOKEN="")
+    def test_no_token_configured_means_networks_only(self):
+        response = self.scrape("203.0.113.7", Authorization="Bearer ")
+        self.assertEqual(response.status_code, 403)
+
+
+class _FakeTelegramHandler(BaseHTTPRequestHandler):
+    """Local stand-in for api.telegram.org: replays `server.replies` in order."""
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        self.server.received.append((self.path, json.loads(body)))
+        status, payload = self.server.replies.pop(0)
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+class TelegramClientTests(SimpleTestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _FakeTelegramHandler)
+        self.server.received, self.server.replies = [], []
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+        self.sleeps: list[float] = []
+        self.client = TelegramClient(
+            token="TEST",  # noqa: S106
+            api_base=f"http://127.0.0.1:{self.server.server_port}",
+            sleep=self.sleeps.append,
+        )
+        self.addCleanup(self.client.close)
+
+    def test_honours_retry_after(self):
+        self.server.replies = [
+            (429, {"ok": False, "parameters": {"retry_after": 3}}),
+            (200, {"ok": True}),
+        ]
+
+        self.assertTrue(self.client.send_message(42, "hi"))
+        self.assertEqual(len(self.server.received), 2)
+        self.assertEqual(self.server.received[0][0], "/botTEST/sendMessage")
+        self.assertIn(3.0, self.sleeps)
+
+    def test_rejected_chat_is_not_retried(self):
+        self.server.replies = [(403, {"ok": False, "description": "bot was blocked"})]
+
+        self.assertFalse(self.client.send_message(42, "hi"))
+        self.assertEqual(len(self.server.received), 1)
+
+    def test_messages_to_one_chat_are_spaced_out(self):
+        self.server.replies = [(200, {"ok": True})] * 3
+
+        for _ in range(3):
+            self.client.send_message(42, "hi")
+
+        # 1 msg/s per chat: the 2nd and 3rd sends wait roughly 1s and 2s
+        self.assertEqual(len(self.sleeps), 2)
+        self.assertGreater(self.sleeps[0], 0.9)
+        self.assertGreater(self.sleeps[1], 1.9)
+
+
+class DueNotificationDeliveryTests(TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _FakeTelegramHandler)
+        self.server.received, self.server.replies = [], [(200, {"ok": True})] * 10
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+        client = TelegramClient(
+            token="TEST",  # noqa: S106
+            api_base=f"http://127.0.0.1:{self.server.server_port}",
+            sleep=lambda _: None,
+        )
+        self.addCleanup(client.close)
+        patcher = mock.patch("todo.tasks.get_telegram_client", return_value=client)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_long_descriptions_are_cut_and_split_across_messages(self):
+        tg = TelegramAccount.objects.create(user_id=1, chat_id=1)
+        tasks = [
+            Task.objects.create(title=f"Task {n}", description="x" * 50_000, tg=tg)
+            for n in range(20)
+        ]
+
+        delivered = deliver_due_notifications(Task.objects.filter(tg=tg))
+
+        texts = [body["text"] for _, body in self.server.received]
+        self.assertEqual(delivered, len(texts))
+        self.assertGreater(len(texts), 1)
+        for text in texts:
+            self.assertLessEqual(len(text.encode("utf-16-le")) // 2, 4096)
+        self.assertEqual(sum(text.count("Title: ") for text in texts), len(tasks))
+        self.assertIn("x" * 250, texts[0])
+        self.assertNotIn("x" * 301, texts[0])
+        self.assertFalse(Task.objects.filter(tg=tg, is_done=False).exists())
+
+    def test_tasks_without_a_chat_leave_the_due_scan(self):
+        task = Task.objects.create(title="Orphan", due_at=timezone.now())
+
+        self.assertEqual(deliver_due_notifications([task]), 0)
+
+        task.refresh_from_db()
+        self.assertIsNotNone(task.notified_at)
+        self.assertFalse(task.is_done)
+        self.assertEqual(self.server.received, [])
+
+    def due_task(self) -> Task:
+        tg, _ = TelegramAccount.objects.get_or_create(user_id=1, chat_id=1)
+        return Task.objects.create(title="Call", tg=tg, due_at=timezone.now())
+
+    def expire_claims(self):
+        lease = datetime.timedelta(seconds=settings.DUE_NOTIFICATION_LEASE_SECONDS)
+        Task.objects.update(notify_claimed_at=timezone.now() - lease * 2)
+
+    def test_lost_claims_are_claimed_again_after_the_lease(self):
+        task = self.due_task()
+        with mock.patch("todo.tasks.notify_tasks_due.delay") as delay:
+            delay.side_effect = ConnectionError("broker down")
+            with self.assertRaises(ConnectionError):
+                dispatch_due_notifications()
+            delay.side_effect = None
+
+            self.assertEqual(dispatch_due_notifications(), 0)  # lease still live
+            self.expire_claims()
+            self.assertEqual(dispatch_due_notifications(), 1)
+        # The failed publish, then the re-claim
+        self.assertEqual(delay.call_args_list, [mock.call([task.id])] * 2)
+
+    def test_failed_delivery_leaves_the_task_for_a_re_claim(self):
+        task = self.due_task()
+        self.server.replies = [(502, {"ok": False})]
+        with mock.patch("todo.tasks.notify_tasks_due.delay"):
+            dispatch_due_notifications()
+        with self.assertRaises(requests.HTTPError):
+            notify_tasks_due([task.id])
+
+        task.refresh_from_db()
+        self.assertIsNone(task.notified_at)
+        self.assertFalse(task.is_done)
+        self.expire_claims()
+        with mock.patch("todo.tasks.notify_tasks_due.delay") as delay:
+            self.assertEqual(dispatch_due_notifications(), 1)
+        delay.assert_called_once_with([task.id])
+
+    def test_legacy_eta_message_sends_only_unclaimed_tasks_once(self):
+        claimed = self.due_task()
+        with mock.patch("todo.tasks.notify_tasks_due.delay"):
+            dispatch_due_notifications()
+        notify_task_due(claimed.id)
+        self.assertEqual(self.server.received, [])
+
+        task = self.due_task()
+        notify_task_due(task.id)
+        notify_task_due(task.id)
+        self.assertEqual(len(self.server.received), 1)
+        task.refresh_from_db()
+        self.assertIsNotNone(task.notified_at)
+
+
+@override_settings(
+    BOT_SHARED_SECRET="test-secret",  # noqa: S106
+    BOT_HMAC_NONCE_STORE="todo.security.InMemoryNonceStore",
+)
+class HmacReplayTests(SimpleTestCase):
+    def setUp(self):
+        get_nonce_store.cache_clear()
+        self.addCleanup(get_nonce_store.cache_clear)
+
+    def signed_request(self, nonce: str):
+        ts = str(int(time.time()))
+        body_hash = hashlib.sha256(b"").hexdigest()
+        msg = f"{ts}.GET./api/tasks/.{body_hash}".encode()
+        sig = hmac.new(b"test-secret", msg, hashlib.sha256).hexdigest()
+        return RequestFactory().get(
+            "/api/tasks/",
+            headers={
+                "X-Bot-Timestamp": ts,
+                "X-Bot-Nonce": nonce,
+                "X-Bot-Signature": sig,
+            },
+        )
+
+    def test_replayed_nonce_is_rejected(self):
+        verify_hmac(self.signed_request("n-1"))
+        with self.assertRaisesMessage(AuthenticationFailed, "Replay detected"):
+            verify_hmac(self.signed_request("n-1"))
+        verify_hmac(self.signed_request("n-2"))
+
+    def test_in_memory_store_is_bounded_and_expires(self):
+        store = InMemoryNonceStore(maxsize=2)
+        self.assertTrue(store.add("a", 60))
+        self.assertFalse(store.add("a", 60))
+        store.add("b", 60)
+        store.add("c", 60)
+        self.assertTrue(store.add("a", 60))  # evicted as the oldest entry
+        self.assertTrue(store.add("x", 0))
+        self.assertTrue(store.add("x", 0))  # already expired
+
+
+class ORJSONCodecTests(SimpleTestCase):
+    """orjson output must be byte-identical to DRF's JSONRenderer."""
+
+    data = {
+        "id": 2**63 - 1,  # snowflake ids are past JS's 2**53
+        "title": "Купить молоко\u2028",
+        "due_at": datetime.datetime(2025, 8, 20, 12, 0, tzinfo=datetime.UTC),
+        "created_at": datetime.datetime(2025, 8, 20, 12, 0, 0, 123456),
+        "estimate": Decimal("1.50"),
+        "categories": [{"id": 1, "name": "home", "tg": None}],
+        1: "non-str key",
+    }
+
+    def test_render_matches_drf_json_renderer(self):
+        self.assertEqual(
+            ORJSONRenderer().render(self.data), JSONRenderer().render(self.data)
+        )
+
+    def test_ints_beyond_64_bits_fall_back_to_stdlib(self):
+        self.assertEqual(ORJSONRenderer().render({"n": 2**70}), b'{"n":%d}' % 2**70)
+
+    def test_parser_keeps_snowflake_ids_exact(self):
+        body = b'{"id": 9223372036854775807, "ids": [7350000000000000001]}'
+        data = ORJSONParser().parse(io.BytesIO(body))
+        self.assertEqual(data, {"id": 2**63 - 1, "ids": [7350000000000000001]})
+
+    def test_parser_rejects_invalid_json(self):
+        with self.assertRaises(ParseError):
+            ORJSONParser().parse(io.BytesIO(b'{"id": NaN}'))
+
+
+class RowMapperTests(TransactionTestCase):
+    """List pages built from `.values()` rows must match the serializers."""
+
+    def setUp(self):
+        caches["default"].clear()
+        self.client = APIClient()
+        self.client.force_authenticate(get_user_model().objects.create(username="bot"))
+        tg = TelegramAccount.objects.create(user_id=1, chat_id=1, tg_username="alice")
+        home = Category.objects.create(name="home", tg=tg)
+        work = Category.objects.create(name="work", tg=tg)
+        Category.objects.create(name="orphan")
+        due = datetime.datetime(2025, 8, 20, 12, 0, 0, 123456, tzinfo=datetime.UTC)
+        for i, categories in enumerate([[], [home], [work, home]]):
+            task = Task.objects.create(
+                title=f"task {i}", tg=tg, due_at=due if i else None, is_done=i == 2
+            )
+            task.categories.add(*categories)
+
+    def test_task_rows_match_task_serializer(self):
+        tasks = Task.objects.select_related("tg").order_by("-created_at")
+        expected = TaskSerializer(tasks.prefetch_related("categories"), many=True)
+
+        rows = task_rows(list(tasks.values(*task_values())))
+
+        self.assertEqual(
+            JSONRenderer().render(rows), JSONRenderer().render(expected.data)
+        )
+
+    def test_category_rows_match_category_serializer(self):
+        categories = Category.objects.select_related("tg").order_by("name")
+        expected = CategorySerializer(categories, many=True)
+
+        rows = category_rows(list(categories.values(*category_values())))
+
+        self.assertEqual(
+            JSONRenderer().render(rows), JSONRenderer().render(expected.data)
+        )
+
+    def test_cursor_pages_walk_dict_rows(self):
+        url = reverse("task-list") + "?tg_user_id=1&pagination=cursor&page_size=2"
+        first = self.client.get(url).json()
+        second = self.client.get(first["next"]).json()
+
+        titles = [t["title"] for t in first["results"] + second["results"]]
+        self.assertEqual(titles, ["task 2", "task 1", "task 0"])
+        self.assertCountEqual(
+            [c["name"] for c in first["results"][0]["categories"]], ["work", "home"]
+        )
+
+    def test_fields_and_expand_trim_the_page(self):
+        url = reverse("task-list") + "?tg_user_id=1&fields=categories,id,tg&expand="
+        task = self.client.get(url).json()["results"][0]
+
+        self.assertEqual(list(task), ["id", "categories", "tg"])
+        self.assertEqual(task["tg"], 1)
+        self.assertEqual(
+            sorted(task["categories"]),
+            sorted(Category.objects.filter(tg=1).values_list("id", flat=True)),
+        )
+
+    def test_unrequested_categories_are_not_queried(self):
+        fields = ("id", "title", "due_at", "is_done")
+        rows = list(Task.objects.values(*task_values(fields, ())))
+
+        with self.assertNumQueries(0):
+            tasks = task_rows(rows, fields, ())
+        self.assertEqual(list(tasks[0]), list(fields))
+
+    def test_unknown_fields_are_rejected(self):
+        url = reverse("category-list") + "?tg_user_id=1&fields=id,secret"
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("secret", response.json()["fields"][0])
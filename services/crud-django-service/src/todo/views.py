@@ -1,38 +1,97 @@
-from django.db.models import QuerySet
+from django.db.models import Prefetch, QuerySet
 from rest_framework import permissions, status, viewsets
+from rest_framework.decorators import action
 from rest_framework.exceptions import ValidationError as DRFValidationError
+from rest_framework.response import Response
 
-from todo.api.pagination import DefaultPagination
+from todo.api.pagination import (
+    DefaultPagination,
+    NameKeysetPagination,
+    OptInKeysetPaginationMixin,
+    RankKeysetPagination,
+)
+from todo.api.viewsets import ModelViewSet, ValuesListMixin
 
+from .cache import CachedListMixin, invalidate_lists
 from .models import Category, Task, TelegramAccount
-from .serializers import CategorySerializer, TaskSerializer, TelegramAccountSerializer
-from .tasks import schedule_due_notification
+from .rows import (
+    CATEGORY_EXPANSIONS,
+    CATEGORY_FIELDS,
+    TASK_EXPANSIONS,
+    TASK_FIELDS,
+    category_rows,
+    category_values,
+    task_rows,
+    task_values,
+)
+from .search import search_categories, search_tasks, task_query
+from .serializers import (
+    CategorySerializer,
+    TaskBulkSerializer,
+    TaskListFilterSerializer,
+    TaskSerializer,
+    TelegramAccountSerializer,
+)
 
 
 class IsOwner(permissions.BasePermission):
+    """The object belongs to the Telegram user the request acts for (`tg_user_id`)."""
+
     def has_object_permission(self, request, view, obj):
-        owner_id = getattr(obj, "user_id", None)
-        return owner_id == request.user.id
+        owner_id = getattr(obj, "tg_id", None)
+        return owner_id is not None and str(owner_id) == request.GET.get("tg_user_id")
 
 
 class TelegramAccountViewSet(viewsets.ModelViewSet):
+    """
+    Cached task and category lists embed the owner's account (`tg`), so
+    every write here invalidates that user's lists.
+    """
+
     queryset = TelegramAccount.objects.all().order_by("user_id")
     serializer_class = TelegramAccountSerializer
     permission_classes = [permissions.IsAuthenticated]
     pagination_class = DefaultPagination
 
+    def perform_create(self, serializer):
+        super().perform_create(serializer)
+        invalidate_lists(serializer.instance.user_id)
+
+    def perform_update(self, serializer):
+        previous_user_id = serializer.instance.user_id
+        super().perform_update(serializer)
+        invalidate_lists(previous_user_id, serializer.instance.user_id)
 
-class CategoryViewSet(viewsets.ModelViewSet):
+    def perform_destroy(self, instance):
+        user_id = instance.user_id
+        super().perform_destroy(instance)
+        invalidate_lists(user_id)
+
+
+class CategoryViewSet(
+    CachedListMixin, ValuesListMixin, OptInKeysetPaginationMixin, ModelViewSet
+):
     queryset = Category.objects.all().select_related("tg")
     serializer_class = CategorySerializer
     permission_classes = [permissions.IsAuthenticated]
     pagination_class = DefaultPagination
+    keyset_pagination_class = NameKeysetPagination
+    list_cache_resource = "categories"
+    list_fields = CATEGORY_FIELDS
+    list_expansions = CATEGORY_EXPANSIONS
+    search_limit = 20
+
+    def list_values(self, fields, expand):
+        return category_values(fields, expand)
+
+    def list_rows(self, rows, fields, expand):
+        return category_rows(rows, fields, expand)
 
     def get_queryset(self):
         qs = super().get_queryset()
 
         # Filter categories by the authenticated user's Telegram account (list - GET - /categories/)
-        if self.action == "list":
+        if self.action in ("list", "search"):
             user_id = self.request.GET.get("tg_user_id")
             if not user_id:
                 raise DRFValidationError(
@@ -42,13 +101,40 @@ class CategoryViewSet(viewsets.ModelViewSet):
             return qs.filter(tg__user_id=user_id).select_related("tg").order_by("name")
         return qs
 
-
-class TaskViewSet(viewsets.ModelViewSet[Task, TaskSerializer]):
+    @action(detail=False, methods=["get"], url_path="search")
+    def search(self, request):
+        """
+        GET /api/categories/search/?tg_user_id=&q= : the user's categories
+        whose name has a word close to `q` (typos too) or contains it, most
+        similar first; at most `search_limit`, with `fields`/`expand` as lists.
+        """
+        text = request.query_params.get("q", "").strip()
+        if not text:
+            raise DRFValidationError({"q": ["This field is required."]})
+        fields, expand = self.get_fieldset()
+        rows = search_categories(self.get_queryset(), text).values(
+            *category_values(fields, expand)
+        )[: self.search_limit]
+        return Response({"results": category_rows(list(rows), fields, expand)})
+
+
+class TaskViewSet(
+    CachedListMixin,
+    ValuesListMixin,
+    OptInKeysetPaginationMixin,
+    ModelViewSet[Task, TaskSerializer],
+):
     """
     ViewSet for managing tasks.
     Allows listing, creating, updating, and deleting tasks.
     Tasks are filtered by the authenticated user.
-    Due notifications are scheduled using Celery.
+    Due notifications are dispatched by Celery beat from `Task.due_at`.
+    Lists are page-numbered; pass `?pagination=cursor` for keyset pages.
+    They take the filters of TaskListFilterSerializer, e.g. `?overdue=1`.
+    Lists are cached per user until that user's next write (except with
+    `?overdue=`, which changes as time passes), and built from
+    `.values()` rows (todo.rows) rather than TaskSerializer; `?fields=` and
+    `?expand=` trim them, e.g. `?fields=id,title,due_at,is_done`.
     """
 
     queryset: QuerySet[Task] = Task.objects.all()
@@ -57,6 +143,17 @@ class TaskViewSet(viewsets.ModelViewSet[Task, TaskSerializer]):
         permissions.IsAuthenticated,
         IsOwner,
     ]
+    pagination_class = DefaultPagination
+    list_cache_resource = "tasks"
+    list_uncached_params = ("overdue",)  # relative to now
+    list_fields = TASK_FIELDS
+    list_expansions = TASK_EXPANSIONS
+
+    def list_values(self, fields, expand):
+        return task_values(fields, expand)
+
+    def list_rows(self, rows, fields, expand):
+        return task_rows(rows, fields, expand)
 
     def get_queryset(self):  # type: ignore
         user_id = self.request.GET.get("tg_user_id")
@@ -65,7 +162,7 @@ class TaskViewSet(viewsets.ModelViewSet[Task, TaskSerializer]):
                 {"tg_user_id": ["This field is required."]},
                 code=status.HTTP_400_BAD_REQUEST,
             )
-        return (
+        qs = (
             Task.objects.filter(
                 tg__user_id=user_id
             )  # filter via related TelegramAccount field
@@ -73,13 +170,62 @@ class TaskViewSet(viewsets.ModelViewSet[Task, TaskSerializer]):
             .prefetch_related("categories")  # prefetch M2M
             .order_by("-created_at")
         )
+        if self.action in ("list", "search"):
+            # A plain dict: in a QueryDict, absent booleans would read as false
+            filters = TaskListFilterSerializer(data=self.request.query_params.dict())
+            filters.is_valid(raise_exception=True)
+            qs = filters.filter(qs)
+        return qs
 
-    def perform_create(self, serializer: TaskSerializer):
-        task = serializer.save()
-        if task.due_at:
-            schedule_due_notification(task_id=task.id, due_at=task.due_at)
-
-    def perform_update(self, serializer: TaskSerializer):
-        task = serializer.save()
-        if task.due_at:
-            schedule_due_notification(task_id=task.id, due_at=task.due_at)
+    @action(detail=False, methods=["get"], url_path="search")
+    def search(self, request):
+        """
+        GET /api/tasks/search/?tg_user_id=&q= : the user's tasks with every
+        word of `q` (as a prefix) in the title or description, best match
+        first. Keyset pages via `next`; the list filters, `fields` and
+        `expand` apply.
+        """
+        query = task_query(request.query_params.get("q", ""))
+        if query is None:
+            raise DRFValidationError({"q": ["Enter at least one word."]})
+        fields, expand = self.get_fieldset()
+        rows = search_tasks(self.get_queryset().prefetch_related(None), query).values(
+            *task_values(fields, expand), "rank"
+        )
+        paginator = RankKeysetPagination()
+        page = paginator.paginate_queryset(rows, request, view=self)
+        return paginator.get_paginated_response(task_rows(page, fields, expand))
+
+    @action(detail=False, methods=["post"], url_path="bulk")
+    def bulk(self, request):
+        """
+        POST /api/tasks/bulk/ with `tg` plus any of `create`, `update`,
+        `complete` (ids) and `delete` (ids); all applied in one transaction.
+        """
+        serializer = TaskBulkSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        result = serializer.save()
+        invalidate_lists(serializer.validated_data["tg"]["user_id"])
+
+        # Re-read for the response with every relation prefetched up front
+        touched = result["created"] + result["updated"]
+        by_id = (
+            Task.objects.select_related("tg")
+            .prefetch_related(
+                Prefetch("categories", queryset=Category.objects.select_related("tg"))
+            )
+            .in_bulk([task.id for task in touched])
+        )
+        return Response(
+            {
+                "created": TaskSerializer(
+                    [by_id[task.id] for task in result["created"]], many=True
+                ).data,
+                "updated": TaskSerializer(
+                    [by_id[task.id] for task in result["updated"]], many=True
+                ).data,
+                "completed": result["completed"],
+                "deleted": result["deleted"],
+            },
+            status=status.HTTP_200_OK,
+        )
@@ -6,18 +6,25 @@ import logging
 import pkgutil
 from contextlib import suppress
 
-import httpx
 from aiogram import Bot, Dispatcher
 from aiogram.client.default import DefaultBotProperties
 from aiogram.enums import ParseMode
-from aiogram.fsm.storage.memory import MemoryStorage
 from aiogram.types import BotCommand
 from aiogram_dialog import setup_dialogs
 
 from app import dialogs
+from app.bot.webhook import run_webhook
 from app.infra.config import settings
+from app.infra.fsm import build_fsm_storage
+from app.infra.http import BearerAuth, close_api_client, get_api_client
 from app.infra.logging import setup_logging
+from app.infra.metrics import start_metrics_server
 from app.middlewares.auth_middleware import DjangoAuthMiddleware
+from app.middlewares.metrics_middleware import (
+    HandlerMetricsMiddleware,
+    TelegramApiMetricsMiddleware,
+    UpdateMetricsMiddleware,
+)
 
 
 def load_all_modules(package):
@@ -34,31 +41,29 @@ async def _auth_self_test(mw: DjangoAuthMiddleware) -> None:
     Raises on failure so the process doesn’t start half-broken.
     """
 
-    API_BASE = str(settings.DJANGO_API_BASE).rstrip("/")  # noqa: N806
     token = await mw.get_access_token()
-    async with httpx.AsyncClient(timeout=5.0) as client:
-        r = await client.get(
-            f"{API_BASE}/api/whoami", headers={"Authorization": f"Bearer {token}"}
-        )
-        if r.status_code != 200:
-            # Include response body for quick diagnosis
-            raise RuntimeError(f"Auth self-test failed: {r.status_code} {r.text}")
+    r = await get_api_client().get("api/whoami", auth=BearerAuth(token))
+    if r.status_code != 200:
+        # Include response body for quick diagnosis
+        raise RuntimeError(f"Auth self-test failed: {r.status_code} {r.text}")
 
 
 async def _set_bot_commands(bot: Bot) -> None:
     await bot.set_my_commands(
         [
             BotCommand(command="main", description="👀 Show menu"),
+            BotCommand(command="search", description="🔎 Search tasks"),
         ]
     )
 
 
-async def run_polling() -> None:
+async def run_bot() -> None:
     """
-    Create Bot & Dispatcher, register routers, set commands, and run long polling.
+    Create Bot & Dispatcher, register routers, set commands, and take updates
+    by long polling or through the webhook server, per BOT_MODE.
     """
     setup_logging(settings.LOG_LEVEL)
-    logging.getLogger(__name__).info("Starting TaskerBot (polling)…")
+    logging.getLogger(__name__).info("Starting TaskerBot (%s)…", settings.BOT_MODE)
 
     if not settings.TELEGRAM_BOT_TOKEN:
         raise ValueError("TELEGRAM_BOT_TOKEN is not set in the environment")
@@ -67,15 +72,23 @@ async def run_polling() -> None:
         token=settings.TELEGRAM_BOT_TOKEN.get_secret_value(),
         default=DefaultBotProperties(parse_mode=ParseMode.HTML),
     )
+    bot.session.middleware(TelegramApiMetricsMiddleware())
 
-    dp = Dispatcher(storage=MemoryStorage())
+    storage, events_isolation = build_fsm_storage()
+    dp = Dispatcher(storage=storage, events_isolation=events_isolation)
+    # Outer, so update timings include the auth middleware
+    dp.update.outer_middleware(UpdateMetricsMiddleware())
     auth_middleware = DjangoAuthMiddleware()
     dp.update.middleware(auth_middleware)
+    # Inner middlewares reach handlers of every included router
+    for name, observer in dp.observers.items():
+        if name not in ("update", "error"):
+            observer.middleware(HandlerMetricsMiddleware())
 
     if not getattr(settings, "SKIP_AUTH_SELF_TEST", False):
         await _auth_self_test(auth_middleware)
 
-    setup_dialogs(dp)
+    setup_dialogs(dp, events_isolation=events_isolation)
 
     # Adding routers and dialogs
     for module in load_all_modules(dialogs):
@@ -87,15 +100,29 @@ async def run_polling() -> None:
     # Set bot commands shown in Telegram’s UI
     await _set_bot_commands(bot)
 
+    # Keep the service-account JWT fresh off the handler path
+    refresher = asyncio.create_task(auth_middleware.run_refresher())
+    metrics_server = await start_metrics_server()
     try:
-        await dp.start_polling(bot, allowed_updates=dp.resolve_used_update_types())
+        if settings.BOT_MODE == "webhook":
+            await run_webhook(bot, dp)
+        else:
+            await bot.delete_webhook()  # polling is refused while one is set
+            await dp.start_polling(bot, allowed_updates=dp.resolve_used_update_types())
     finally:
+        if metrics_server:
+            await metrics_server.cleanup()
+        refresher.cancel()
+        with suppress(asyncio.CancelledError):
+            await refresher
+        await close_api_client()
+        await auth_middleware.close()
         await bot.session.close()
 
 
 def main() -> None:
     with suppress(KeyboardInterrupt):
-        asyncio.run(run_polling())
+        asyncio.run(run_bot())
 
 
 if __name__ == "__main__":
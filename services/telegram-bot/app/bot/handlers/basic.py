@@ -4,7 +4,7 @@ from aiogram import Router, types
 from aiogram.filters import Command, CommandStart
 from aiogram.types import Message
 
-from app.infra.http import api_client
+from app.infra.http import BearerAuth, get_api_client
 
 router = Router(name=__name__)
 
@@ -16,8 +16,7 @@ async def cmd_start(message: types.Message) -> None:
         await message.answer("Hello! Please, set your Telegram profile name.")
         return
     name = user.full_name if user else "Stranger"
-    async with api_client("") as client:
-        resp = await client.get("/healthz")
+    resp = await get_api_client().get("/healthz")
     await message.answer(
         f"""Hello, {name}!\nI'm TaskerBot. Use /help to see what I can do.
         \nHealth check response: {resp.status_code} {resp.reason_phrase}""",
@@ -42,8 +41,7 @@ async def cmd_help(message: types.Message) -> None:
 
 @router.message(Command("selftest"))
 async def selftest(message: Message, api_token: str):
-    async with api_client(api_token) as client:
-        r = await client.get("api/whoami")
+    r = await get_api_client().get("api/whoami", auth=BearerAuth(api_token))
     await message.answer(f"status={r.status_code} body={r.text[:120]}")
 
 
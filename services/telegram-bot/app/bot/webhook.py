@@ -0,0 +1,147 @@
+"""
+Webhook intake: a local aiohttp server checks Telegram's secret token, puts
+each update on a bounded queue and acks at once; a fixed pool of workers
+feeds the queue to the dispatcher, so slow handlers never hold up intake.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hmac
+import logging
+import signal
+from typing import Any
+
+import orjson
+from aiogram import Bot, Dispatcher
+from aiogram.types import Update
+from aiohttp import web
+
+from app.infra.config import settings
+
+SECRET_HEADER = "X-Telegram-Bot-Api-Secret-Token"  # noqa: S105
+DRAIN_TIMEOUT = 10.0  # seconds to finish queued updates on shutdown
+
+log = logging.getLogger(__name__)
+
+
+class UpdateQueue:
+    def __init__(
+        self, bot: Bot, dp: Dispatcher, workers: int, maxsize: int, **kwargs: Any
+    ):
+        self._bot = bot
+        self._dp = dp
+        self._kwargs = kwargs  # workflow data, as start_polling passes it
+        self._queue: asyncio.Queue[Update] = asyncio.Queue(maxsize)
+        self._size = workers
+        self._workers: list[asyncio.Task] = []
+
+    def start(self) -> None:
+        self._workers = [
+            asyncio.create_task(self._work(), name=f"update-worker-{i}")
+            for i in range(self._size)
+        ]
+
+    def put(self, update: Update) -> bool:
+        """Queue `update`; False if the backlog is full."""
+        try:
+            self._queue.put_nowait(update)
+        except asyncio.QueueFull:
+            return False
+        return True
+
+    async def _work(self) -> None:
+        while True:
+            update = await self._queue.get()
+            try:
+                await self._dp.feed_update(self._bot, update, **self._kwargs)
+            except Exception:
+                log.exception("Update %s failed", update.update_id)
+            finally:
+                self._queue.task_done()
+
+    async def stop(self, timeout: float = DRAIN_TIMEOUT) -> None:
+        """Let the workers finish what is queued, within `timeout`, then stop them."""
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except TimeoutError:
+            log.warning("Dropping %d queued updates on shutdown", self._queue.qsize())
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+
+
+def make_app(bot: Bot, queue: UpdateQueue, secret: str, path: str) -> web.Application:
+    async def receive(request: web.Request) -> web.Response:
+        token = request.headers.get(SECRET_HEADER, "")
+        if not hmac.compare_digest(token.encode(), secret.encode()):
+            return web.Response(status=401)
+        try:
+            update = Update.model_validate(
+                await request.json(loads=orjson.loads), context={"bot": bot}
+            )
+        except ValueError:  # bad JSON or not an Update
+            return web.Response(status=400)
+        if not queue.put(update):
+            # Telegram redelivers on any non-2xx, so a full backlog only defers it
+            return web.Response(status=503)
+        return web.Response()
+
+    async def healthz(_request: web.Request) -> web.Response:
+        return web.Response(text="ok")
+
+    app = web.Application()
+    app.router.add_post(path, receive)
+    app.router.add_get("/healthz", healthz)
+    return app
+
+
+async def run_webhook(bot: Bot, dp: Dispatcher) -> None:
+    """
+    Serve the webhook until SIGTERM/SIGINT or cancellation. The webhook is registered with Telegram
+    only when WEBHOOK_BASE_URL is set, e.g. not behind a proxy that does it.
+    """
+    if not settings.WEBHOOK_SECRET:
+        raise ValueError("WEBHOOK_SECRET is not set in the environment")
+    secret = settings.WEBHOOK_SECRET.get_secret_value()
+
+    workflow_data = {"dispatcher": dp, "bots": [bot], **dp.workflow_data}
+    queue = UpdateQueue(
+        bot,
+        dp,
+        workers=settings.WEBHOOK_WORKERS,
+        maxsize=settings.WEBHOOK_QUEUE_SIZE,
+        **workflow_data,
+    )
+    runner = web.AppRunner(make_app(bot, queue, secret, settings.WEBHOOK_PATH))
+    await runner.setup()
+
+    await dp.emit_startup(bot=bot, **workflow_data)
+    queue.start()
+    try:
+        site = web.TCPSite(runner, settings.WEBHOOK_HOST, settings.WEBHOOK_PORT)
+        await site.start()
+        if settings.WEBHOOK_BASE_URL:
+            await bot.set_webhook(
+                url=str(settings.WEBHOOK_BASE_URL).rstrip("/") + settings.WEBHOOK_PATH,
+                secret_token=secret,
+                allowed_updates=dp.resolve_used_update_types(),
+                max_connections=settings.WEBHOOK_MAX_CONNECTIONS,
+            )
+        log.info(
+            "Webhook listening on %s:%s%s with %d workers",
+            settings.WEBHOOK_HOST,
+            settings.WEBHOOK_PORT,
+            settings.WEBHOOK_PATH,
+            settings.WEBHOOK_WORKERS,
+        )
+        # Stop on SIGTERM too (compose, k8s), not only when cancelled
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(sig, stop.set)
+        await stop.wait()
+    finally:
+        await runner.cleanup()  # stop accepting before draining the backlog
+        await queue.stop()
+        await dp.emit_shutdown(bot=bot, **workflow_data)
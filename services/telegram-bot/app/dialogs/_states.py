@@ -10,6 +10,11 @@ class CategoryCreateDlg(StatesGroup):
     confirm = State()
 
 
+class SearchDlg(StatesGroup):
+    query = State()
+    results = State()
+
+
 class CategoryListDlg(StatesGroup):
     categories = State()
     edit = State()
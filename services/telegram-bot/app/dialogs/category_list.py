@@ -20,7 +20,7 @@ from aiogram_dialog.widgets.text import Const, Format
 
 from app.dialogs._states import CategoryCreateDlg, CategoryListDlg, CreateTaskDlg
 from app.dialogs.menu import MenuDlg
-from app.services.categories import CategoryDTO, CategoryService
+from app.services.categories import CategoryDTO, CategoryService, category_cache
 
 logger = logging.getLogger(__name__)
 router = Router(name=__name__)
@@ -38,19 +38,31 @@ class CategoryTD(TypedDict):
 # --- API client helper ---
 
 
+def _tg_user_id(manager: DialogManager) -> int | None:
+    return manager.event.from_user.id if manager.event.from_user else None
+
+
 async def api_fetch_page(manager: DialogManager, page: int, page_size: int):
-    """Fetch a page from the backend. Returns (items, count, error_text)."""
+    """
+    Slice a page out of the user's cached categories, so paging is local.
+    Returns (items, count, error_text).
+    """
     api_token = manager.middleware_data.get("api_token") or ""
     category_service = CategoryService(api_token=api_token)
-    tg_user_id = manager.event.from_user.id if manager.event.from_user else None
 
-    data = await category_service.get_categories(
-        user_id=str(tg_user_id), page=page, page_size=page_size
-    )
+    categories = await category_service.list_categories(_tg_user_id(manager))
+    if isinstance(categories, dict):
+        return [], 0, categories["error"]
+
+    start = (page - 1) * page_size
+    return categories[start : start + page_size], len(categories), None
 
-    items = data.get("results", []) or []
-    count = int(data.get("count", len(items)))
-    return items, count, None
+
+async def api_find_category(manager: DialogManager, category_id) -> dict:
+    api_token = manager.middleware_data.get("api_token") or ""
+    category_service = CategoryService(api_token=api_token)
+    item = await category_service.find_category(_tg_user_id(manager), category_id)
+    return item or {}
 
 
 async def api_delete_category(manager: DialogManager, category_id: str) -> None:
@@ -62,8 +74,7 @@ async def api_delete_category(manager: DialogManager, category_id: str) -> None:
 # --- Getters ---
 async def edit_getter(dialog_manager: DialogManager, **_):
     category_id = dialog_manager.dialog_data.get("category_id")
-    items = dialog_manager.dialog_data.get("items_cache", [])
-    item = next((it for it in items if str(it["id"]) == category_id), {})
+    item = await api_find_category(dialog_manager, category_id)
     return {
         "category_id": category_id,
         "category_name": item["name"] if item else "—",
@@ -86,11 +97,8 @@ async def categories_getter(dialog_manager: DialogManager, **_):
         total_count=count,
     )
 
-    normalized = [{"id": it.get("id"), "name": it.get("name", "—")} for it in items]
-    dialog_manager.dialog_data["items_cache"] = normalized
-
     return {
-        "items": normalized,
+        "items": items,
         "page_size": page_size,
         "current_page_size": current_page_size,
         "page": page,
@@ -166,7 +174,8 @@ async def on_next(_: types.CallbackQuery, __: Button, manager: DialogManager):
 
 
 async def on_refresh(_: types.CallbackQuery, __: Button, manager: DialogManager):
-    # no changes, just re-render (will re-fetch in getter)
+    # drop the cached list; the getter refetches (a 304 if nothing changed)
+    category_cache.invalidate(_tg_user_id(manager))
     await manager.switch_to(CategoryListDlg.categories, show_mode=ShowMode.EDIT)
 
 
@@ -181,11 +190,10 @@ async def go_back_to_list(
 async def on_new_task(c, b, m: DialogManager):
     manager = cast(SubManager, m)
     category_id = manager.item_id
-    items = m.dialog_data.get("items_cache", [])
-    item = next((it for it in items if str(it["id"]) == category_id), {})
+    item = await api_find_category(m, category_id)
     await m.start(
         CreateTaskDlg.title,
-        data={"category_id": category_id, "category_name": item["name"]},
+        data={"category_id": category_id, "category_name": item.get("name", "—")},
     )
 
 
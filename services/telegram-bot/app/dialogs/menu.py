@@ -11,6 +11,7 @@ from app.dialogs._states import (
     CategoryListDlg,
     CreateTaskDlg,
     MenuDlg,
+    SearchDlg,
 )
 
 router = Router(name=__name__)
@@ -20,6 +21,10 @@ async def to_categories(_, __, c):
     await c.start(CategoryListDlg.categories, mode=StartMode.RESET_STACK)
 
 
+async def to_search(_, __, c):
+    await c.start(SearchDlg.query, mode=StartMode.RESET_STACK)
+
+
 async def to_create_new_task(_, __, c):
     await c.start(CreateTaskDlg.title, mode=StartMode.RESET_STACK)
 
@@ -37,6 +42,9 @@ menu_window = Window(
             on_click=to_categories,
         ),
     ),
+    Row(
+        Button(Const("🔎 Search"), id="search", on_click=to_search),
+    ),
     Row(
         Button(
             Const("🔔 Create a new task"), id="new_task", on_click=to_create_new_task
@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import html
+
+from aiogram import Router, types
+from aiogram.filters import Command
+from aiogram_dialog import Dialog, DialogManager, ShowMode, StartMode, Window
+from aiogram_dialog.widgets.input import ManagedTextInput, TextInput
+from aiogram_dialog.widgets.kbd import Button, Row, SwitchTo
+from aiogram_dialog.widgets.text import Const, Format
+
+from app.dialogs._states import MenuDlg, SearchDlg
+from app.services.categories import CategoryService
+from app.services.tasks import TaskService
+
+router = Router(name=__name__)
+
+PAGE_SIZE = 10
+
+
+def _tg_user_id(manager: DialogManager) -> str:
+    return str(manager.event.from_user.id) if manager.event.from_user else ""
+
+
+async def _load_tasks(manager: DialogManager, cursor: str | None) -> None:
+    """Fetch one page of task matches into dialog_data (just the page shown)."""
+    api_token = manager.middleware_data.get("api_token") or ""
+    page = await TaskService(api_token=api_token).search_tasks(
+        _tg_user_id(manager),
+        manager.dialog_data["q"],
+        cursor=cursor,
+        page_size=PAGE_SIZE,
+    )
+    if "error" in page:
+        manager.dialog_data.update(tasks=[], cursor=None, error=page["error"])
+        return
+    manager.dialog_data.update(
+        tasks=page["results"], cursor=TaskService.next_cursor(page), error=None
+    )
+
+
+# --- Handlers ---
+async def on_query(
+    message: types.Message,
+    widget: ManagedTextInput[str],
+    manager: DialogManager,
+    text: str,
+):
+    q = (text or "").strip()
+    if not q:
+        await message.answer("⚠️ Send a word or two to look for.")
+        return
+    api_token = manager.middleware_data.get("api_token") or ""
+    categories = await CategoryService(api_token=api_token).search_categories(
+        _tg_user_id(manager), q
+    )
+    manager.dialog_data.update(
+        q=q,
+        page=1,
+        categories=categories if isinstance(categories, list) else [],
+    )
+    await _load_tasks(manager, cursor=None)
+    await manager.switch_to(SearchDlg.results, show_mode=ShowMode.SEND)
+
+
+async def on_more(_: types.CallbackQuery, __: Button, manager: DialogManager):
+    await _load_tasks(manager, cursor=manager.dialog_data.get("cursor"))
+    manager.dialog_data["page"] = int(manager.dialog_data.get("page", 1)) + 1
+    await manager.switch_to(SearchDlg.results, show_mode=ShowMode.EDIT)
+
+
+async def go_back_to_menu(_: types.CallbackQuery, __: Button, manager: DialogManager):
+    await manager.start(MenuDlg.main, mode=StartMode.RESET_STACK)
+
+
+# --- Getters ---
+def _task_line(task: dict) -> str:
+    mark = "✅" if task.get("is_done") else "⬜"
+    line = f"{mark} {html.escape(task.get('title') or '—')}"
+    if task.get("due_at"):
+        line += f" · ⏰ {task['due_at'][:16].replace('T', ' ')}"
+    return line
+
+
+async def results_getter(dialog_manager: DialogManager, **_):
+    data = dialog_manager.dialog_data
+    tasks = [_task_line(task) for task in data.get("tasks", [])]
+    categories = [html.escape(c["name"]) for c in data.get("categories", [])]
+    error = data.get("error")
+    return {
+        "q": html.escape(data.get("q", "")),
+        "page": data.get("page", 1),
+        "categories_text": "📂 " + ", ".join(categories) + "\n\n" if categories else "",
+        "tasks_text": "\n".join(tasks) if tasks else "Nothing found.",
+        "has_more": bool(data.get("cursor")),
+        "error_text": f"❌ {html.escape(error)}\n" if error else "",
+    }
+
+
+# --- Windows ---
+query_window = Window(
+    Const("🔎 Send a few words to look for in your tasks and categories:"),
+    TextInput[str](id="q", on_success=on_query),
+    Button(Const("⬅️ Menu"), id="back", on_click=go_back_to_menu),
+    state=SearchDlg.query,
+)
+
+results_window = Window(
+    Format("🔎 <b>{q}</b> (page {page})\n\n{error_text}{categories_text}{tasks_text}"),
+    Row(
+        Button(
+            Const("More ➡️"),
+            id="more",
+            on_click=on_more,
+            when=lambda d, w, m: d["has_more"],
+        ),
+        SwitchTo(Const("🔎 New search"), id="again", state=SearchDlg.query),
+    ),
+    Button(Const("⬅️ Menu"), id="back", on_click=go_back_to_menu),
+    state=SearchDlg.results,
+    getter=results_getter,
+)
+
+dialog = Dialog(query_window, results_window)
+
+
+@router.message(Command("search"))
+async def start_search(message: types.Message, dialog_manager: DialogManager):
+    await dialog_manager.start(SearchDlg.query, mode=StartMode.RESET_STACK)
@@ -216,16 +216,10 @@ async def get_categories_from_api(dialog_manager, **kwargs) -> dict:
         dialog_manager.event.from_user.id if dialog_manager.event.from_user else None
     )
     category_service = CategoryService(api_token=api_token)
-    data = await category_service.get_categories(
-        user_id=str(tg_user_id), page=1, page_size=1000
-    )
-
-    items = data.get("results", []) or []
-
-    cache = dialog_manager.dialog_data.get("items_cache", {})
-    cache.update({it["id"]: it["name"] for it in items})
-    dialog_manager.dialog_data["items_cache"] = cache
-    return {"categories": items}
+    categories = await category_service.list_categories(tg_user_id)
+    if isinstance(categories, dict):  # API error: offer to create one instead
+        categories = []
+    return {"categories": categories}
 
 
 # --- Handlers ---
@@ -261,8 +255,15 @@ async def on_categories_chosen(c: types.CallbackQuery, b: Button, m: DialogManag
     if not selected_ids:
         await c.answer("⚠️ Please choose at least one category")
         return
-    selected_cat_names = m.dialog_data.get("items_cache", {})
-    selected_names = [selected_cat_names.get(int(cid), "—") for cid in selected_ids]
+    api_token = m.middleware_data.get("api_token", "")
+    tg_user_id = c.from_user.id if c.from_user else None
+    categories = await CategoryService(api_token=api_token).list_categories(tg_user_id)
+    names = (
+        {}
+        if isinstance(categories, dict)
+        else {str(it["id"]): it["name"] for it in categories}
+    )
+    selected_names = [names.get(str(cid), "—") for cid in selected_ids]
 
     m.dialog_data["category_ids"] = selected_ids
     m.dialog_data["category_names"] = selected_names
@@ -1,4 +1,5 @@
 import os
+from typing import Literal
 
 from pydantic import AnyUrl, SecretStr
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -20,13 +21,50 @@ class Settings(BaseSettings):
     TELEGRAM_BOT_SERVICE_USERNAME: str = "dummy_bot_service"
     TELEGRAM_BOT_SERVICE_PASSWORD: SecretStr = SecretStr("dummy_password")
 
+    # Update intake: "polling" (one long-poll loop) or "webhook" (local server)
+    BOT_MODE: Literal["polling", "webhook"] = "polling"
+    WEBHOOK_BASE_URL: AnyUrl | None = None  # public URL; registered on start if set
+    WEBHOOK_PATH: str = "/telegram/webhook"
+    WEBHOOK_HOST: str = "0.0.0.0"  # noqa: S104
+    WEBHOOK_PORT: int = 8080
+    WEBHOOK_SECRET: SecretStr | None = None  # X-Telegram-Bot-Api-Secret-Token
+    WEBHOOK_WORKERS: int = 16  # updates processed concurrently
+    WEBHOOK_QUEUE_SIZE: int = 1000  # backlog before answering 503
+    WEBHOOK_MAX_CONNECTIONS: int = 40  # Telegram's parallel deliveries to us
+
+    # Prometheus /metrics endpoint; METRICS_PORT=0 turns it off
+    METRICS_HOST: str = "0.0.0.0"  # noqa: S104
+    METRICS_PORT: int = 9100
+
     # Redis settings
     REDIS_HOST: str = "redis"
     REDIS_PORT: int = 6379
+    REDIS_MAX_CONNECTIONS: int = 20
+    REDIS_POOL_TIMEOUT: float = 5.0  # seconds a call waits for a free connection
+
+    # FSM and dialog state: "memory" (single replica) or "redis" (shared)
+    FSM_STORAGE: Literal["memory", "redis"] = "memory"
+    FSM_REDIS_DB: int = 1
+    FSM_STATE_TTL: int = 7 * 24 * 3600  # seconds without use before expiry
+    FSM_DATA_TTL: int = 7 * 24 * 3600
 
     # Django settings
     DJANGO_API_BASE: AnyUrl = AnyUrl("http://crud-django-service:8000")
 
+    # Django API client pool (one shared httpx.AsyncClient per process)
+    API_HTTP2: bool = False  # requires the `h2` package (httpx[http2])
+    API_MAX_CONNECTIONS: int = 100
+    API_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    API_KEEPALIVE_EXPIRY: float = 30.0
+    API_ETAG_CACHE_SIZE: int = 256  # list pages kept for If-None-Match, per service
+
+    # Per-user category lists shared by all dialogs
+    # Seconds a list is served without asking the API; then it is revalidated
+    # with If-None-Match (a 304 if unchanged). Bounds how long other replicas'
+    # category writes take to show up here.
+    CATEGORY_CACHE_TTL: float = 10.0
+    CATEGORY_CACHE_SIZE: int = 1000  # users
+
     # PostgreSQL settings
     POSTGRES_USER: str = "app_user"
     POSTGRES_PASSWORD: SecretStr = SecretStr("app_password")
@@ -0,0 +1,68 @@
+"""
+FSM and aiogram-dialog storage.
+
+"memory" keeps every user's state and dialog stacks in this process, so it
+only suits a single replica. "redis" shares them between replicas: values
+are compact JSON, each key expires after FSM_*_TTL seconds without use, and
+per-chat event locks live in Redis too, so any replica can take any update.
+"""
+
+import json
+from typing import Any
+
+from aiogram.fsm.storage.base import BaseEventIsolation, BaseStorage, StorageKey
+from aiogram.fsm.storage.memory import MemoryStorage
+from aiogram.fsm.storage.redis import DefaultKeyBuilder, RedisStorage
+
+from app.infra.config import settings
+
+FSM_REDIS_DSN = (
+    f"redis://{settings.REDIS_HOST}:{settings.REDIS_PORT}/{settings.FSM_REDIS_DB}"
+)
+
+
+def _dumps(data: Any) -> str:
+    # No spaces and raw UTF-8: Cyrillic titles are 2 bytes a char, not 6
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+
+
+class IdleExpiryRedisStorage(RedisStorage):
+    """
+    RedisStorage whose reads also push the key's expiry back, pipelined with
+    the GET so it costs no extra round trip. Expiry then counts from the
+    last use of a dialog rather than its last write.
+    """
+
+    async def _get(self, redis_key: str, ttl: int | None) -> str | None:
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.get(redis_key)
+            if ttl:
+                pipe.expire(redis_key, ttl)
+            value, *_ = await pipe.execute()
+        if isinstance(value, bytes):
+            return value.decode("utf-8")
+        return value
+
+    async def get_state(self, key: StorageKey) -> str | None:
+        return await self._get(self.key_builder.build(key, "state"), self.state_ttl)
+
+    async def get_data(self, key: StorageKey) -> dict[str, Any]:
+        value = await self._get(self.key_builder.build(key, "data"), self.data_ttl)
+        return self.json_loads(value) if value is not None else {}
+
+
+def build_fsm_storage() -> tuple[BaseStorage, BaseEventIsolation | None]:
+    """Storage and event isolation for the Dispatcher and setup_dialogs."""
+    if settings.FSM_STORAGE == "memory":
+        return MemoryStorage(), None  # aiogram-dialog falls back to local locks
+
+    storage = IdleExpiryRedisStorage.from_url(
+        FSM_REDIS_DSN,
+        connection_kwargs={"max_connections": settings.REDIS_MAX_CONNECTIONS},
+        # aiogram-dialog keeps stacks and contexts under their own "destiny"
+        key_builder=DefaultKeyBuilder(prefix="fsm", with_destiny=True),
+        state_ttl=settings.FSM_STATE_TTL,
+        data_ttl=settings.FSM_DATA_TTL,
+        json_dumps=_dumps,
+    )
+    return storage, storage.create_isolation()
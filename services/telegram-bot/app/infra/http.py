@@ -3,20 +3,44 @@ from __future__ import annotations
 import hashlib
 import hmac
 import os
+import re
 import time
-from collections.abc import AsyncIterator
-from contextlib import asynccontextmanager
+from collections import OrderedDict
+from typing import Any
 
 import httpx
+import orjson
 
 from app.infra.config import settings
+from app.infra.metrics import Counter, Gauge, Histogram
 
 DEFAULT_TIMEOUT = httpx.Timeout(10.0, connect=5.0)
+DEFAULT_LIMITS = httpx.Limits(
+    max_connections=settings.API_MAX_CONNECTIONS,
+    max_keepalive_connections=settings.API_MAX_KEEPALIVE_CONNECTIONS,
+    keepalive_expiry=settings.API_KEEPALIVE_EXPIRY,
+)
 API_BASE = str(settings.DJANGO_API_BASE).rstrip("/")
 TOKEN_URL = f"{API_BASE}/api/token/"
 REFRESH_URL = f"{API_BASE}/api/token/refresh/"
 BOT_SHARED_SECRET = settings.TELEGRAM_BOT_SHARED_SECRET.get_secret_value()
 
+_ID_SEGMENT = re.compile(r"/\d+(?=/|$)")
+
+api_in_flight = Gauge(
+    "bot_api_requests_in_flight", "Django API calls in progress.", labels=("client",)
+)
+api_seconds = Histogram(
+    "bot_api_request_duration_seconds",
+    "Django API calls until response headers, by endpoint.",
+    labels=("client", "method", "endpoint"),
+)
+api_requests = Counter(
+    "bot_api_requests_total",
+    "Django API calls by endpoint and status (`error` if no response).",
+    labels=("client", "method", "endpoint", "status"),
+)
+
 
 def sign(body_bytes: bytes, method: str, path: str):
     ts = str(int(time.time()))
@@ -41,18 +65,120 @@ async def sign_request(request: httpx.Request):
     )
 
 
-@asynccontextmanager
-async def api_client(api_token: str) -> AsyncIterator[httpx.AsyncClient]:
-    auth_header = {"Authorization": f"Bearer {api_token}"} if api_token else {}
-    async with httpx.AsyncClient(
-        base_url=API_BASE,
-        timeout=DEFAULT_TIMEOUT,
-        headers={
-            **auth_header,
-            "Accept": "application/json",
-            "User-Agent": "TaskerBot/1.0",
-            "Content-Type": "application/json",
-        },
-        event_hooks={"request": [sign_request]},
-    ) as client:
-        yield client
+class InstrumentedTransport(httpx.AsyncBaseTransport):
+    """
+    Times every request by endpoint, ids collapsed to `{id}`. A transport
+    rather than event hooks, so requests that fail without a response are
+    counted too.
+    """
+
+    def __init__(self, client: str, **kwargs: Any):
+        self._client = client
+        self._transport = httpx.AsyncHTTPTransport(**kwargs)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        method = request.method
+        endpoint = _ID_SEGMENT.sub("/{id}", request.url.path)
+        api_in_flight.inc(client=self._client)
+        start = time.perf_counter()
+        status = "error"
+        try:
+            response = await self._transport.handle_async_request(request)
+            status = str(response.status_code)
+            return response
+        finally:
+            api_seconds.observe(
+                time.perf_counter() - start,
+                client=self._client,
+                method=method,
+                endpoint=endpoint,
+            )
+            api_requests.inc(
+                client=self._client, method=method, endpoint=endpoint, status=status
+            )
+            api_in_flight.dec(client=self._client)
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+class BearerAuth(httpx.Auth):
+    """Attach the caller's JWT per request, so one pooled client serves everyone."""
+
+    def __init__(self, api_token: str):
+        self._api_token = api_token
+
+    def auth_flow(self, request: httpx.Request):
+        if self._api_token:
+            request.headers["Authorization"] = f"Bearer {self._api_token}"
+        yield request
+
+
+class ConditionalCache:
+    """
+    Small LRU of ETag validators and decoded bodies for list GETs. Unchanged
+    pages come back as an empty 304 and are answered from here; bodies are
+    shared between callers, so treat them as read-only.
+    """
+
+    def __init__(self, maxsize: int = settings.API_ETAG_CACHE_SIZE):
+        self._maxsize = maxsize
+        self._entries: OrderedDict[tuple, tuple[str, Any]] = OrderedDict()
+
+    async def get(
+        self, client: httpx.AsyncClient, url: str, *, params: dict, auth: httpx.Auth
+    ) -> tuple[httpx.Response, Any]:
+        """GET `url`; returns the response and its JSON body (None on errors)."""
+        key = (url, tuple(sorted(params.items())))
+        cached = self._entries.get(key)
+        headers = {"If-None-Match": cached[0]} if cached else None
+        r = await client.get(url, params=params, headers=headers, auth=auth)
+
+        if r.status_code == 304 and cached:
+            self._entries.move_to_end(key)
+            return r, cached[1]
+        if r.status_code != 200:
+            self._entries.pop(key, None)
+            return r, None
+
+        body = orjson.loads(r.content)
+        etag = r.headers.get("ETag")
+        if etag:
+            self._entries[key] = (etag, body)
+            self._entries.move_to_end(key)
+            if len(self._entries) > self._maxsize:
+                self._entries.popitem(last=False)
+        return r, body
+
+
+_client: httpx.AsyncClient | None = None
+
+
+def get_api_client() -> httpx.AsyncClient:
+    """
+    Process-wide Django API client. Connections are pooled and kept alive
+    between calls; close it once on shutdown with `close_api_client()`.
+    """
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            base_url=API_BASE,
+            timeout=DEFAULT_TIMEOUT,
+            transport=InstrumentedTransport(
+                "api", limits=DEFAULT_LIMITS, http2=settings.API_HTTP2
+            ),
+            headers={
+                "Accept": "application/json",
+                "User-Agent": "TaskerBot/1.0",
+                "Content-Type": "application/json",
+            },
+            event_hooks={"request": [sign_request]},
+        )
+    return _client
+
+
+async def close_api_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
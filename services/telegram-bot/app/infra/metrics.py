@@ -0,0 +1,123 @@
+"""
+Minimal in-process metrics in the Prometheus text format, served by a small
+aiohttp app on METRICS_PORT.
+
+Everything runs on the event loop thread, so updates are plain dict writes
+with no locking; the hot path is a perf_counter call and a few increments.
+"""
+
+import bisect
+
+from aiohttp import web
+
+from app.infra.config import settings
+
+# Seconds; handlers and API calls range from sub-ms cache hits to slow APIs
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_registry: list["Metric"] = []
+
+
+class Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help_text: str, labels: tuple[str, ...] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self._values: dict[tuple[str, ...], float] = {}
+        _registry.append(self)
+
+    def _key(self, labels: dict[str, str]) -> tuple[str, ...]:
+        return tuple(str(labels[label]) for label in self.labels)
+
+    def _labels(self, key: tuple[str, ...], **extra: str) -> str:
+        pairs = [*zip(self.labels, key, strict=True), *extra.items()]
+        return "{" + ",".join(f'{k}="{v}"' for k, v in pairs) + "}" if pairs else ""
+
+    def samples(self) -> list[str]:
+        return [
+            f"{self.name}{self._labels(key)} {value}"
+            for key, value in sorted(self._values.items())
+        ]
+
+    def render(self) -> list[str]:
+        return [
+            f"# HELP {self.name} {self.help_text}",
+            f"# TYPE {self.name} {self.kind}",
+            *self.samples(),
+        ]
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labels: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, help_text, labels)
+        self.buckets = buckets
+        # Per key: a count per bucket plus +Inf (not cumulative), and the sum
+        self._counts: dict[tuple[str, ...], list[int]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        counts = self._counts.get(key)
+        if counts is None:
+            counts = self._counts[key] = [0] * (len(self.buckets) + 1)
+        counts[bisect.bisect_left(self.buckets, value)] += 1
+        self._values[key] = self._values.get(key, 0.0) + value
+
+    def samples(self) -> list[str]:
+        lines = []
+        for key, counts in sorted(self._counts.items()):
+            total = 0
+            for bound, count in zip((*self.buckets, "+Inf"), counts, strict=True):
+                total += count
+                lines.append(f"{self.name}_bucket{self._labels(key, le=bound)} {total}")
+            lines.append(f"{self.name}_sum{self._labels(key)} {self._values[key]}")
+            lines.append(f"{self.name}_count{self._labels(key)} {total}")
+        return lines
+
+
+def render() -> str:
+    return "\n".join(line for metric in _registry for line in metric.render()) + "\n"
+
+
+async def metrics_view(_request: web.Request) -> web.Response:
+    return web.Response(text=render(), content_type="text/plain", charset="utf-8")
+
+
+async def start_metrics_server() -> web.AppRunner | None:
+    """Serve /metrics on METRICS_HOST:METRICS_PORT; None if METRICS_PORT is 0."""
+    if not settings.METRICS_PORT:
+        return None
+    app = web.Application()
+    app.router.add_get("/metrics", metrics_view)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, settings.METRICS_HOST, settings.METRICS_PORT).start()
+    return runner
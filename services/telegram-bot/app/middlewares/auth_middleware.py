@@ -3,13 +3,17 @@ import base64
 import json
 import logging
 import time
+from collections.abc import Callable
 
 import httpx
 from aiogram import BaseMiddleware
 from aiogram.types import TelegramObject
-from redis.asyncio import Redis
+from redis.asyncio import BlockingConnectionPool, Redis
+from redis.exceptions import LockError
 
 from app.infra.config import settings
+from app.infra.http import InstrumentedTransport
+from app.infra.metrics import Histogram
 
 logger = logging.getLogger(__name__)
 
@@ -23,6 +27,25 @@ REDIS_DSN = f"redis://{settings.REDIS_HOST}:{settings.REDIS_PORT}/0"
 
 ACCESS_KEY = "jwt:bot:access"
 REFRESH_KEY = "jwt:bot:refresh"
+REFRESH_LOCK_KEY = "jwt:bot:refresh-lock"
+TOKEN_LEEWAY = 30  # seconds before `exp` at which a token counts as stale
+
+# Background refresher: renew well before the leeway kicks in
+REFRESH_AHEAD = 90  # seconds before `exp`
+REFRESH_LOCK_TIMEOUT = 15  # seconds; bounds a crashed replica holding the lock
+REFRESH_MIN_DELAY = 5  # seconds between attempts after a failure
+
+BUSY_TEXT = "⏳ The service is busy right now, please try again in a moment."
+
+token_seconds = Histogram(
+    "bot_auth_token_duration_seconds",
+    "Time DjangoAuthMiddleware spends getting the access token per update.",
+    buckets=(0.0001, 0.001, 0.005, 0.025, 0.1, 0.5, 2.5),
+)
+
+
+class TokenUnavailableError(RuntimeError):
+    """No fresh access token could be had (another replica holds the lock)."""
 
 
 def _get_exp(token: str) -> float | None:
@@ -40,17 +63,46 @@ class DjangoAuthMiddleware(BaseMiddleware):
     def __init__(self):
         super().__init__()
         self._lock = asyncio.Lock()
+        # One pooled client for the process lifetime; close it with `close()`.
+        # A blocking pool makes bursts wait for a free connection instead of
+        # failing with "Too many connections".
+        self._redis = Redis.from_pool(
+            BlockingConnectionPool.from_url(
+                REDIS_DSN,
+                max_connections=settings.REDIS_MAX_CONNECTIONS,
+                timeout=settings.REDIS_POOL_TIMEOUT,
+            )
+        )
+        # Decoded access token kept in memory, so fresh tokens cost no I/O.
+        self._token: str | None = None
+        self._token_exp: float = 0.0
+        # After the refresh lock times out, handlers skip it for a while
+        self._lock_busy_until: float = 0.0
 
     async def get_access_token(self) -> str:
         """Public helper for boot self-test."""
-        redis = Redis.from_url(REDIS_DSN)
-        try:
-            return await self._ensure_access_token(redis)  # reuse your internal logic
-        finally:
-            await redis.aclose()
+        return await self._ensure_access_token()
+
+    async def close(self) -> None:
+        await self._redis.aclose()
+
+    def _cached_token(self) -> str | None:
+        if self._token and self._token_exp - time.time() > TOKEN_LEEWAY:
+            return self._token
+        return None
+
+    def _remember(self, token: str) -> str | None:
+        """Cache `token` in memory if it is still fresh; return it or None."""
+        exp = _get_exp(token)
+        if not exp or exp - time.time() <= TOKEN_LEEWAY:
+            return None
+        self._token, self._token_exp = token, exp
+        return token
 
     async def _get_token_from_api(self) -> tuple[str, str]:
-        async with httpx.AsyncClient(timeout=5.0) as client:
+        async with httpx.AsyncClient(
+            timeout=5.0, transport=InstrumentedTransport("auth")
+        ) as client:
             r = await client.post(
                 TOKEN_URL, json={"username": BOT_USERNAME, "password": BOT_PASSWORD}
             )
@@ -60,50 +112,131 @@ class DjangoAuthMiddleware(BaseMiddleware):
             logger.info("Obtained new access token: %s", data["access"])
             return data["access"], data["refresh"]
 
-    async def _refresh_access_token(self, refresh: str) -> str | None:
-        async with httpx.AsyncClient(timeout=5.0) as client:
+    async def _refresh_access_token(self, refresh: str) -> tuple[str, str] | None:
+        async with httpx.AsyncClient(
+            timeout=5.0, transport=InstrumentedTransport("auth")
+        ) as client:
             r = await client.post(REFRESH_URL, json={"refresh": refresh})
             if r.status_code != 200:
                 return None
-            return r.json()["access"]
-
-    async def _ensure_access_token(self, redis: Redis) -> str:
-        # Try existing access
-        raw = await redis.get(ACCESS_KEY)
-        if raw:
-            token = raw.decode()
-            exp = _get_exp(token)
-            if exp and exp - time.time() > 30:  # 30s leeway
-                return token
-
-        # Acquire lock to prevent race
+            data = r.json()
+            # With ROTATE_REFRESH_TOKENS the API hands out a new refresh token too
+            return data["access"], data.get("refresh", refresh)
+
+    async def _load_shared_token(self) -> str | None:
+        """Pick up a token another replica (or an earlier run) stored in Redis."""
+        raw = await self._redis.get(ACCESS_KEY)
+        return self._remember(raw.decode()) if raw else None
+
+    async def _store_tokens(self, access: str, refresh: str) -> str:
+        exp = _get_exp(access)
+        ttl = int(exp - time.time()) if exp else 300
+        await self._redis.set(ACCESS_KEY, access, ex=max(ttl, 1))
+        await self._redis.set(REFRESH_KEY, refresh)
+        self._remember(access)
+        return access
+
+    async def _renew(self) -> str:
+        """Refresh the access token, falling back to a full login."""
+        refresh_token = await self._redis.get(REFRESH_KEY)
+        if refresh_token:
+            pair = await self._refresh_access_token(refresh_token.decode())
+            if pair:
+                return await self._store_tokens(*pair)
+
+        return await self._store_tokens(*await self._get_token_from_api())
+
+    async def _ensure_access_token(self) -> str:
+        # Hot path: in-memory token, no network
+        token = self._cached_token()
+        if token:
+            return token
+
+        # Near expiry: another replica may already have rotated it
+        token = await self._load_shared_token()
+        if token:
+            return token
+
+        # Fallback when the background refresher is behind (e.g. at startup).
+        # Same cross-replica lock as the refresher: with rotation, two
+        # replicas renewing at once would revoke each other's refresh token.
+        def settled() -> bool:
+            # Waiters queued behind a timed-out attempt give up at once
+            busy = time.monotonic() < self._lock_busy_until
+            return busy or self._cached_token() is not None
+
+        try:
+            await self._renew_exclusively(settled)
+        except LockError:
+            self._lock_busy_until = time.monotonic() + REFRESH_MIN_DELAY
+        # Another replica may have held the lock to renew; use what it stored
+        token = self._cached_token() or await self._load_shared_token()
+        if token is None:
+            raise TokenUnavailableError("Token refresh lock busy; no fresh token")
+        return token
+
+    def _expires_in(self) -> float:
+        return self._token_exp - time.time()
+
+    async def _refresh_if_due(self) -> None:
+        if self._expires_in() > REFRESH_AHEAD:
+            return
+        await self._load_shared_token()
+        if self._expires_in() > REFRESH_AHEAD:
+            return
+
+        if await self._renew_exclusively(lambda: self._expires_in() > REFRESH_AHEAD):
+            logger.info("Access token renewed in background")
+
+    async def _renew_exclusively(self, fresh: Callable[[], bool]) -> bool:
+        """
+        Renew unless the token is `fresh()`. Waiters in this process queue on
+        the local lock, so only one of them goes on to the Redis lock, which
+        lets only one replica renew; the rest adopt the token it stores. The
+        local lock is always taken first. Returns whether it renewed; raises
+        LockError if the Redis lock stays busy for REFRESH_LOCK_TIMEOUT.
+        """
         async with self._lock:
-            raw = await redis.get(ACCESS_KEY)
-            if raw:
-                token = raw.decode()
-                exp = _get_exp(token)
-                if exp and exp - time.time() > 30:
-                    return token
-
-            # Try refresh
-            refresh_token = await redis.get(REFRESH_KEY)
-            if refresh_token:
-                new_access = await self._refresh_access_token(refresh_token.decode())
-                if new_access:
-                    await redis.set(ACCESS_KEY, new_access, ex=300)  # ~5m
-                    return new_access
-
-            # Full login
-            access, refresh = await self._get_token_from_api()
-            await redis.set(ACCESS_KEY, access, ex=300)
-            await redis.set(REFRESH_KEY, refresh)
-            return access
+            if fresh():
+                return False
+            async with self._redis.lock(
+                REFRESH_LOCK_KEY,
+                timeout=REFRESH_LOCK_TIMEOUT,
+                blocking_timeout=REFRESH_LOCK_TIMEOUT,
+            ):
+                await self._load_shared_token()
+                if fresh():
+                    return False
+                await self._renew()
+                return True
+
+    async def run_refresher(self) -> None:
+        """
+        Renew the access token ahead of expiry so the handler path never
+        waits on auth. Runs until cancelled.
+        """
+        while True:
+            try:
+                await self._refresh_if_due()
+                delay = self._expires_in() - REFRESH_AHEAD
+            except LockError:
+                logger.warning("Token refresh lock busy; retrying")
+                delay = REFRESH_MIN_DELAY
+            except Exception:
+                logger.exception("Background token refresh failed")
+                delay = REFRESH_MIN_DELAY
+            await asyncio.sleep(max(delay, REFRESH_MIN_DELAY))
 
     async def __call__(self, handler, event: TelegramObject, data: dict):
-        redis = Redis.from_url(REDIS_DSN)
+        start = time.perf_counter()
         try:
-            token = await self._ensure_access_token(redis)
-            data["api_token"] = token  # handlers can read this
-            return await handler(event, data)
+            data["api_token"] = await self._ensure_access_token()  # for handlers
+        except TokenUnavailableError:
+            logger.warning("No access token for update; asking the user to retry")
+            chat = data.get("event_chat")
+            if chat:
+                await data["bot"].send_message(chat.id, BUSY_TEXT)
+            return None
         finally:
-            await redis.aclose()
+            token_seconds.observe(time.perf_counter() - start)
+        return await handler(event, data)
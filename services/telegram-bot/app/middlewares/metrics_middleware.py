@@ -0,0 +1,125 @@
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from aiogram import BaseMiddleware, Bot
+from aiogram.client.session.middlewares.base import (
+    BaseRequestMiddleware,
+    NextRequestMiddlewareType,
+)
+from aiogram.methods import Response, TelegramMethod
+from aiogram.types import TelegramObject, Update
+
+from app.infra.metrics import Counter, Gauge, Histogram
+
+updates_in_flight = Gauge(
+    "bot_updates_in_flight", "Updates being processed.", labels=("type",)
+)
+update_seconds = Histogram(
+    "bot_update_duration_seconds",
+    "Time to process an update, auth middleware included.",
+    labels=("type",),
+)
+updates_total = Counter(
+    "bot_updates_total", "Processed updates by outcome.", labels=("type", "result")
+)
+handler_seconds = Histogram(
+    "bot_handler_duration_seconds",
+    "Handler time (dialog getters and callbacks included) by dialog state.",
+    labels=("handler", "state"),
+)
+handler_errors = Counter(
+    "bot_handler_errors_total",
+    "Handlers that raised, by dialog state.",
+    labels=("handler", "state"),
+)
+telegram_seconds = Histogram(
+    "bot_telegram_api_duration_seconds",
+    "Telegram Bot API calls by method.",
+    labels=("method",),
+)
+telegram_requests = Counter(
+    "bot_telegram_api_requests_total",
+    "Telegram Bot API calls by method and outcome.",
+    labels=("method", "result"),
+)
+
+Handler = Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]]
+
+
+class UpdateMetricsMiddleware(BaseMiddleware):
+    """Outer middleware on `dp.update`, so it times the auth middleware too."""
+
+    async def __call__(
+        self, handler: Handler, event: TelegramObject, data: dict[str, Any]
+    ) -> Any:
+        kind = event.event_type if isinstance(event, Update) else type(event).__name__
+        updates_in_flight.inc(type=kind)
+        start = time.perf_counter()
+        result = "error"
+        try:
+            response = await handler(event, data)
+            result = "ok"
+            return response
+        finally:
+            update_seconds.observe(time.perf_counter() - start, type=kind)
+            updates_total.inc(type=kind, result=result)
+            updates_in_flight.dec(type=kind)
+
+
+def _handler_name(data: dict[str, Any]) -> str:
+    handler = data.get("handler")
+    callback = getattr(handler, "callback", None)
+    return getattr(callback, "__qualname__", type(callback).__name__)
+
+
+def _state_name(data: dict[str, Any]) -> str:
+    # aiogram-dialog's current window; plain FSM state otherwise
+    context = data.get("aiogd_context")
+    if context is not None:
+        return context.state.state
+    return data.get("raw_state") or "-"
+
+
+class HandlerMetricsMiddleware(BaseMiddleware):
+    """Inner middleware: runs once a handler matched, so it knows which."""
+
+    async def __call__(
+        self, handler: Handler, event: TelegramObject, data: dict[str, Any]
+    ) -> Any:
+        start = time.perf_counter()
+        try:
+            return await handler(event, data)
+        except Exception:
+            handler_errors.inc(handler=_handler_name(data), state=_state_name(data))
+            raise
+        finally:
+            handler_seconds.observe(
+                time.perf_counter() - start,
+                handler=_handler_name(data),
+                state=_state_name(data),
+            )
+
+
+class TelegramApiMetricsMiddleware(BaseRequestMiddleware):
+    """Bot session middleware timing outbound Telegram API calls."""
+
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType[Any],
+        bot: Bot,
+        method: TelegramMethod[Any],
+    ) -> Response[Any]:
+        name = method.__api_method__
+        start = time.perf_counter()
+        result = "error"
+        try:
+            response = await make_request(bot, method)
+            result = "ok"
+            return response
+        except Exception as err:
+            result = type(err).__name__
+            raise
+        finally:
+            telegram_seconds.observe(time.perf_counter() - start, method=name)
+            telegram_requests.inc(method=name, result=result)
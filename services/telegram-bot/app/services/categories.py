@@ -1,57 +1,230 @@
+import asyncio
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+
+import orjson
 from pydantic import BaseModel
 
-from app.infra.http import api_client
+from app.infra.config import settings
+from app.infra.http import BearerAuth, ConditionalCache, get_api_client
 
 from .telegram import TelegramAccountDTO
 
+CATEGORY_PAGE_SIZE = 100  # the API's max_page_size
+# All that CategoryCache keeps of a category
+CACHED_FIELDS = ("id", "name")
+
 
 class CategoryDTO(BaseModel):
     id: int | None = None
     name: str = ""
-    tg: TelegramAccountDTO | None = None
+    # The owner's user id when a list was fetched without `?expand=tg`
+    tg: TelegramAccountDTO | int | None = None
+
+
+class CategoryFetchError(Exception):
+    def __init__(self, error: dict[str, str]):
+        super().__init__(error["error"])
+        self.error = error
+
+
+def _item(category: dict) -> dict:
+    return {"id": category["id"], "name": category.get("name", "—")}
+
+
+class CategoryCache:
+    """
+    Every user's full category list (`{"id", "name"}` items, sorted by name),
+    shared by all dialogs. Entries expire after `ttl` seconds, at most
+    `maxsize` users are kept, and concurrent misses for one user share one
+    fetch. Writes patch entries in place instead of refetching.
+
+    The cache is per process: writes made through another replica show up
+    once the entry expires. Keep `ttl` short; the refetch is conditional
+    (CategoryService's ETag cache), so an unchanged list costs one 304 per
+    page.
+    """
+
+    def __init__(self, ttl: float, maxsize: int):
+        self._ttl = ttl
+        self._maxsize = maxsize
+        self._entries: OrderedDict[int, tuple[float, list[dict]]] = OrderedDict()
+        self._inflight: dict[int, asyncio.Task] = {}
+
+    async def get(
+        self, user_id: int, fetch: Callable[[], Awaitable[list[dict]]]
+    ) -> list[dict]:
+        entry = self._entries.get(user_id)
+        if entry and entry[0] > time.monotonic():
+            self._entries.move_to_end(user_id)
+            return entry[1]
+
+        task = self._inflight.get(user_id)
+        if task is None:
+            task = asyncio.create_task(self._load(user_id, fetch))
+            self._inflight[user_id] = task
+        # Shielded: one waiter being cancelled must not cancel the others' fetch
+        return await asyncio.shield(task)
+
+    async def _load(
+        self, user_id: int, fetch: Callable[[], Awaitable[list[dict]]]
+    ) -> list[dict]:
+        try:
+            items = sorted(map(_item, await fetch()), key=lambda it: it["name"])
+            # A write during the fetch dropped us from _inflight; don't store
+            if self._inflight.get(user_id) is asyncio.current_task():
+                self._store(user_id, items)
+            return items
+        finally:
+            if self._inflight.get(user_id) is asyncio.current_task():
+                del self._inflight[user_id]
+
+    def _store(self, user_id: int, items: list[dict]) -> None:
+        self._entries[user_id] = (time.monotonic() + self._ttl, items)
+        self._entries.move_to_end(user_id)
+        if len(self._entries) > self._maxsize:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: int) -> None:
+        self._entries.pop(user_id, None)
+        self._inflight.pop(user_id, None)
+
+    def upsert(self, user_id: int, category: dict) -> None:
+        """Add or rename a category in `user_id`'s cached list, if cached."""
+        self._inflight.pop(user_id, None)
+        entry = self._entries.get(user_id)
+        if not entry:
+            return
+        item = _item(category)
+        items = [it for it in entry[1] if it["id"] != item["id"]] + [item]
+        items.sort(key=lambda it: it["name"])
+        self._entries[user_id] = (entry[0], items)
+
+    def rename(self, category: dict) -> None:
+        """Apply an update whose owner is unknown; category ids are global."""
+        for user_id, (_, items) in list(self._entries.items()):
+            if any(it["id"] == category["id"] for it in items):
+                self.upsert(user_id, category)
+
+    def discard(self, category_id: int) -> None:
+        for user_id, (expires, items) in list(self._entries.items()):
+            kept = [it for it in items if it["id"] != category_id]
+            if len(kept) != len(items):
+                self._entries[user_id] = (expires, kept)
+                self._inflight.pop(user_id, None)
+
+
+category_cache = CategoryCache(
+    ttl=settings.CATEGORY_CACHE_TTL, maxsize=settings.CATEGORY_CACHE_SIZE
+)
 
 
 class CategoryService:
+    # Process-wide, since a service is created per update
+    _list_cache = ConditionalCache()
+
     def __init__(self, api_token: str):
-        self._api_client = api_client
-        self._token = api_token
+        self._client = get_api_client()
+        self._auth = BearerAuth(api_token)
 
     async def get_categories(
-        self, page: int = 1, page_size: int = 20, user_id: str = ""
+        self,
+        page: int = 1,
+        page_size: int = 20,
+        user_id: str = "",
+        fields: tuple[str, ...] | None = None,
     ) -> dict:
-        async with self._api_client(self._token) as client:
-            r = await client.get(
-                "api/categories/",
-                params={"page": page, "page_size": page_size, "tg_user_id": user_id},
+        """One page of the user's categories, trimmed to `fields` if given."""
+        params = {"page": page, "page_size": page_size, "tg_user_id": user_id}
+        if fields is not None:
+            params["fields"] = ",".join(fields)
+        r, body = await self._list_cache.get(
+            self._client, "api/categories/", params=params, auth=self._auth
+        )
+        if body is None:
+            return self._format_error(r)
+        return body
+
+    async def search_categories(
+        self, user_id: str, q: str, fields: tuple[str, ...] | None = CACHED_FIELDS
+    ) -> list[dict] | dict[str, str]:
+        """The user's categories whose name is close to `q`, most similar first."""
+        params = {"q": q, "tg_user_id": user_id}
+        if fields is not None:
+            params["fields"] = ",".join(fields)
+        r = await self._client.get(
+            "api/categories/search/", params=params, auth=self._auth
+        )
+        if r.status_code != 200:
+            return self._format_error(r)
+        return orjson.loads(r.content)["results"]
+
+    async def list_categories(self, user_id: int) -> list[dict] | dict[str, str]:
+        """
+        All of the user's categories as `{"id", "name"}` items, served from
+        `category_cache`; returns `{"error": ...}` if the API call failed.
+        """
+        try:
+            return await category_cache.get(
+                user_id, lambda: self._fetch_all_categories(user_id)
             )
-            if r.status_code != 200:
-                return self._format_error(r)
-        return r.json()
+        except CategoryFetchError as err:
+            return err.error
 
-    async def create_category(self, category: CategoryDTO) -> dict:
-        async with self._api_client(self._token) as client:
-            r = await client.post(
-                "api/categories/", json=category.model_dump(exclude_unset=True)
+    async def find_category(self, user_id: int, category_id) -> dict | None:
+        categories = await self.list_categories(user_id)
+        if isinstance(categories, dict):
+            return None
+        return next((c for c in categories if str(c["id"]) == str(category_id)), None)
+
+    async def _fetch_all_categories(self, user_id: int) -> list[dict]:
+        results: list[dict] = []
+        page = 1
+        while True:
+            data = await self.get_categories(
+                page=page,
+                page_size=CATEGORY_PAGE_SIZE,
+                user_id=str(user_id),
+                fields=CACHED_FIELDS,
             )
+            if "error" in data:
+                raise CategoryFetchError(data)
+            results.extend(data.get("results", []) or [])
+            if not data.get("next"):
+                return results
+            page += 1
+
+    async def create_category(self, category: CategoryDTO) -> dict:
+        r = await self._client.post(
+            "api/categories/",
+            content=orjson.dumps(category.model_dump(exclude_unset=True)),
+            auth=self._auth,
+        )
         if r.status_code != 201:
             return self._format_error(r)
-        return r.json()
+        created = orjson.loads(r.content)
+        if category.tg:
+            category_cache.upsert(category.tg.user_id, created)
+        return created
 
     async def update_category(self, category_id: int, category: CategoryDTO) -> dict:
-        async with self._api_client(self._token) as client:
-            r = await client.put(
-                f"api/categories/{category_id}/",
-                json=category.model_dump(exclude_unset=True),
-            )
+        r = await self._client.put(
+            f"api/categories/{category_id}/",
+            content=orjson.dumps(category.model_dump(exclude_unset=True)),
+            auth=self._auth,
+        )
         if r.status_code != 200:
             return self._format_error(r)
-        return r.json()
+        updated = orjson.loads(r.content)
+        category_cache.rename(updated)
+        return updated
 
     async def delete_category(self, category_id: str) -> dict | bool:
-        async with self._api_client(self._token) as client:
-            r = await client.delete(f"api/categories/{category_id}/")
+        r = await self._client.delete(f"api/categories/{category_id}/", auth=self._auth)
         if r.status_code not in (200, 204):
             return self._format_error(r)
+        category_cache.discard(int(category_id))
         return True
 
     def _format_error(self, response) -> dict[str, str]:
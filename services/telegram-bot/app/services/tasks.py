@@ -1,65 +1,195 @@
+from datetime import datetime
+
+import httpx
+import orjson
 from pydantic import BaseModel
 
-from app.infra.http import api_client
+from app.infra.http import BearerAuth, ConditionalCache, get_api_client
 
+from .categories import CategoryDTO
 from .telegram import TelegramAccountDTO
 
+# What task lists show; the API trims each item to these (see get_tasks)
+LIST_FIELDS = ("id", "title", "due_at", "is_done")
+
 
 class TaskDTO(BaseModel):
+    """
+    A task to send, or one from the API. List items may be partial (only the
+    requested `fields`), with unexpanded relations as ids.
+    """
+
     id: int | None = None
-    title: str
+    title: str = ""
     description: str = ""
     category_ids: list[int] = []
+    categories: list[CategoryDTO | int] = []
     created_at: str | None = None
     due_at: str | None = None
     is_done: bool = False
-    tg: TelegramAccountDTO | None = None
+    tg: TelegramAccountDTO | int | None = None
 
 
 class TaskService:
+    # Process-wide, since a service is created per update
+    _list_cache = ConditionalCache()
+
     def __init__(self, api_token: str):
-        self._api_client = api_client
-        self._token = api_token
+        self._client = get_api_client()
+        self._auth = BearerAuth(api_token)
 
     async def get_tasks(
-        self, page: int = 1, page_size: int = 20, user_id: str = ""
+        self,
+        page: int = 1,
+        page_size: int = 20,
+        user_id: str = "",
+        fields: tuple[str, ...] | None = LIST_FIELDS,
+        expand: tuple[str, ...] | None = (),
+        *,
+        is_done: bool | None = None,
+        overdue: bool | None = None,
+        due_after: datetime | None = None,
+        due_before: datetime | None = None,
+        created_after: datetime | None = None,
+        created_before: datetime | None = None,
+        category: int | None = None,
+    ) -> dict:
+        """
+        One page of the user's tasks. `fields` and `expand` go to the API's
+        `?fields=` / `?expand=`; None for either means everything. The
+        keyword filters are applied by the API (None: not filtered), e.g.
+        `overdue=True` or `is_done=False, due_before=end_of_day`.
+        """
+        params = {"page": page, "page_size": page_size, "tg_user_id": user_id}
+        if fields is not None:
+            params["fields"] = ",".join(fields)
+        if expand is not None:
+            params["expand"] = ",".join(expand)
+        filters = {
+            "is_done": is_done,
+            "overdue": overdue,
+            "due_after": due_after,
+            "due_before": due_before,
+            "created_after": created_after,
+            "created_before": created_before,
+            "category": category,
+        }
+        for name, value in filters.items():
+            if isinstance(value, bool):
+                params[name] = "true" if value else "false"
+            elif isinstance(value, datetime):
+                params[name] = value.isoformat()
+            elif value is not None:
+                params[name] = value
+        r, body = await self._list_cache.get(
+            self._client, "api/tasks/", params=params, auth=self._auth
+        )
+        if body is None:
+            return self._format_error(r)
+        return body
+
+    async def search_tasks(
+        self,
+        user_id: str,
+        q: str,
+        cursor: str | None = None,
+        page_size: int = 10,
+        fields: tuple[str, ...] | None = LIST_FIELDS,
     ) -> dict:
-        async with self._api_client(self._token) as client:
-            r = await client.get(
-                "api/tasks/",
-                params={"page": page, "page_size": page_size, "tg_user_id": user_id},
-            )
+        """
+        One page of the user's tasks matching `q`, best match first, as
+        `{"next", "results"}`; pass `next_cursor(page)` for the next one.
+        """
+        params = {"q": q, "page_size": page_size, "tg_user_id": user_id}
+        if cursor:
+            params["cursor"] = cursor
+        if fields is not None:
+            params["fields"] = ",".join(fields)
+        r = await self._client.get("api/tasks/search/", params=params, auth=self._auth)
         if r.status_code != 200:
             return self._format_error(r)
-        return r.json()
+        return orjson.loads(r.content)
+
+    @staticmethod
+    def next_cursor(page: dict) -> str | None:
+        """The cursor of the page after `page` (a search result), if any."""
+        if not page.get("next"):
+            return None
+        return httpx.URL(page["next"]).params.get("cursor")
 
     async def create_task(self, task: TaskDTO) -> dict:
-        async with self._api_client(self._token) as client:
-            r = await client.post(
-                "api/tasks/",
-                json=task.model_dump(exclude_unset=True),
-            )
+        r = await self._client.post(
+            "api/tasks/",
+            content=orjson.dumps(task.model_dump(exclude_unset=True)),
+            auth=self._auth,
+        )
         if r.status_code != 201:
             return self._format_error(r)
-        return r.json()
-
-    async def update_task(self, task_id: int, task: TaskDTO) -> dict:
-        async with self._api_client(self._token) as client:
-            r = await client.patch(
-                f"api/tasks/{task_id}/",
-                json=task.model_dump(exclude_unset=True),
-            )
+        return orjson.loads(r.content)
+
+    async def update_task(self, task_id: int, task: TaskDTO, user_id: str) -> dict:
+        """Patch the set fields of one of `user_id`'s tasks."""
+        r = await self._client.patch(
+            f"api/tasks/{task_id}/",
+            params={"tg_user_id": user_id},
+            content=orjson.dumps(task.model_dump(exclude_unset=True)),
+            auth=self._auth,
+        )
         if r.status_code != 200:
             return self._format_error(r)
-        return r.json()
+        return orjson.loads(r.content)
 
-    async def delete_task(self, task_id: int) -> dict | bool:
-        async with self._api_client(self._token) as client:
-            r = await client.delete(f"api/tasks/{task_id}/")
+    async def delete_task(self, task_id: int, user_id: str) -> dict | bool:
+        r = await self._client.delete(
+            f"api/tasks/{task_id}/", params={"tg_user_id": user_id}, auth=self._auth
+        )
         if r.status_code not in (200, 204):
             return self._format_error(r)
         return True
 
+    async def bulk(
+        self,
+        tg: TelegramAccountDTO,
+        create: list[TaskDTO] | None = None,
+        update: list[TaskDTO] | None = None,
+        complete: list[int] | None = None,
+        delete: list[int] | None = None,
+    ) -> dict:
+        """Apply a batch of operations in one request (and one DB transaction)."""
+        payload = {
+            "tg": tg.model_dump(),
+            "create": [
+                t.model_dump(exclude_unset=True, exclude={"tg"}) for t in create or []
+            ],
+            "update": [
+                t.model_dump(exclude_unset=True, exclude={"tg"}) for t in update or []
+            ],
+            "complete": complete or [],
+            "delete": delete or [],
+        }
+        r = await self._client.post(
+            "api/tasks/bulk/", content=orjson.dumps(payload), auth=self._auth
+        )
+        if r.status_code != 200:
+            return self._format_error(r)
+        return orjson.loads(r.content)
+
+    async def bulk_create_tasks(
+        self, tg: TelegramAccountDTO, tasks: list[TaskDTO]
+    ) -> dict:
+        return await self.bulk(tg, create=tasks)
+
+    async def bulk_update_tasks(
+        self, tg: TelegramAccountDTO, tasks: list[TaskDTO]
+    ) -> dict:
+        return await self.bulk(tg, update=tasks)
+
+    async def complete_tasks(self, tg: TelegramAccountDTO, task_ids: list[int]) -> dict:
+        return await self.bulk(tg, complete=task_ids)
+
+    async def delete_tasks(self, tg: TelegramAccountDTO, task_ids: list[int]) -> dict:
+        return await self.bulk(tg, delete=task_ids)
+
     def _format_error(self, response) -> dict[str, str]:
         try:
             detail = response.json()
@@ -0,0 +1,98 @@
+"""
+Replay bot-shaped traffic against the CRUD API and report throughput and
+latency percentiles per endpoint.
+
+Uses the bot's settings (DJANGO_API_BASE, service account, shared secret,
+Redis for the JWT), so point it at a local stack, e.g. docker compose:
+
+    docker compose -f docker/docker-compose.yml exec telegram-bot \\
+        python -m loadtest --users 50 --duration 60 --think 0.5
+
+Each simulated user first creates its categories, then picks actions by
+--mix weights until the run ends. Users get ids from --user-id-base up, so
+their data stays apart from real accounts.
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from contextlib import suppress
+
+from app.infra.http import close_api_client
+from app.middlewares.auth_middleware import DjangoAuthMiddleware
+
+from .stats import Stats
+from .users import ACTIONS, VirtualUser
+
+DEFAULT_MIX = "list_categories=3,list_tasks=4,create_task=2,update_task=1,delete_task=1"
+
+
+def parse_mix(value: str) -> dict[str, float]:
+    weights = {}
+    for part in value.split(","):
+        action, _, weight = part.partition("=")
+        if action not in ACTIONS:
+            raise argparse.ArgumentTypeError(f"unknown action {action!r}")
+        weights[action] = float(weight or 1)
+    return weights
+
+
+async def run(args) -> Stats:
+    stats = Stats()
+    auth = DjangoAuthMiddleware()
+    await auth.get_access_token()  # fail fast on bad credentials
+    refresher = asyncio.create_task(auth.run_refresher())
+
+    run_id = f"{int(time.time()):x}"
+    users = [
+        VirtualUser(
+            args.user_id_base + i,
+            run_id,
+            auth,
+            stats,
+            random.Random(args.seed + i),  # noqa: S311  reproducible, not secret
+        )
+        for i in range(args.users)
+    ]
+    try:
+        await asyncio.gather(*(user.setup() for user in users))
+        stats = Stats()  # report the steady state, not the setup burst
+        for user in users:
+            user.stats = stats
+        deadline = time.monotonic() + args.duration
+        await asyncio.gather(
+            *(user.run(deadline, args.mix, args.think) for user in users)
+        )
+        stats.finished = time.monotonic()
+    finally:
+        refresher.cancel()
+        with suppress(asyncio.CancelledError):
+            await refresher
+        await close_api_client()
+        await auth.close()
+    return stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds")
+    parser.add_argument(
+        "--think", type=float, default=0.5, help="mean pause between actions, s"
+    )
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix(DEFAULT_MIX))
+    parser.add_argument("--user-id-base", type=int, default=9_000_000_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    stats = asyncio.run(run(args))
+    print(
+        f"{args.users} users, {args.duration:.0f}s, think {args.think}s, "
+        f"mix {','.join(f'{a}={w:g}' for a, w in args.mix.items())}"
+    )
+    print(stats.report())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+import statistics
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+
+
+class Stats:
+    """Latencies and errors per endpoint, for the whole run."""
+
+    def __init__(self):
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.errors: dict[str, Counter[str]] = defaultdict(Counter)
+        self.started = time.monotonic()
+        self.finished: float | None = None
+
+    @contextmanager
+    def measure(self, endpoint: str):
+        start = time.perf_counter()
+        yield
+        self.latencies[endpoint].append(time.perf_counter() - start)
+
+    def error(self, endpoint: str, message: str) -> None:
+        self.errors[endpoint][message.splitlines()[0][:80] if message else "?"] += 1
+
+    def report(self) -> str:
+        elapsed = (self.finished or time.monotonic()) - self.started
+        header = (
+            f"{'endpoint':<22}{'requests':>9}{'errors':>8}{'req/s':>8}"
+            f"{'p50 ms':>9}{'p90 ms':>9}{'p99 ms':>9}{'max ms':>9}"
+        )
+        lines = [header, "-" * len(header)]
+        endpoints = sorted(set(self.latencies) | set(self.errors))
+        everything = [v for values in self.latencies.values() for v in values]
+        for name, values in [(e, self.latencies[e]) for e in endpoints] + [
+            ("total", everything)
+        ]:
+            errors = (
+                sum(self.errors[name].values())
+                if name != "total"
+                else sum(sum(c.values()) for c in self.errors.values())
+            )
+            lines.append(
+                f"{name:<22}{len(values):>9}{errors:>8}{len(values) / elapsed:>8.1f}"
+                f"{_pct(values, 50):>9.1f}{_pct(values, 90):>9.1f}"
+                f"{_pct(values, 99):>9.1f}{max(values, default=0) * 1000:>9.1f}"
+            )
+        for name in endpoints:
+            for message, count in self.errors[name].most_common(3):
+                lines.append(f"  {name}: {count} x {message}")
+        return "\n".join(lines)
+
+
+def _pct(values: list[float], pct: int) -> float:
+    if len(values) < 2:
+        return values[0] * 1000 if values else 0.0
+    return statistics.quantiles(values, n=100, method="inclusive")[pct - 1] * 1000
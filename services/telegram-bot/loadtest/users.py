@@ -0,0 +1,135 @@
+"""
+A simulated Telegram user: the calls the dialogs make, through the bot's own
+services, so requests carry the same HMAC signature and service JWT.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+from collections.abc import Awaitable, Callable
+
+from app.middlewares.auth_middleware import DjangoAuthMiddleware
+from app.services.categories import CACHED_FIELDS, CategoryDTO, CategoryService
+from app.services.tasks import TaskDTO, TaskService
+from app.services.telegram import TelegramAccountDTO
+
+from .stats import Stats
+
+ACTIONS = ("list_categories", "list_tasks", "create_task", "update_task", "delete_task")
+CATEGORIES_PER_USER = 3
+MAX_PAGES = 3  # pages a user scrolls through per list_tasks
+
+
+class VirtualUser:
+    def __init__(
+        self,
+        user_id: int,
+        run_id: str,
+        auth: DjangoAuthMiddleware,
+        stats: Stats,
+        rng: random.Random,
+    ):
+        self.tg = TelegramAccountDTO(
+            user_id=user_id, chat_id=user_id, tg_username=f"load_{user_id}"
+        )
+        self.run_id = run_id
+        self.auth = auth
+        self.stats = stats
+        self.rng = rng
+        self.category_ids: list[int] = []
+        self.task_ids: list[int] = []
+
+    async def _call(self, endpoint: str, call: Callable[[str], Awaitable]):
+        """Run one service call; returns its result, or None if it failed."""
+        token = await self.auth.get_access_token()
+        try:
+            with self.stats.measure(endpoint):
+                result = await call(token)
+        except Exception as err:
+            self.stats.error(endpoint, f"{type(err).__name__}: {err}")
+            return None
+        if isinstance(result, dict) and "error" in result:
+            self.stats.error(endpoint, result["error"])
+            return None
+        return result
+
+    async def setup(self) -> None:
+        for i in range(CATEGORIES_PER_USER):
+            category = CategoryDTO(name=f"load-{self.run_id}-{i}", tg=self.tg)
+            created = await self._call(
+                "POST categories",
+                lambda token, c=category: CategoryService(token).create_category(c),
+            )
+            if created:
+                self.category_ids.append(created["id"])
+
+    async def list_categories(self) -> None:
+        await self._call(
+            "GET categories",
+            lambda token: CategoryService(token).get_categories(
+                page_size=20, user_id=str(self.tg.user_id), fields=CACHED_FIELDS
+            ),
+        )
+
+    async def list_tasks(self) -> None:
+        for page in range(1, MAX_PAGES + 1):
+            data = await self._call(
+                "GET tasks",
+                lambda token, p=page: TaskService(token).get_tasks(
+                    page=p, page_size=10, user_id=str(self.tg.user_id)
+                ),
+            )
+            if not data or not data.get("next"):
+                return
+
+    async def create_task(self) -> None:
+        categories = self.rng.sample(
+            self.category_ids, k=min(len(self.category_ids), self.rng.randint(0, 2))
+        )
+        task = TaskDTO(
+            title=f"load task {self.rng.randrange(10**6)}",
+            description="created by the load test",
+            category_ids=categories,
+            tg=self.tg,
+        )
+        created = await self._call(
+            "POST tasks", lambda token: TaskService(token).create_task(task)
+        )
+        if created:
+            self.task_ids.append(created["id"])
+
+    async def update_task(self) -> None:
+        if not self.task_ids:
+            return await self.create_task()
+        task_id = self.rng.choice(self.task_ids)
+        task = TaskDTO(title=f"load task {task_id} (edited)", is_done=True)
+        await self._call(
+            "PATCH tasks/{id}",
+            lambda token: TaskService(token).update_task(
+                task_id, task, user_id=str(self.tg.user_id)
+            ),
+        )
+
+    async def delete_task(self) -> None:
+        if not self.task_ids:
+            return await self.create_task()
+        task_id = self.task_ids.pop(self.rng.randrange(len(self.task_ids)))
+        await self._call(
+            "DELETE tasks/{id}",
+            lambda token: TaskService(token).delete_task(
+                task_id, user_id=str(self.tg.user_id)
+            ),
+        )
+
+    async def run(
+        self, deadline: float, weights: dict[str, float], think: float
+    ) -> None:
+        actions, action_weights = zip(*weights.items(), strict=True)
+        while time.monotonic() < deadline:
+            action = self.rng.choices(actions, action_weights)[0]
+            await getattr(self, action)()
+            if think:
+                # Exponential gaps, like independent users tapping buttons
+                await asyncio.sleep(self.rng.expovariate(1 / think))
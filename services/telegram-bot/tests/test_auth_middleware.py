@@ -0,0 +1,141 @@
+"""DjangoAuthMiddleware against a real Redis (skipped when none is reachable)."""
+
+import asyncio
+import base64
+import time
+from types import SimpleNamespace
+
+import orjson
+import pytest
+import pytest_asyncio
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from app.infra.config import settings
+from app.middlewares import auth_middleware
+from app.middlewares.auth_middleware import (
+    ACCESS_KEY,
+    BUSY_TEXT,
+    REFRESH_LOCK_KEY,
+    DjangoAuthMiddleware,
+    TokenUnavailableError,
+)
+
+# A database of its own, flushed after each test
+TEST_DSN = f"redis://{settings.REDIS_HOST}:{settings.REDIS_PORT}/15"
+
+
+def make_jwt(ttl: float) -> str:
+    def part(data: dict) -> str:
+        return base64.urlsafe_b64encode(orjson.dumps(data)).rstrip(b"=").decode()
+
+    return ".".join(
+        [part({"alg": "HS256"}), part({"exp": int(time.time() + ttl)}), "sig"]
+    )
+
+
+@pytest_asyncio.fixture
+async def middleware(monkeypatch):
+    monkeypatch.setattr(auth_middleware, "REDIS_DSN", TEST_DSN)
+    monkeypatch.setattr(settings, "REDIS_MAX_CONNECTIONS", 2)
+    mw = DjangoAuthMiddleware()
+    try:
+        await mw._redis.flushdb()
+    except RedisConnectionError:
+        await mw.close()
+        pytest.skip("Redis is not reachable")
+    yield mw
+    await mw._redis.flushdb()
+    await mw.close()
+
+
+@pytest.mark.asyncio
+async def test_burst_waits_for_a_pooled_connection(middleware):
+    # Every caller misses in memory and reads the shared token: 200 GETs
+    # through a pool of 2 connections
+    token = make_jwt(ttl=3600)
+    await middleware._redis.set(ACCESS_KEY, token)
+
+    tokens = await asyncio.gather(*(middleware.get_access_token() for _ in range(200)))
+    assert set(tokens) == {token}
+
+
+@pytest.mark.asyncio
+async def test_stale_burst_renews_once_and_takes_the_redis_lock_once(
+    middleware, monkeypatch
+):
+    logins, locks = 0, 0
+    redis_lock = middleware._redis.lock
+
+    async def login():
+        nonlocal logins
+        logins += 1
+        await asyncio.sleep(0.05)
+        return make_jwt(ttl=3600), "refresh"
+
+    def counting_lock(*args, **kwargs):
+        nonlocal locks
+        locks += 1
+        return redis_lock(*args, **kwargs)
+
+    monkeypatch.setattr(middleware, "_get_token_from_api", login)
+    monkeypatch.setattr(middleware._redis, "lock", counting_lock)
+
+    tokens = await asyncio.gather(*(middleware.get_access_token() for _ in range(200)))
+    assert len(set(tokens)) == 1
+    assert await middleware._redis.get(ACCESS_KEY) == tokens[0].encode()
+    # The rest waited on the local lock and found the new token in memory
+    assert (logins, locks) == (1, 1)
+
+
+@pytest_asyncio.fixture
+async def busy_lock(middleware, monkeypatch):
+    """The refresh lock, held by "another replica" for the whole test."""
+    monkeypatch.setattr(auth_middleware, "REFRESH_LOCK_TIMEOUT", 0.3)
+    lock = middleware._redis.lock(REFRESH_LOCK_KEY, timeout=10)
+    await lock.acquire()
+    yield
+    await lock.release()
+
+
+@pytest.mark.asyncio
+async def test_busy_lock_falls_back_to_the_token_the_holder_stored(
+    middleware, busy_lock
+):
+    token = make_jwt(ttl=3600)
+
+    async def other_replica_renews():
+        await asyncio.sleep(0.1)
+        await middleware._redis.set(ACCESS_KEY, token)
+
+    renewing = asyncio.create_task(other_replica_renews())
+    assert await middleware.get_access_token() == token
+    await renewing
+
+
+class FakeBot:
+    def __init__(self):
+        self.sent = []
+
+    async def send_message(self, chat_id, text):
+        self.sent.append((chat_id, text))
+
+
+@pytest.mark.asyncio
+async def test_busy_lock_without_a_token_skips_the_handler(middleware, busy_lock):
+    bot, handled = FakeBot(), []
+
+    async def handler(event, data):
+        handled.append(event)
+
+    updates = [{"bot": bot, "event_chat": SimpleNamespace(id=chat)} for chat in (1, 2)]
+    start = time.monotonic()
+    results = await asyncio.gather(
+        *(middleware(handler, object(), data) for data in updates)
+    )
+    # The second update gave up with the first instead of waiting its own turn
+    assert time.monotonic() - start < 0.5
+    assert results == [None, None]
+    assert handled == []
+    assert sorted(bot.sent) == [(1, BUSY_TEXT), (2, BUSY_TEXT)]
+    with pytest.raises(TokenUnavailableError):
+        await middleware.get_access_token()
@@ -0,0 +1,147 @@
+import asyncio
+
+import pytest
+
+from app.services.categories import CategoryCache
+
+
+@pytest.mark.asyncio
+async def test_expired_entry_is_refetched():
+    cache = CategoryCache(ttl=0.05, maxsize=10)
+    lists = [
+        [{"id": 1, "name": "home"}],
+        [{"id": 1, "name": "home"}, {"id": 2, "name": "gym"}],
+    ]
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        return lists[calls - 1]
+
+    assert await cache.get(1, fetch) == [{"id": 1, "name": "home"}]
+    assert await cache.get(1, fetch) == [{"id": 1, "name": "home"}]
+    assert calls == 1
+
+    # e.g. another replica added a category meanwhile
+    await asyncio.sleep(0.06)
+    items = await cache.get(1, fetch)
+    assert calls == 2
+    assert [it["name"] for it in items] == ["gym", "home"]
+
+
+class Fetcher:
+    """A list endpoint stand-in: counts calls; `gate` holds them in flight."""
+
+    def __init__(self, *results):
+        self.results = list(results)
+        self.calls = 0
+        self.gate = asyncio.Event()
+        self.gate.set()
+
+    async def __call__(self):
+        self.calls += 1
+        await self.gate.wait()
+        result = self.results.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+HOME = {"id": 1, "name": "home"}
+GYM = {"id": 2, "name": "gym"}
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_one_fetch():
+    cache = CategoryCache(ttl=60, maxsize=10)
+    fetch = Fetcher([HOME, GYM])
+    fetch.gate.clear()
+
+    waiters = [asyncio.create_task(cache.get(1, fetch)) for _ in range(10)]
+    await asyncio.sleep(0)
+    fetch.gate.set()
+    results = await asyncio.gather(*waiters)
+
+    assert fetch.calls == 1
+    assert all(items == [GYM, HOME] for items in results)
+    assert await cache.get(1, fetch) == [GYM, HOME]  # stored
+    assert fetch.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_leaves_the_fetch_to_the_others():
+    cache = CategoryCache(ttl=60, maxsize=10)
+    fetch = Fetcher([HOME])
+    fetch.gate.clear()
+
+    first = asyncio.create_task(cache.get(1, fetch))
+    second = asyncio.create_task(cache.get(1, fetch))
+    await asyncio.sleep(0)
+    first.cancel()
+    fetch.gate.set()
+
+    assert await second == [HOME]
+    assert first.cancelled()
+    assert fetch.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_fetch_reaches_every_waiter_and_is_not_cached():
+    cache = CategoryCache(ttl=60, maxsize=10)
+    fetch = Fetcher(RuntimeError("API down"), [HOME])
+    fetch.gate.clear()
+
+    waiters = [asyncio.create_task(cache.get(1, fetch)) for _ in range(3)]
+    await asyncio.sleep(0)
+    fetch.gate.set()
+    results = await asyncio.gather(*waiters, return_exceptions=True)
+
+    assert fetch.calls == 1
+    assert all(isinstance(r, RuntimeError) for r in results)
+    # Nothing stored, nothing left in flight: the next call fetches again
+    assert await cache.get(1, fetch) == [HOME]
+    assert fetch.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_bot_writes_patch_cached_lists_without_a_fetch():
+    cache = CategoryCache(ttl=60, maxsize=10)
+    fetch = Fetcher([HOME], [HOME])
+    await cache.get(1, fetch)
+    await cache.get(2, fetch)
+
+    cache.upsert(1, {"id": 3, "name": "work", "tg": {"user_id": 1}})
+    assert await cache.get(1, fetch) == [HOME, {"id": 3, "name": "work"}]
+
+    # Category ids are global: a rename reaches whichever list holds the id
+    cache.rename({"id": 1, "name": "house"})
+    assert await cache.get(1, fetch) == [
+        {"id": 1, "name": "house"},
+        {"id": 3, "name": "work"},
+    ]
+    assert await cache.get(2, fetch) == [{"id": 1, "name": "house"}]
+
+    cache.discard(3)
+    assert await cache.get(1, fetch) == [{"id": 1, "name": "house"}]
+    assert fetch.calls == 2
+
+    # Lists not cached are left alone and fetched on first use
+    cache.upsert(9, GYM)
+    assert await cache.get(9, Fetcher([])) == []
+
+
+@pytest.mark.asyncio
+async def test_write_during_a_fetch_keeps_its_result_out_of_the_cache():
+    cache = CategoryCache(ttl=60, maxsize=10)
+    fetch = Fetcher([HOME], [HOME, GYM])
+    fetch.gate.clear()
+
+    loading = asyncio.create_task(cache.get(1, fetch))
+    await asyncio.sleep(0)
+    cache.upsert(1, GYM)  # the list being fetched may predate this write
+    fetch.gate.set()
+
+    assert await loading == [HOME]
+    assert await cache.get(1, fetch) == [GYM, HOME]
+    assert fetch.calls == 2
@@ -0,0 +1,104 @@
+"""Webhook intake, driven with recorded Telegram updates."""
+
+import asyncio
+
+import orjson
+import pytest
+from aiogram import Bot, Dispatcher
+from aiogram.types import Message
+from aiohttp.test_utils import TestClient, TestServer
+
+from app.bot.webhook import SECRET_HEADER, UpdateQueue, make_app
+
+SECRET = "s3cret"  # noqa: S105
+PATH = "/telegram/webhook"
+
+# As Telegram posts it: a private-chat text message
+UPDATE = {
+    "update_id": 10001,
+    "message": {
+        "message_id": 7,
+        "date": 1755680000,
+        "chat": {"id": 42, "type": "private", "first_name": "Ann"},
+        "from": {"id": 42, "is_bot": False, "first_name": "Ann"},
+        "text": "/main",
+    },
+}
+
+
+@pytest.fixture
+def bot():
+    return Bot(token="123456:TEST")  # noqa: S106
+
+
+async def client_for(bot: Bot, queue: UpdateQueue) -> TestClient:
+    client = TestClient(TestServer(make_app(bot, queue, SECRET, PATH)))
+    await client.start_server()
+    return client
+
+
+async def post(client: TestClient, body, secret: str | None = SECRET):
+    headers = {SECRET_HEADER: secret} if secret is not None else {}
+    data = body if isinstance(body, bytes) else orjson.dumps(body)
+    return await client.post(PATH, data=data, headers=headers)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("secret", [None, "", "wrong"])
+async def test_missing_or_bad_secret_is_unauthorized(bot, secret):
+    queue = UpdateQueue(bot, Dispatcher(), workers=1, maxsize=10)
+    client = await client_for(bot, queue)
+    try:
+        response = await post(client, UPDATE, secret=secret)
+        assert response.status == 401
+    finally:
+        await client.close()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("body", [b"{not json", b"[]", orjson.dumps({"x": 1})])
+async def test_malformed_update_is_rejected(bot, body):
+    queue = UpdateQueue(bot, Dispatcher(), workers=1, maxsize=10)
+    client = await client_for(bot, queue)
+    try:
+        assert (await post(client, body)).status == 400
+    finally:
+        await client.close()
+
+
+@pytest.mark.asyncio
+async def test_full_backlog_answers_503(bot):
+    # No workers, so nothing drains the single slot
+    queue = UpdateQueue(bot, Dispatcher(), workers=0, maxsize=1)
+    client = await client_for(bot, queue)
+    try:
+        assert (await post(client, UPDATE)).status == 200
+        assert (await post(client, {**UPDATE, "update_id": 10002})).status == 503
+    finally:
+        await client.close()
+
+
+@pytest.mark.asyncio
+async def test_recorded_update_reaches_the_dispatcher(bot):
+    dp = Dispatcher()
+    seen: list[Message] = []
+    handled = asyncio.Event()
+
+    @dp.message()
+    async def record(message: Message) -> None:
+        seen.append(message)
+        handled.set()
+
+    queue = UpdateQueue(bot, dp, workers=2, maxsize=10)
+    queue.start()
+    client = await client_for(bot, queue)
+    try:
+        response = await post(client, UPDATE)
+        assert response.status == 200
+        await asyncio.wait_for(handled.wait(), timeout=5)
+    finally:
+        await client.close()
+        await queue.stop(timeout=5)
+        await bot.session.close()
+
+    assert [(m.chat.id, m.text) for m in seen] == [(42, "/main")]